@@ -0,0 +1,50 @@
+# Cost of refreshing the history analytics: a full rebuild over a large
+# history versus an incremental refresh after a small append.
+# Usage: python benchmarks/bench_analytics.py [rows] [appended]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from soilwind.analytics import HistoryAnalytics
+from soilwind.history import SOIL_HISTORY_HEADER
+from soilwind.history_logger import HistoryLogger
+from soilwind.soil_batch import SoilAnalysisBatch, log_soil_batch_to_csv
+
+
+def append_rows(path, n):
+    batch = SoilAnalysisBatch(*make_rows(n))
+    history = HistoryLogger(path, SOIL_HISTORY_HEADER, batch_size=50_000)
+    log_soil_batch_to_csv(batch, batch.analyze(), history)
+    history.close()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    appended = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        soil_path = os.path.join(directory, 'soil_analysis_history.csv')
+        paths = (soil_path, os.path.join(directory, 'wind_load_history.csv'),
+                 os.path.join(directory, 'analytics.json'))
+        append_rows(soil_path, n)
+
+        start = time.perf_counter()
+        HistoryAnalytics(*paths).refresh()
+        full = time.perf_counter() - start
+        print(f"full rebuild over {n:,} rows: {full:.2f} s ({full / n * 1e6:.2f} us/row)")
+
+        append_rows(soil_path, appended)
+        start = time.perf_counter()
+        analytics = HistoryAnalytics(*paths)
+        new_rows, _ = analytics.refresh()
+        incremental = time.perf_counter() - start
+        print(f"incremental refresh after {new_rows:,} new rows: {incremental * 1000:.1f} ms "
+              f"(sidecar {os.path.getsize(paths[2]):,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
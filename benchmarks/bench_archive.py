@@ -0,0 +1,66 @@
+# Binary result archive against the CSV history: file size, converting the
+# CSV into an archive, and reloading the results (parsing the CSV versus
+# memory-mapping or decompressing the archive) followed by one column scan.
+# Usage: python benchmarks/bench_archive.py [rows]
+import csv
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from soilwind.archive import ArchiveWriter, archive_to_csv, csv_to_archive, read_archive, soil_records, zstandard
+from soilwind.history import SOIL_HISTORY_HEADER
+from soilwind.history_logger import HistoryLogger
+from soilwind.soil_batch import SoilAnalysisBatch, log_soil_batch_to_csv
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:45s} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    return result
+
+
+def load_csv(path):
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        next(reader)
+        return [float(row[4]) for row in reader]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = SoilAnalysisBatch(*make_rows(n))
+    result = batch.analyze()
+    compressions = [None, 'zlib'] + (['zstd'] if zstandard is not None else [])
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, 'soil.csv')
+        history = HistoryLogger(csv_path, SOIL_HISTORY_HEADER, batch_size=50_000)
+        log_soil_batch_to_csv(batch, result, history)
+        history.close()
+        print(f"CSV history: {n:,} rows, {os.path.getsize(csv_path) / n:.1f} bytes/row")
+
+        for compression in compressions:
+            name = compression or 'none'
+            path = os.path.join(directory, f'soil.{name}.swr')
+            timed(f"csv -> archive ({name})", lambda: csv_to_archive('soil', csv_path, path, compression))
+
+            def write_batch():
+                with ArchiveWriter(path, 'soil', compression) as writer:
+                    writer.write(soil_records(batch, result))
+            timed(f"batch -> archive ({name})", write_batch)
+            print(f"  {os.path.getsize(path) / n:.1f} bytes/row")
+            timed(f"reload + scan allowable capacity ({name})",
+                  lambda: float(read_archive(path)['allowable_bearing_capacity'].min()))
+
+        timed("reload + scan allowable capacity (CSV)", lambda: min(load_csv(csv_path)))
+        timed("archive -> csv", lambda: archive_to_csv(os.path.join(directory, 'soil.none.swr'),
+                                                        os.path.join(directory, 'back.csv')))
+
+
+if __name__ == '__main__':
+    main()
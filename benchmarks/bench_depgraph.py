@@ -0,0 +1,58 @@
+# Per-keystroke cost of the live what-if panels: a full evaluation of the wind
+# form (what every Calculate click used to do) against updating one input of
+# the panel's dependency graph and reading the report back.
+# Usage: python benchmarks/bench_depgraph.py [keystrokes]
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.factors import FACTORS
+from soilwind.gui import (SOIL_INPUTS, WIND_INPUTS, evaluate_wind_inputs, gust_factor_map, shape_names,
+                          soil_inputs_graph, wind_inputs_graph)
+
+
+def wind_form(speed):
+    return (str(speed), '40', next(iter(gust_factor_map)), shape_names[0], FACTORS.structures.names[0],
+            FACTORS.structures.values[0][0])
+
+
+def timed(label, n, func):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / n * 1e6:8.2f} us per keystroke")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    speeds = [10 + i % 50 for i in range(n)]
+
+    timed("wind: full evaluation", n, lambda: [evaluate_wind_inputs(*wind_form(speed)) for speed in speeds])
+
+    graph = wind_inputs_graph()
+    graph.update(**dict(zip(WIND_INPUTS, wind_form(speeds[0]))))
+    graph['report']
+
+    def wind_updates():
+        for speed in speeds:
+            graph.set('wind_speed_input', str(speed))
+            graph['report']
+    timed("wind: graph, wind speed edited", n, wind_updates)
+    print(f"  recomputed: {graph.recomputed}")
+
+    soil = soil_inputs_graph()
+    soil.update(**dict(zip(SOIL_INPUTS, ('Clay', '200', '3', '1'))))
+    soil['report']
+
+    def soil_updates():
+        for i in range(n):
+            soil.set('water_table_depth_input', str(0.5 + i % 5))
+            soil['report']
+    timed("soil: graph, water table edited", n, soil_updates)
+    print(f"  recomputed: {soil.recomputed}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+# Grid screening over memory-mapped rasters: writes random soil and wind
+# rasters of the given size to a scratch directory, screens them tile by tile
+# and reports the throughput and the peak of allocated memory (which tracks
+# the tile size, not the grid size; mapped file pages are page cache).
+# Usage: python benchmarks/bench_grid.py [size] [tile]
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from soilwind.grid import GridScreening
+
+
+def write_raster(path, shape, dtype, fill):
+    raster = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    for top in range(0, shape[0], 1024):
+        rows = raster[top:top + 1024]
+        rows[...] = fill(rows.shape)
+    raster.flush()
+    del raster
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 8192
+    tile = int(sys.argv[2]) if len(sys.argv) > 2 else 1024
+    shape = (size, size)
+    rng = np.random.default_rng(0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        inputs = {}
+        for name, dtype, fill in (
+                ('soil_type', np.uint8, lambda s: rng.integers(0, 4, s)),
+                ('soil_bearing_capacity', np.float32, lambda s: rng.uniform(20, 500, s)),
+                ('depth_of_soil_layer', np.float32, lambda s: rng.uniform(0.5, 10, s)),
+                ('water_table_depth', np.float32, lambda s: rng.uniform(0.1, 8, s)),
+                ('wind_speed', np.float32, lambda s: rng.weibull(2, s) * 18),
+                ('exposure_category', np.uint8, lambda s: rng.integers(0, 6, s))):
+            inputs[name] = os.path.join(directory, f'{name}.npy')
+            write_raster(inputs[name], shape, dtype, fill)
+
+        tracemalloc.start()
+        screening = GridScreening(inputs, 'rectangular', 10, 'residential', 'duplex', tile=tile)
+        summary = screening.run(os.path.join(directory, 'out'))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(summary.report())
+        print(f"{size * size / summary.elapsed / 1e6:.1f} M cells/s; peak allocated memory {peak / 1e6:.0f} MB "
+              f"for {size * size * 24 / 1e9:.1f} GB of mapped inputs and outputs")
+
+
+if __name__ == '__main__':
+    main()
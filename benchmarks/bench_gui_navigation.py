@@ -0,0 +1,63 @@
+# GUI startup time and menu <-> panel switch latency, compared with the old
+# destroy-and-recreate-Tk navigation. Needs a display (e.g. xvfb-run on CI).
+# Usage: python benchmarks/bench_gui_navigation.py [switches]
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.gui import MainMenu, SoilAnalysisGUI, WindLoadCalculator
+
+
+def timed(action, root):
+    start = time.perf_counter()
+    action()
+    root.update()
+    return time.perf_counter() - start
+
+
+def recreate_root(panel_class):
+    # What each menu click used to cost: a fresh Tk interpreter and a rebuilt panel
+    root = tk.Tk()
+    panel_class(root)
+    root.update()
+    return root
+
+
+def main():
+    switches = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    start = time.perf_counter()
+    root = tk.Tk()
+    app = MainMenu(root)
+    root.update()
+    startup = time.perf_counter() - start
+
+    first_soil = timed(app.start_soil_analysis, root)
+    first_wind = timed(app.start_wind_load_calculator, root)
+    cached = []
+    for _ in range(switches):
+        cached.append(timed(app.show_menu, root))
+        cached.append(timed(app.start_soil_analysis, root))
+        cached.append(timed(app.start_wind_load_calculator, root))
+    app.close()
+
+    recreated = []
+    for i in range(min(switches, 20)):
+        start = time.perf_counter()
+        old = recreate_root(SoilAnalysisGUI if i % 2 else WindLoadCalculator)
+        recreated.append(time.perf_counter() - start)
+        old.destroy()
+
+    print(f"startup (Tk root + menu):          {startup * 1000:8.2f} ms")
+    print(f"first visit, soil / wind:          {first_soil * 1000:8.2f} / {first_wind * 1000:.2f} ms")
+    print(f"cached switch, median / p95:       {statistics.median(cached) * 1000:8.2f} / "
+          f"{sorted(cached)[int(len(cached) * 0.95)] * 1000:.2f} ms ({len(cached)} switches)")
+    print(f"destroy + new Tk root, median:     {statistics.median(recreated) * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+# Cost of logging a large batch run through the background history writer.
+# Usage: python benchmarks/bench_history_logger.py [rows]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from soilwind.history import SOIL_HISTORY_HEADER
+from soilwind.history_logger import HistoryLogger
+from soilwind.soil_batch import SoilAnalysisBatch, log_soil_batch_to_csv
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = SoilAnalysisBatch(*make_rows(n))
+    result = batch.analyze()
+
+    with tempfile.TemporaryDirectory() as directory:
+        history = HistoryLogger(os.path.join(directory, 'soil_analysis_history.csv'), SOIL_HISTORY_HEADER,
+                                batch_size=50_000)
+        start = time.perf_counter()
+        log_soil_batch_to_csv(batch, result, history)
+        queued = time.perf_counter() - start
+        history.flush()
+        written = time.perf_counter() - start
+        history.close()
+        size = os.path.getsize(history.path)
+
+    print(f"{n:,} rows queued in {queued:.3f} s, on disk after {written:.3f} s "
+          f"({n / written:,.0f} rows/s, {size / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Memory-mapped history reader: building the row index for a large history
+# file, reopening it with the persisted index, reading the last 100 rows,
+# random row access, an incremental refresh after an append and a parallel scan.
+# Usage: python benchmarks/bench_history_reader.py [rows] [workers]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from soilwind.history import SOIL_HISTORY_HEADER
+from soilwind.history_logger import HistoryLogger
+from soilwind.history_reader import HistoryReader
+from soilwind.soil_batch import SoilAnalysisBatch, log_soil_batch_to_csv
+
+
+def append_rows(path, n):
+    batch = SoilAnalysisBatch(*make_rows(n))
+    history = HistoryLogger(path, SOIL_HISTORY_HEADER, batch_size=50_000)
+    log_soil_batch_to_csv(batch, batch.analyze(), history)
+    history.close()
+
+
+def low_capacity_count(rows):
+    return sum(float(row[4]) < 50 for row in rows)
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:45s} {(time.perf_counter() - start) * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'soil_analysis_history.csv')
+        append_rows(path, n)
+        print(f"{n:,} rows, {os.path.getsize(path) / 1e6:,.0f} MB")
+
+        reader = timed("build index", lambda: HistoryReader(path))
+        reader.close()
+        reader = timed("reopen with persisted index", lambda: HistoryReader(path))
+        timed("last 100 rows", lambda: reader.tail(100))
+        indices = [random.randrange(n) for _ in range(10_000)]
+        timed("10,000 random rows", lambda: [reader.row(i) for i in indices])
+        append_rows(path, 1_000)
+        timed("refresh after appending 1,000 rows", reader.refresh)
+        count = timed(f"parallel scan, {workers} workers", lambda: sum(reader.scan(low_capacity_count, workers)))
+        print(f"{len(reader):,} rows indexed, {count:,} with low allowable capacity")
+        reader.close()
+
+
+if __name__ == '__main__':
+    main()
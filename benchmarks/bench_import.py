@@ -0,0 +1,46 @@
+# Cold import time of the headless core, measured in fresh interpreters.
+# Fails (exit status 1) when the median goes over the budget or when the core
+# starts pulling in tkinter, NumPy or file/IO modules.
+# Usage: python benchmarks/bench_import.py [runs] [budget_ms]
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN = ('tkinter', 'numpy', 'csv', 'sqlite3', 'soilwind.history_logger', 'soilwind.gui')
+
+PROBE = f"""
+import sys, time
+start = time.perf_counter()
+import soilwind.core
+elapsed = time.perf_counter() - start
+print(elapsed)
+print(','.join(name for name in {FORBIDDEN!r} if name in sys.modules))
+"""
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+
+    times = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.splitlines()
+        times.append(float(output[0]) * 1000)
+        loaded = output[1] if len(output) > 1 else ''
+        if loaded:
+            print(f"import soilwind.core loaded {loaded}")
+            sys.exit(1)
+
+    median = statistics.median(times)
+    print(f"import soilwind.core: median {median:.2f} ms, max {max(times):.2f} ms over {runs} runs "
+          f"(budget {budget:.0f} ms)")
+    if median > budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
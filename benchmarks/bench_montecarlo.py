@@ -0,0 +1,38 @@
+# Monte Carlo wind risk throughput over 1, 2, 4, ... workers, checking that
+# every worker count gives bit-identical counts for the same seed.
+# Usage: python benchmarks/bench_montecarlo.py [total_samples] [structures]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_wind_sweep import make_portfolio
+from soilwind.montecarlo import Weibull, wind_risk
+
+
+def main():
+    total = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    structures = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    portfolio = make_portfolio(structures)
+
+    reference = None
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        estimate = wind_risk(Weibull(2.0, 18.0), *portfolio, samples=total // structures, gust_cov=0.1,
+                             drag_cov=0.15, seed=2024, workers=workers)
+        elapsed = time.perf_counter() - start
+        if reference is None:
+            reference = estimate
+        identical = (np.array_equal(estimate.exceedances, reference.exceedances)
+                     and np.array_equal(estimate.load_sum, reference.load_sum))
+        print(f"{workers:3d} workers: {estimate.samples.sum():,} samples in {elapsed:6.2f} s "
+              f"({estimate.samples.sum() / elapsed:,.0f} samples/s), identical to 1 worker: {identical}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Scaling of the process-pool executor over 1, 2, 4, 8, ... workers.
+# Usage: python benchmarks/bench_parallel.py [rows] [chunk_size]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from bench_wind_sweep import make_portfolio
+from soilwind.parallel import parallel_soil_analysis, parallel_wind_load_sweep
+
+
+def worker_counts():
+    counts, workers = [], 1
+    while workers <= (os.cpu_count() or 1):
+        counts.append(workers)
+        workers *= 2
+    return counts
+
+
+def report(name, run):
+    baseline = None
+    for workers in worker_counts():
+        start = time.perf_counter()
+        cells = run(workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{name} workers={workers:<3} {elapsed:8.3f} s  {cells / elapsed:14,.0f} rows/s  "
+              f"speedup {baseline / elapsed:5.2f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    soil = make_rows(n)
+    report("soil", lambda workers: len(parallel_soil_analysis(*soil, workers=workers, chunk_size=chunk_size)))
+
+    buildings = max(1, n // 500)
+    exposure, shape, area, structure, specific = (column[:, None] for column in make_portfolio(buildings))
+    speeds = np.linspace(1, 70, 500)
+    report("wind", lambda workers: parallel_wind_load_sweep(speeds, exposure, shape, area, structure, specific,
+                                                            workers=workers, chunk_size=chunk_size).wind_load.size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Depth queries against a many-layer borehole profile: scalar binary-search
+# lookups versus the vectorized *_many queries over a column of depths.
+# Usage: python benchmarks/bench_profile.py [layers] [depths]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.core import SoilProfile
+from soilwind.factors import FACTORS
+
+
+def make_profile(layers, seed=0):
+    rng = np.random.default_rng(seed)
+    return SoilProfile(rng.choice(FACTORS.soils.names, layers), rng.uniform(0.2, 3.0, layers),
+                       rng.uniform(50, 500, layers), water_table_depth=rng.uniform(1, 10))
+
+
+def main():
+    layers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    start = time.perf_counter()
+    profile = make_profile(layers)
+    build = time.perf_counter() - start
+    depths = np.random.default_rng(1).uniform(0, profile.total_depth, n)
+
+    sample = depths[:100_000].tolist()
+    start = time.perf_counter()
+    scalar = [profile.allowable_bearing_capacity(depth) for depth in sample]
+    scalar_time = (time.perf_counter() - start) * n / len(sample)
+
+    start = time.perf_counter()
+    capacity = profile.allowable_bearing_capacity_many(depths)
+    layer = profile.layers_at(depths)
+    vector_time = time.perf_counter() - start
+
+    assert np.allclose(capacity[:len(scalar)], scalar)
+    print(f"{layers} layers built in {build * 1000:.2f} ms")
+    print(f"scalar queries:     {scalar_time:8.3f} s for {n:,} depths (extrapolated from {len(sample):,})")
+    print(f"vectorized queries: {vector_time:8.3f} s for {n:,} depths ({n / vector_time:,.0f} depths/s), "
+          f"deepest layer hit {layer.max()}")
+
+
+if __name__ == '__main__':
+    main()
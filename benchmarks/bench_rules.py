@@ -0,0 +1,69 @@
+# Warning rule evaluation over one batch of soil results as the rule count
+# grows: the compiled rule set against one vectorized comparison per rule,
+# and the built-in rules against SoilAnalysisBatch.warning_flags.
+# Usage: python benchmarks/bench_rules.py [rows]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_soil_batch import make_rows
+from soilwind.rules import OPERATORS, SOIL_COLUMNS, Rule, RuleSet, default_rules, soil_columns
+from soilwind.soil_batch import SoilAnalysisBatch
+
+THRESHOLDS = (0.005, 0.01, 0.02, 1, 1.5, 2, 3, 5, 50, 100, 150, 200, 300)
+COMPARISONS = {'<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal}
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def random_rules(count, columns, rng):
+    return [Rule(f'rule {i}', columns[rng.integers(len(columns))], OPERATORS[rng.integers(len(OPERATORS))],
+                 float(rng.choice(THRESHOLDS)) * rng.uniform(0.5, 2)) for i in range(count)]
+
+
+def per_rule(rule_set, columns):
+    flags = np.zeros(len(columns['settlement']), dtype=rule_set.dtype)
+    for bit, rule in enumerate(rule_set.rules):
+        flags |= COMPARISONS[rule.op](columns[rule.field], rule.threshold).astype(rule_set.dtype) << rule_set.dtype(bit)
+    return flags
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch = SoilAnalysisBatch(*make_rows(n))
+    result = batch.analyze()
+    columns = soil_columns(batch, result)
+
+    rule_set = default_rules()['soil']
+    assert (rule_set.evaluate(columns) == result.warnings).all()
+    seconds = best_of(lambda: batch.warning_flags(result.allowable_bearing_capacity, result.settlement,
+                                                  result.lateral_earth_pressure))
+    print(f"{'warning_flags (built-in checks)':34s} {seconds * 1e9 / n:8.2f} ns/row")
+    seconds = best_of(lambda: rule_set.evaluate(columns))
+    print(f"{'default rules':34s} {seconds * 1e9 / n:8.2f} ns/row")
+
+    rng = np.random.default_rng(0)
+    for label, fields in (('on all soil columns', SOIL_COLUMNS), ('on one column', ('allowable_bearing_capacity',))):
+        print(f"\nRandom rules {label}")
+        print(f"{'rules':>6s} {'compiled ns/row':>16s} {'per-rule ns/row':>16s}")
+        for count in (4, 8, 16, 32, 64):
+            rule_set = RuleSet('soil', random_rules(count, fields, rng))
+            assert (rule_set.evaluate(columns) == per_rule(rule_set, columns)).all()
+            compiled = best_of(lambda: rule_set.evaluate(columns))
+            naive = best_of(lambda: per_rule(rule_set, columns))
+            print(f"{count:6d} {compiled * 1e9 / n:16.2f} {naive * 1e9 / n:16.2f}")
+
+
+if __name__ == "__main__":
+    main()
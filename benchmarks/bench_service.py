@@ -0,0 +1,110 @@
+# Load test for the HTTP analysis service: concurrent keep-alive clients post
+# single soil/wind requests and the script reports p50/p99 latency, requests
+# per second and the batch sizes the service formed.
+# Starts an in-process service unless --url points at a running one.
+# Usage: python benchmarks/bench_service.py [--requests N] [--concurrency C] [--url http://127.0.0.1:8765]
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.factors import FACTORS
+from soilwind.service import AnalysisService
+
+
+def soil_request(rng):
+    return '/soil', {'soil_type': rng.choice(FACTORS.soils.names),
+                     'soil_bearing_capacity': rng.uniform(20, 500),
+                     'depth_of_soil_layer': rng.uniform(0.5, 20),
+                     'water_table_depth': rng.uniform(0.1, 15)}
+
+
+def wind_request(rng):
+    structure_type = rng.choice(FACTORS.structures.names)
+    return '/wind', {'wind_speed': rng.uniform(5, 70), 'exposure_category': rng.choice(FACTORS.exposures.names),
+                     'structural_shape': rng.choice(FACTORS.shapes.names), 'area': rng.uniform(1, 500),
+                     'structure_type': structure_type,
+                     'specific_type': rng.choice(FACTORS.specific_types_for(structure_type))}
+
+
+async def request(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(host, port, count, seed, latencies, failures):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            path, payload = (soil_request if rng.random() < 0.5 else wind_request)(rng)
+            start = time.perf_counter()
+            status = await request(reader, writer, host, path, payload)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                failures.append(status)
+    finally:
+        writer.close()
+
+
+async def run(args):
+    service = None
+    if args.url:
+        url = urlsplit(args.url)
+        host, port = url.hostname, url.port
+    else:
+        service = AnalysisService(window=args.batch_window / 1000)
+        await service.start('127.0.0.1', 0)
+        host, port = '127.0.0.1', service.port
+
+    latencies, failures = [], []
+    per_client = max(1, args.requests // args.concurrency)
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, per_client, seed, latencies, failures)
+                           for seed in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests from {args.concurrency} clients in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:,.0f} req/s), {len(failures)} failed")
+    print(f"latency p50 {statistics.median(latencies) * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+    if service is not None:
+        for path, endpoint in service.metrics()['endpoints'].items():
+            batch_size = endpoint['batch_size']
+            print(f"{path}: {batch_size['count']} batches, mean size {batch_size['mean'] or 0:.1f}, "
+                  f"max queue depth {endpoint['max_queue_depth']}")
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--batch-window', type=float, default=2.0, metavar='MS')
+    parser.add_argument('--url', help="load test a running service instead of an in-process one")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    main()
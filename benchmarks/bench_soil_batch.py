@@ -0,0 +1,56 @@
+# Throughput of SoilAnalysisBatch against the scalar SoilAnalysis loop.
+# Usage: python benchmarks/bench_soil_batch.py [rows]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.core import SoilAnalysis
+from soilwind.soil_batch import SoilAnalysisBatch
+
+SOIL_TYPES = np.array(['Clay', 'Sand', 'Silt', 'Loam'])
+
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (SOIL_TYPES[rng.integers(0, 4, n)], rng.uniform(20, 500, n),
+            rng.uniform(0.5, 20, n), rng.uniform(0.1, 10, n))
+
+
+def bench_scalar(rows, n):
+    soil_type, capacity, depth, water_table = (column[:n].tolist() for column in rows)
+    start = time.perf_counter()
+    for i in range(n):
+        analysis = SoilAnalysis(soil_type[i], capacity[i], depth[i], water_table[i])
+        analysis.calculate_soil_bearing_capacity()
+        analysis.calculate_settlement()
+        analysis.calculate_lateral_earth_pressure()
+        analysis.check_soil_bearing_capacity()
+        analysis.water_table_effect()
+    return time.perf_counter() - start
+
+
+def bench_batch(rows):
+    start = time.perf_counter()
+    SoilAnalysisBatch(*rows).analyze()
+    return time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = make_rows(n)
+    scalar_n = min(n, 100_000)
+
+    scalar = bench_scalar(rows, scalar_n)
+    batch = min(bench_batch(rows) for _ in range(3))
+
+    print(f"scalar SoilAnalysis: {scalar_n:>9} rows  {scalar:8.3f} s  {scalar_n / scalar:14,.0f} rows/s")
+    print(f"SoilAnalysisBatch:   {n:>9} rows  {batch:8.3f} s  {n / batch:14,.0f} rows/s")
+    print(f"speedup: {(n / batch) / (scalar_n / scalar):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Streaming wind load evaluation: readings per second through
+# StreamEvaluator for per-second feeds from many stations, from packed binary
+# records and from text lines, read in chunks from memory.
+# Usage: python benchmarks/bench_stream.py [stations] [seconds]
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.factors import FACTORS
+from soilwind.stream import READING, MonitoredStructures, StreamEvaluator, read_chunks, run_stream
+
+
+def make_structures(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pairs = [(structure, specific) for structure, specifics in zip(FACTORS.structures.names, FACTORS.structures.values)
+             for specific in specifics]
+    chosen = rng.integers(0, len(pairs), n)
+    return MonitoredStructures(np.arange(n), rng.choice(FACTORS.exposures.names, n),
+                               rng.choice(FACTORS.shapes.names, n), rng.uniform(1, 20, n),
+                               [pairs[i][0] for i in chosen], [pairs[i][1] for i in chosen])
+
+
+# One reading per station per second; a slowly varying mean speed with gusts
+def make_readings(stations, seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    readings = np.empty(stations * seconds, dtype=READING)
+    readings['time'] = np.repeat(1.7e9 + np.arange(seconds, dtype=np.float64), stations)
+    readings['station'] = np.tile(np.arange(stations), seconds)
+    mean = 8 + 4 * np.sin(np.arange(seconds) / 300.0)
+    readings['wind_speed'] = np.repeat(mean, stations) * rng.gamma(16, 1 / 16, stations * seconds)
+    return readings
+
+
+def run(label, structures, data, format):
+    evaluator = StreamEvaluator(structures)
+    start = time.perf_counter()
+    run_stream(evaluator, read_chunks(io.BytesIO(data), format), lambda transitions: None)
+    elapsed = time.perf_counter() - start
+    print(f"{label:10s} {evaluator.readings:>12,} readings {elapsed:8.2f} s "
+          f"{evaluator.readings / elapsed / 1e6:6.2f} M readings/s  {evaluator.transitions:,} state changes")
+
+
+def main():
+    stations = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    structures = make_structures(stations)
+    readings = make_readings(stations, seconds)
+    run("binary", structures, readings.tobytes(), 'binary')
+    text = ''.join(f"{t:.0f},{s},{v:.2f}\n" for t, s, v in readings.tolist()).encode()
+    run("text", structures, text, 'text')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# Throughput of the parameter sweep engine on a 10^7-point Cartesian grid and
+# a 10^7-sample Latin hypercube over the soil and foundation parameters.
+# Usage: python benchmarks/bench_sweep.py [points] [chunk_size]
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.sweep import DEFAULT_CHUNK_SIZE, CartesianGrid, LatinHypercube, run_sweep
+
+RANGES = {'soil_bearing_capacity': (20, 500), 'depth_of_soil_layer': (0.5, 5), 'water_table_depth': (0.5, 5),
+          'applied_pressure': (50, 400), 'foundation_width': (0.5, 3), 'young_modulus': (1e3, 1e7),
+          'poisson_ratio': (0.1, 0.45), 'friction_angle': (0, 45)}
+
+
+def main():
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_CHUNK_SIZE
+
+    steps = max(2, math.ceil(points ** (1 / len(RANGES))))
+    grid = CartesianGrid({name: np.linspace(low, high, steps) for name, (low, high) in RANGES.items()})
+    lhs = LatinHypercube(RANGES, points, seed=0)
+    for label, design in (("grid", grid), ("latin hypercube", lhs)):
+        start = time.perf_counter()
+        result = run_sweep(design, 'Clay', chunk_size=chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"{label:16s} {result.points:>12,} points in {elapsed:6.2f} s ({result.points / elapsed:,.0f} points/s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# Broadcast sweep of a building portfolio against a range of wind speeds.
+# Usage: python benchmarks/bench_wind_sweep.py [buildings] [speeds]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind.factors import FACTORS
+from soilwind.wind_batch import STATUS_NAMES, wind_load_sweep
+
+
+def make_portfolio(n, seed=0):
+    rng = np.random.default_rng(seed)
+    pairs = [(structure, specific) for structure, specifics in zip(FACTORS.structures.names, FACTORS.structures.values)
+             for specific in specifics]
+    picks = rng.integers(0, len(pairs), n)
+    return (np.array(FACTORS.exposures.names)[rng.integers(0, len(FACTORS.exposures), n)],
+            np.array(FACTORS.shapes.names)[rng.integers(0, len(FACTORS.shapes), n)],
+            rng.uniform(1, 50, n),
+            np.array([pairs[i][0] for i in picks]),
+            np.array([pairs[i][1] for i in picks]))
+
+
+def main():
+    buildings = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    speeds = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    exposure, shape, area, structure, specific = (column[:, None] for column in make_portfolio(buildings))
+    wind_speed = np.linspace(1, 70, speeds)
+
+    start = time.perf_counter()
+    result = wind_load_sweep(wind_speed, exposure, shape, area, structure, specific)
+    elapsed = time.perf_counter() - start
+
+    cells = result.wind_load.size
+    print(f"{buildings} buildings x {speeds} speeds = {cells:,} cells in {elapsed:.3f} s ({cells / elapsed:,.0f} cells/s)")
+    for code, count in enumerate(np.bincount(result.status.ravel(), minlength=len(STATUS_NAMES))):
+        print(f"  {STATUS_NAMES[code]:<8} {count:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# Benchmark suite for the calculation and history logging hot paths.
+# Every case runs at each bulk size (calls, or rows for the batch engines) and
+# is reported as time per call; results can be saved as a JSON baseline and
+# later runs compared against it, failing when a case slows down by more than
+# the allowed threshold.
+# Usage: python benchmarks/suite.py [--sizes 1000,100000,1000000] [--only PATTERN]
+#                                   [--save FILE | --compare FILE [--threshold 0.25]]
+import argparse
+import fnmatch
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from soilwind import core, history
+from soilwind.factors import FACTORS
+from soilwind.history_logger import HistoryLogger
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+SOIL_TYPES = FACTORS.soils.names
+LIMIT_PAIRS = [(structure, specific) for structure, specifics in zip(FACTORS.structures.names, FACTORS.structures.values)
+               for specific in specifics]
+
+
+def soil_samples(n):
+    return [core.SoilAnalysis(SOIL_TYPES[i % len(SOIL_TYPES)], 50 + i % 400, 1 + i % 7, 0.5 + i % 5) for i in range(n)]
+
+
+# Each case builds its inputs for n calls and returns the callable to time
+def soil_method(name):
+    def setup(n):
+        samples = soil_samples(n)
+        method = getattr(core.SoilAnalysis, name)
+        return lambda: [method(sample) for sample in samples]
+    return setup
+
+
+def soil_report(n):
+    samples = soil_samples(n)
+    return lambda: [sample.report() for sample in samples]
+
+
+def display_analysis(n):
+    from Calculator import SoilAnalysis
+
+    samples = [SoilAnalysis(sample.soil_type, sample.soil_bearing_capacity, sample.depth_of_soil_layer,
+                            sample.water_table_depth) for sample in soil_samples(n)]
+
+    def run():
+        with redirect_stdout(io.StringIO()):
+            for sample in samples:
+                sample.display_analysis()
+        history.soil_history.flush()
+    return run
+
+
+def wind_load(n):
+    inputs = [(0.613 * (5 + i % 60)**2, 1.0 + (i % 5) / 10, 1.3, 1 + i % 90) for i in range(n)]
+    return lambda: [core.calculate_wind_load(*args) for args in inputs]
+
+
+def limit_lookup(n):
+    pairs = [LIMIT_PAIRS[i % len(LIMIT_PAIRS)] for i in range(n)]
+    return lambda: [FACTORS.acceptable_limit(structure, specific) for structure, specific in pairs]
+
+
+def evaluate_wind(n):
+    inputs = [(5 + i % 60, FACTORS.exposures.names[i % 6], 'rectangular', 1 + i % 90, *LIMIT_PAIRS[i % len(LIMIT_PAIRS)])
+              for i in range(n)]
+    return lambda: [core.evaluate_wind_load(*args) for args in inputs]
+
+
+# Logging cases time queueing plus the flush to disk
+def log_soil(n):
+    samples = soil_samples(n)
+    results = [sample.results() for sample in samples]
+
+    def run():
+        for sample, result in zip(samples, results):
+            history.log_soil_analysis_to_csv(sample, result)
+        history.soil_history.flush()
+    return run
+
+
+def log_wind(n):
+    rows = [(1000.0 + i, *LIMIT_PAIRS[i % len(LIMIT_PAIRS)], 3000) for i in range(n)]
+
+    def run():
+        for row in rows:
+            history.log_wind_load_to_csv(*row)
+        history.wind_history.flush()
+    return run
+
+
+def soil_batch(n):
+    import numpy as np
+    from soilwind.soil_batch import SoilAnalysisBatch
+
+    samples = soil_samples(n)
+    columns = [np.array([getattr(sample, field) for sample in samples])
+               for field in ('soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth')]
+    return lambda: SoilAnalysisBatch(*columns).analyze()
+
+
+def wind_batch(n):
+    import numpy as np
+    from soilwind.wind_batch import wind_load_sweep
+
+    rng = np.random.default_rng(0)
+    pairs = np.array(LIMIT_PAIRS)[rng.integers(0, len(LIMIT_PAIRS), n)]
+    columns = (rng.uniform(5, 60, n), np.array(FACTORS.exposures.names)[rng.integers(0, 6, n)], 'rectangular',
+               rng.uniform(1, 90, n), pairs[:, 0], pairs[:, 1])
+    return lambda: wind_load_sweep(*columns)
+
+
+CASES = {
+    'soil.check_soil_bearing_capacity': soil_method('check_soil_bearing_capacity'),
+    'soil.calculate_soil_bearing_capacity': soil_method('calculate_soil_bearing_capacity'),
+    'soil.calculate_settlement': soil_method('calculate_settlement'),
+    'soil.calculate_lateral_earth_pressure': soil_method('calculate_lateral_earth_pressure'),
+    'soil.water_table_effect': soil_method('water_table_effect'),
+    'soil.report': soil_report,
+    'soil.display_analysis': display_analysis,
+    'wind.calculate_wind_load': wind_load,
+    'wind.acceptable_limit': limit_lookup,
+    'wind.evaluate_wind_load': evaluate_wind,
+    'history.log_soil_analysis_to_csv': log_soil,
+    'history.log_wind_load_to_csv': log_wind,
+    'batch.soil_analysis': soil_batch,
+    'batch.wind_load_sweep': wind_batch,
+}
+
+
+def measure(setup, n, repeats):
+    run = setup(n)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_suite(sizes, only=None, repeats=3):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        # Point the history writers at scratch files for the duration
+        saved = history.soil_history, history.wind_history
+        history.soil_history = HistoryLogger(os.path.join(directory, 'soil.csv'), history.SOIL_HISTORY_HEADER)
+        history.wind_history = HistoryLogger(os.path.join(directory, 'wind.csv'), history.WIND_HISTORY_HEADER)
+        try:
+            for name, setup in CASES.items():
+                if only and not any(fnmatch.fnmatch(name, pattern) for pattern in only):
+                    continue
+                for n in sizes:
+                    seconds = measure(setup, n, repeats if n < 1_000_000 else 1)
+                    results[f"{name}@{n}"] = seconds / n * 1e9
+                    print(f"{name:40s} {n:>9,}  {seconds * 1000:10.2f} ms  {seconds / n * 1e9:10.1f} ns/call",
+                          flush=True)
+        finally:
+            history.soil_history.close()
+            history.wind_history.close()
+            history.soil_history, history.wind_history = saved
+    return results
+
+
+def environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {'python': platform.python_version(), 'numpy': numpy_version, 'machine': platform.machine(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+
+
+# Cases slower than baseline * (1 + threshold); cases missing from either side are skipped
+def regressions(results, baseline, threshold):
+    slower = []
+    for key, value in results.items():
+        reference = baseline.get(key)
+        if reference and value > reference * (1 + threshold):
+            slower.append((key, reference, value))
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the calculation and history logging hot paths and compare "
+                                                 "them against a saved JSON baseline.")
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help="comma separated bulk sizes (default: %(default)s)")
+    parser.add_argument('--only', action='append', metavar='PATTERN', help="run only cases matching a glob")
+    parser.add_argument('--repeats', type=int, default=3, help="best of this many runs below 1M calls")
+    parser.add_argument('--save', nargs='?', const=DEFAULT_BASELINE, metavar='FILE', help="write a JSON baseline")
+    parser.add_argument('--compare', nargs='?', const=DEFAULT_BASELINE, metavar='FILE',
+                        help="compare against a JSON baseline and exit 1 on regressions")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = run_suite([int(n) for n in args.sizes.split(',')], args.only, args.repeats)
+
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'environment': environment(), 'results': results}, file, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        slower = regressions(results, baseline['results'], args.threshold)
+        print(f"\nCompared with {args.compare} ({baseline['environment'].get('date')}), "
+              f"threshold +{args.threshold:.0%}:")
+        for key, reference, value in slower:
+            print(f"  REGRESSION {key}: {reference:.1f} -> {value:.1f} ns/call ({value / reference - 1:+.0%})")
+        if slower:
+            sys.exit(1)
+        print("  no regressions")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import importlib
+
+# Soil analysis and wind load calculations as an importable package.
+#
+# Importing soilwind loads nothing but this file. The pure math in
+# soilwind.core (and the factor tables it needs) is cheap to import on its
+# own; the NumPy batch engines, the history writers and the tkinter GUI are
+# only imported when one of their names is first used, e.g.
+# soilwind.SoilAnalysis pulls in core, soilwind.wind_load_sweep pulls in NumPy.
+
+_EXPORTS = {
+    'FACTORS': 'factors',
+    'SoilAnalysis': 'core',
+    'SoilProfile': 'core',
+    'SoilResult': 'core',
+    'calculate_wind_load': 'core',
+    'evaluate_wind_load': 'core',
+    'soil_warning_flags': 'core',
+    'wind_load_status': 'core',
+    'SoilAnalysisBatch': 'soil_batch',
+    'analyze_soil_batch': 'soil_batch',
+    'wind_load_sweep': 'wind_batch',
+    'parallel_soil_analysis': 'parallel',
+    'parallel_wind_load_sweep': 'parallel',
+    'cached_soil_evaluation': 'result_cache',
+    'cached_wind_evaluation': 'result_cache',
+    'run_batch': 'bulk_input',
+    'CartesianGrid': 'sweep',
+    'LatinHypercube': 'sweep',
+    'run_sweep': 'sweep',
+    'wind_risk': 'montecarlo',
+    'GridScreening': 'grid',
+    'SQLiteHistoryStore': 'history_store',
+    'HistoryAnalytics': 'analytics',
+    'HistoryReader': 'history_reader',
+    'ArchiveWriter': 'archive',
+    'read_archive': 'archive',
+    'StreamEvaluator': 'stream',
+    'RuleFile': 'rules',
+    'load_rules': 'rules',
+}
+
+_SUBMODULES = {'analytics', 'archive', 'bulk_input', 'core', 'depgraph', 'factors', 'grid', 'gui', 'gui_tasks',
+               'history', 'history_logger', 'history_reader', 'history_store', 'instrument', 'montecarlo', 'parallel',
+               'result_cache', 'rules', 'service', 'soil_batch', 'stream', 'sweep', 'wind_batch'}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS) | _SUBMODULES)
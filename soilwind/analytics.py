@@ -0,0 +1,371 @@
+import argparse
+import csv
+import json
+import math
+import os
+import time
+
+from .core import EXCEED, SOIL_WARNING_NAMES, STATUS_NAMES, soil_warning_flags, wind_load_status
+
+# Dashboard figures over the CSV analysis history: warning rates per soil
+# type, wind load utilization (load / acceptable limit) distributions per
+# structure type and daily counts.
+#
+# The aggregates live in a small JSON sidecar together with the byte offset
+# up to which each history file has been read, so refresh() only parses the
+# rows appended since the last refresh. The bytes just before that offset are
+# kept as a fingerprint; if the file was truncated or replaced the aggregates
+# for it are rebuilt from the start.
+#
+# The CSV rows carry no timestamp: rows picked up by a refresh are counted on
+# the day the file was last modified, so daily counts are exact when the
+# history is refreshed at least once a day (e.g. by the dashboard itself).
+
+DEFAULT_SIDECAR = 'analysis_history.analytics.json'
+SIDECAR_VERSION = 1
+FINGERPRINT_BYTES = 64
+READ_SIZE = 1 << 20
+RELATIVE_ACCURACY = 0.01   # of the quantile sketches
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+# Count, sum, min and max of a stream of values
+class Summary:
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self, count=0, total=0.0, min=None, max=None):
+        self.count = count
+        self.total = total
+        self.min = min
+        self.max = max
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_json(self):
+        return [self.count, self.total, self.min, self.max]
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(*data)
+
+
+# Streaming quantile sketch over positive values with logarithmic buckets:
+# every quantile is within RELATIVE_ACCURACY of the exact one, and the size
+# depends only on the range of the values, not on how many there are.
+# Zero and negative values share one bucket reported as 0, +inf goes to an
+# overflow bucket reported as inf, and NaN is not counted.
+class QuantileSketch:
+    __slots__ = ('buckets', 'zeros', 'overflow', 'count', '_log_gamma')
+
+    def __init__(self, buckets=None, zeros=0, overflow=0, relative_accuracy=RELATIVE_ACCURACY):
+        self.buckets = buckets or {}
+        self.zeros = zeros
+        self.overflow = overflow
+        self.count = zeros + overflow + sum(self.buckets.values())
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+
+    def add(self, value):
+        if math.isnan(value):
+            return
+        self.count += 1
+        if value == math.inf:
+            self.overflow += 1
+        elif value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + 1
+        else:
+            self.zeros += 1
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint (in relative terms) of the bucket (gamma^(key-1), gamma^key]
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        if self.overflow:
+            return math.inf
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def to_json(self):
+        return {'zeros': self.zeros, 'overflow': self.overflow,
+                'buckets': {str(key): count for key, count in self.buckets.items()}}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({int(key): count for key, count in data['buckets'].items()}, data['zeros'], data.get('overflow', 0))
+
+
+class SoilTypeAggregate:
+    __slots__ = ('count', 'warnings', 'allowable_bearing_capacity', 'settlement')
+
+    def __init__(self, count=0, warnings=None, allowable_bearing_capacity=None, settlement=None):
+        self.count = count
+        self.warnings = warnings or [0] * len(SOIL_WARNING_NAMES)
+        self.allowable_bearing_capacity = allowable_bearing_capacity or Summary()
+        self.settlement = settlement or Summary()
+
+    def add(self, allowable_bearing_capacity, settlement, lateral_pressure, water_table_depth):
+        self.count += 1
+        flags = soil_warning_flags(allowable_bearing_capacity, settlement, lateral_pressure, water_table_depth)
+        if flags:
+            for i, (flag, _) in enumerate(SOIL_WARNING_NAMES):
+                if flags & flag:
+                    self.warnings[i] += 1
+        self.allowable_bearing_capacity.add(allowable_bearing_capacity)
+        self.settlement.add(settlement)
+
+    def to_json(self):
+        return {'count': self.count, 'warnings': self.warnings,
+                'allowable_bearing_capacity': self.allowable_bearing_capacity.to_json(),
+                'settlement': self.settlement.to_json()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['count'], data['warnings'], Summary.from_json(data['allowable_bearing_capacity']),
+                   Summary.from_json(data['settlement']))
+
+
+class StructureTypeAggregate:
+    __slots__ = ('count', 'statuses', 'wind_load', 'utilization', 'utilization_sketch')
+
+    def __init__(self, count=0, statuses=None, wind_load=None, utilization=None, utilization_sketch=None):
+        self.count = count
+        self.statuses = statuses or [0] * len(STATUS_NAMES)
+        self.wind_load = wind_load or Summary()
+        self.utilization = utilization or Summary()
+        self.utilization_sketch = utilization_sketch or QuantileSketch()
+
+    def add(self, wind_load, acceptable_limits):
+        self.count += 1
+        self.statuses[wind_load_status(wind_load, acceptable_limits)] += 1
+        self.wind_load.add(wind_load)
+        if acceptable_limits > 0:
+            utilization = wind_load / acceptable_limits
+            self.utilization.add(utilization)
+            self.utilization_sketch.add(utilization)
+
+    def to_json(self):
+        return {'count': self.count, 'statuses': self.statuses, 'wind_load': self.wind_load.to_json(),
+                'utilization': self.utilization.to_json(), 'utilization_sketch': self.utilization_sketch.to_json()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data['count'], data['statuses'], Summary.from_json(data['wind_load']),
+                   Summary.from_json(data['utilization']), QuantileSketch.from_json(data['utilization_sketch']))
+
+
+def _fingerprint(file, offset):
+    start = max(0, offset - FINGERPRINT_BYTES)
+    file.seek(start)
+    return file.read(offset - start).hex()
+
+
+# Incrementally maintained aggregates over soil_analysis_history.csv and
+# wind_load_history.csv (see the module comment)
+class HistoryAnalytics:
+    def __init__(self, soil_path='soil_analysis_history.csv', wind_path='wind_load_history.csv',
+                 sidecar=DEFAULT_SIDECAR):
+        self.paths = {'soil': soil_path, 'wind': wind_path}
+        self.sidecar = sidecar
+        self.daily = {}
+        self._reset('soil')
+        self._reset('wind')
+        self.load()
+
+    # Forgets everything read from one history file; its rows are also taken
+    # out of the daily counts, which then count the re-read rows again
+    def _reset(self, kind):
+        for counts in self.daily.values():
+            counts[kind] = 0
+        if kind == 'soil':
+            self.soil = {}
+            self.soil_skipped = 0
+            self.soil_position = (0, '')
+        else:
+            self.wind = {}
+            self.wind_skipped = 0
+            self.wind_position = (0, '')
+
+    def load(self):
+        try:
+            with open(self.sidecar) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        if data.get('version') != SIDECAR_VERSION:
+            return
+        self.soil = {name: SoilTypeAggregate.from_json(value) for name, value in data['soil'].items()}
+        self.wind = {name: StructureTypeAggregate.from_json(value) for name, value in data['wind'].items()}
+        self.soil_skipped, self.wind_skipped = data['skipped']
+        self.soil_position = tuple(data['positions']['soil'])
+        self.wind_position = tuple(data['positions']['wind'])
+        self.daily = data['daily']
+
+    def save(self):
+        data = {'version': SIDECAR_VERSION,
+                'positions': {'soil': self.soil_position, 'wind': self.wind_position},
+                'skipped': [self.soil_skipped, self.wind_skipped],
+                'soil': {name: aggregate.to_json() for name, aggregate in self.soil.items()},
+                'wind': {name: aggregate.to_json() for name, aggregate in self.wind.items()},
+                'daily': self.daily}
+        temporary = f'{self.sidecar}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(data, file, separators=(',', ':'))
+        os.replace(temporary, self.sidecar)
+
+    # Reads the rows appended since the last refresh, updates the aggregates
+    # and saves the sidecar. Returns the number of new (soil, wind) rows.
+    def refresh(self, save=True):
+        new_rows = (self._refresh('soil'), self._refresh('wind'))
+        if save:
+            self.save()
+        return new_rows
+
+    def _refresh(self, kind):
+        path = self.paths[kind]
+        try:
+            file = open(path, 'rb')
+        except FileNotFoundError:
+            return 0
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            offset, fingerprint = getattr(self, f'{kind}_position')
+            if offset > size or _fingerprint(file, offset) != fingerprint:
+                self._reset(kind)
+                offset = 0
+            day = time.strftime('%Y-%m-%d', time.localtime(os.path.getmtime(path)))
+            add_row = self._add_soil_row if kind == 'soil' else self._add_wind_row
+            file.seek(offset)
+            rows = 0
+            remainder = b''
+            while True:
+                data = file.read(READ_SIZE)
+                if not data:
+                    break
+                data = remainder + data
+                # Only complete lines; a row the writer is still appending waits for the next refresh
+                end = data.rfind(b'\n') + 1
+                remainder = data[end:]
+                for row in csv.reader(data[:end].decode().splitlines()):
+                    rows += add_row(row)
+                offset += end
+            setattr(self, f'{kind}_position', (offset, _fingerprint(file, offset)))
+        if rows:
+            counts = self.daily.setdefault(day, {'soil': 0, 'wind': 0})
+            counts[kind] += rows
+        return rows
+
+    def _add_soil_row(self, row):
+        try:
+            values = [float(value) for value in row[1:7]]
+            _, _, water_table_depth, allowable_bearing_capacity, settlement, lateral_pressure = values
+        except ValueError:
+            # The header, or a row that is not a soil analysis
+            self.soil_skipped += 1
+            return 0
+        aggregate = self.soil.get(row[0])
+        if aggregate is None:
+            aggregate = self.soil[row[0]] = SoilTypeAggregate()
+        aggregate.add(allowable_bearing_capacity, settlement, lateral_pressure, water_table_depth)
+        return 1
+
+    def _add_wind_row(self, row):
+        try:
+            wind_load, acceptable_limits = float(row[0]), float(row[3])
+        except (ValueError, IndexError):
+            self.wind_skipped += 1
+            return 0
+        aggregate = self.wind.get(row[1])
+        if aggregate is None:
+            aggregate = self.wind[row[1]] = StructureTypeAggregate()
+        aggregate.add(wind_load, acceptable_limits)
+        return 1
+
+    # {soil type: {warning: share of that soil type's analyses}}
+    def soil_warning_rates(self):
+        return {name: {warning: count / aggregate.count
+                       for (_, warning), count in zip(SOIL_WARNING_NAMES, aggregate.warnings)}
+                for name, aggregate in self.soil.items()}
+
+    # {structure type: {quantile: utilization}}
+    def utilization_quantiles(self, quantiles=DEFAULT_QUANTILES):
+        return {name: {q: aggregate.utilization_sketch.quantile(q) for q in quantiles}
+                for name, aggregate in self.wind.items()}
+
+    def daily_counts(self):
+        return dict(sorted(self.daily.items()))
+
+    def summary(self, quantiles=DEFAULT_QUANTILES):
+        warning_rates = self.soil_warning_rates()
+        utilization_quantiles = self.utilization_quantiles(quantiles)
+        return {
+            'soil': {name: {'count': aggregate.count,
+                            'warning_rates': warning_rates[name],
+                            'mean_allowable_bearing_capacity': aggregate.allowable_bearing_capacity.mean,
+                            'max_settlement': aggregate.settlement.max}
+                     for name, aggregate in self.soil.items()},
+            'wind': {name: {'count': aggregate.count,
+                            'statuses': dict(zip(STATUS_NAMES, aggregate.statuses)),
+                            'utilization': {'mean': aggregate.utilization.mean, 'max': aggregate.utilization.max,
+                                            **{f'p{q * 100:g}': value for q, value
+                                               in utilization_quantiles[name].items()}}}
+                     for name, aggregate in self.wind.items()},
+            'daily': self.daily_counts(),
+        }
+
+    def report(self, quantiles=DEFAULT_QUANTILES):
+        lines = ["Soil analyses by soil type:"]
+        for name, aggregate in sorted(self.soil.items()):
+            rates = ", ".join(f"{warning} {count / aggregate.count:.1%}"
+                              for (_, warning), count in zip(SOIL_WARNING_NAMES, aggregate.warnings) if count)
+            lines.append(f"  {name}: {aggregate.count:,} analyses; warnings: {rates or 'none'}")
+        lines.append("Wind load utilization by structure type:")
+        utilization_quantiles = self.utilization_quantiles(quantiles)
+        for name, aggregate in sorted(self.wind.items()):
+            values = utilization_quantiles[name]
+            lines.append(f"  {name}: {aggregate.count:,} calculations, "
+                         + ", ".join(f"p{q * 100:g} {value:.3f}" for q, value in values.items() if value is not None)
+                         + f", exceeded {aggregate.statuses[EXCEED] / aggregate.count:.1%}")
+        lines.append("Daily counts:")
+        for day, counts in self.daily_counts().items():
+            lines.append(f"  {day}: {counts['soil']:,} soil, {counts['wind']:,} wind")
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Refresh and print the analysis history aggregates.")
+    parser.add_argument('--soil', default='soil_analysis_history.csv')
+    parser.add_argument('--wind', default='wind_load_history.csv')
+    parser.add_argument('--sidecar', default=DEFAULT_SIDECAR)
+    parser.add_argument('--json', action='store_true', help="print the aggregates as JSON")
+    args = parser.parse_args(argv)
+
+    analytics = HistoryAnalytics(args.soil, args.wind, args.sidecar)
+    start = time.perf_counter()
+    soil_rows, wind_rows = analytics.refresh()
+    elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(analytics.summary(), indent=2))
+    else:
+        print(analytics.report())
+        print(f"\nRefreshed {soil_rows:,} new soil and {wind_rows:,} new wind rows in {elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+import argparse
+import csv
+import json
+import struct
+import zlib
+
+import numpy as np
+
+from .core import (CAUTION, CAUTION_RATIO, EXCEED, SAFE, WARN_HIGH_WATER_TABLE, WATER_TABLE_ADEQUATE,
+                   WATER_TABLE_TOO_HIGH)
+from .factors import FACTORS
+from .history import SOIL_HISTORY_HEADER, WIND_HISTORY_HEADER
+from .soil_batch import SoilAnalysisBatch
+
+try:
+    import zstandard
+except ImportError:   # optional, only needed for compression='zstd'
+    zstandard = None
+
+# Compact binary archive of soil or wind results: fixed-width records with
+# float32 inputs, float64 computed values, uint8 category codes and the
+# warning bitmask, about 40 bytes a row against ~200 for the CSV history.
+#
+# Layout: a 32-byte header (magic, format version, compression, metadata
+# size, row count, metadata offset), the records, then a JSON trailer with
+# the kind, the record fields and the category names behind every code. The
+# trailer is written on close(), so the category tables can grow while rows
+# are written: names the factor tables do not know (e.g. a soil type typed
+# into the GUI) get the next free code in that file. Uncompressed records are
+# memory-mapped on load; compressed ones are stored in blocks of block_rows,
+# each prefixed with its row count and compressed size.
+
+MAGIC = b'SWARCH\r\n'
+VERSION = 1
+HEADER = struct.Struct('<8sHHIQQ')
+BLOCK_HEADER = struct.Struct('<II')
+BLOCK_ROWS = 65_536
+EXTENSION = '.swr'
+
+MISSING = 255   # category code for a value that was not recorded
+
+SOIL_RECORD = np.dtype([('soil_type', 'u1'), ('warnings', 'u1'), ('soil_bearing_capacity', '<f4'),
+                        ('depth_of_soil_layer', '<f4'), ('water_table_depth', '<f4'),
+                        ('allowable_bearing_capacity', '<f8'), ('settlement', '<f8'),
+                        ('lateral_earth_pressure', '<f8')])
+# The wind history only records the load, structure and limit; speed, area,
+# exposure and shape are NaN / MISSING for rows converted from it
+WIND_RECORD = np.dtype([('exposure_category', 'u1'), ('structural_shape', 'u1'), ('structure_type', 'u1'),
+                        ('specific_type', 'u1'), ('status', 'u1'), ('wind_speed', '<f4'), ('area', '<f4'),
+                        ('wind_load', '<f8'), ('acceptable_limits', '<f4')])
+RECORDS = {'soil': SOIL_RECORD, 'wind': WIND_RECORD}
+
+CATEGORIES = {'soil': {'soil_type': FACTORS.soils},
+              'wind': {'exposure_category': FACTORS.exposures, 'structural_shape': FACTORS.shapes,
+                       'structure_type': FACTORS.structures, 'specific_type': FACTORS.specific_types}}
+
+COMPRESSIONS = (None, 'zlib', 'zstd')
+DEFAULT_LEVELS = {'zlib': 6, 'zstd': 3}
+
+
+def _compressor(compression, level):
+    if compression == 'zlib':
+        return lambda data: zlib.compress(data, level)
+    if zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdCompressor(level=level).compress
+
+
+def _decompressor(compression):
+    if compression == 'zlib':
+        return zlib.decompress
+    if zstandard is None:
+        raise ValueError("This archive is zstd-compressed; reading it needs the zstandard package")
+    return zstandard.ZstdDecompressor().decompress
+
+
+# Appends records to a new archive. write() takes a structured array of the
+# kind's record dtype, see soil_records() and wind_records().
+class ArchiveWriter:
+    def __init__(self, path, kind, compression=None, level=None, block_rows=BLOCK_ROWS):
+        if kind not in RECORDS:
+            raise ValueError(f"Unknown result kind {kind!r}, expected 'soil' or 'wind'")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression {compression!r}, expected zlib or zstd")
+        self.path = path
+        self.kind = kind
+        self.dtype = RECORDS[kind]
+        self.compression = compression
+        self.block_rows = block_rows
+        self.rows = 0
+        self.categories = {field: list(table.names) for field, table in CATEGORIES[kind].items()}
+        self._codes = {field: {name: code for code, name in enumerate(names)}
+                       for field, names in self.categories.items()}
+        self._compress = _compressor(compression, level or DEFAULT_LEVELS[compression]) if compression else None
+        self._pending = []
+        self._pending_rows = 0
+        self._file = open(path, 'wb')
+        self._file.write(HEADER.pack(MAGIC, VERSION, COMPRESSIONS.index(compression), 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            # Left without a trailer, so readers reject it as incomplete
+            self._file.close()
+            self._file = None
+
+    # Category codes for an array of names (or of FACTORS codes, -1 for
+    # unknown); new names are added to this file's table
+    def encode(self, field, values, normalize=None):
+        values = np.asarray(values)
+        if values.dtype.kind in 'iu':
+            return np.where(values < 0, MISSING, values).astype(np.uint8)
+        unique, inverse = np.unique(values, return_inverse=True)
+        lookup = np.array([self._code(field, str(value), normalize) for value in unique.tolist()], dtype=np.uint8)
+        return lookup[inverse].reshape(values.shape)
+
+    def _code(self, field, name, normalize):
+        if normalize is not None:
+            name = normalize(name)
+        code = self._codes[field].get(name)
+        if code is None:
+            code = len(self.categories[field])
+            if code >= MISSING:
+                raise ValueError(f"Too many distinct {field} values for one archive (at most {MISSING})")
+            self.categories[field].append(name)
+            self._codes[field][name] = code
+        return code
+
+    def write(self, records):
+        records = np.ascontiguousarray(records, dtype=self.dtype).reshape(-1)
+        self.rows += len(records)
+        if self._compress is None:
+            self._file.write(records.data)
+            return
+        self._pending.append(records)
+        self._pending_rows += len(records)
+        if self._pending_rows >= self.block_rows:
+            self._write_blocks(final=False)
+
+    def _write_blocks(self, final):
+        records = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        full = len(records) if final else len(records) - len(records) % self.block_rows
+        for start in range(0, full, self.block_rows):
+            block = records[start:start + self.block_rows]
+            data = self._compress(block.data)
+            self._file.write(BLOCK_HEADER.pack(len(block), len(data)))
+            self._file.write(data)
+        self._pending = [records[full:]] if full < len(records) else []
+        self._pending_rows = len(records) - full
+
+    def close(self):
+        if self._file is None:
+            return
+        if self._pending_rows:
+            self._write_blocks(final=True)
+        metadata = json.dumps({'kind': self.kind, 'fields': self.dtype.descr, 'categories': self.categories,
+                               'block_rows': self.block_rows}).encode()
+        metadata_offset = self._file.tell()
+        self._file.write(metadata)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, COMPRESSIONS.index(self.compression), len(metadata),
+                                     self.rows, metadata_offset))
+        self._file.close()
+        self._file = None
+
+
+# A loaded archive. records is a structured array: a read-only memory map of
+# the file for uncompressed archives, decompressed into memory otherwise.
+class ResultArchive:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size or not header.startswith(MAGIC):
+                raise ValueError(f"{path}: not a result archive")
+            _, version, compression, metadata_size, rows, metadata_offset = HEADER.unpack(header)
+            if version > VERSION:
+                raise ValueError(f"{path}: archive format version {version} is newer than this reader ({VERSION})")
+            if metadata_offset == 0:
+                raise ValueError(f"{path}: incomplete archive (the writer was not closed)")
+            file.seek(metadata_offset)
+            metadata = json.loads(file.read(metadata_size))
+            self.kind = metadata['kind']
+            self.categories = metadata['categories']
+            self.compression = COMPRESSIONS[compression]
+            dtype = np.dtype([tuple(field) for field in metadata['fields']])
+            if self.compression is None:
+                self.records = np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(rows,)) \
+                    if rows else np.empty(0, dtype=dtype)
+            else:
+                self.records = self._read_blocks(file, dtype, rows)
+
+    def _read_blocks(self, file, dtype, rows):
+        decompress = _decompressor(self.compression)
+        records = np.empty(rows, dtype=dtype)
+        file.seek(HEADER.size)
+        start = 0
+        while start < rows:
+            block_rows, size = BLOCK_HEADER.unpack(file.read(BLOCK_HEADER.size))
+            records[start:start + block_rows] = np.frombuffer(decompress(file.read(size)), dtype=dtype)
+            start += block_rows
+        return records
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, field):
+        return self.records[field]
+
+    # Names for a category column; unrecorded values come back as missing
+    def names(self, field, missing='', start=0, stop=None):
+        return self.lookup(field, missing)[self.records[field][start:stop]]
+
+    # Name of every possible code, to index with a column of codes
+    def lookup(self, field, missing=''):
+        names = self.categories[field]
+        return np.array(names + [missing] * (MISSING + 1 - len(names)))
+
+    def high_water_table(self):
+        return (self.records['warnings'] & WARN_HIGH_WATER_TABLE) != 0
+
+
+def read_archive(path):
+    return ResultArchive(path)
+
+
+# Records for a soil batch and its analyze() result
+def soil_records(batch, result):
+    shape = batch.shape
+    records = np.empty(int(np.prod(shape)), dtype=SOIL_RECORD)
+    records['soil_type'] = np.where(batch.soil_type < 0, MISSING, np.broadcast_to(batch.soil_type, shape)).ravel()
+    records['warnings'] = np.broadcast_to(result.warnings, shape).ravel()
+    for field in ('soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth'):
+        records[field] = np.broadcast_to(getattr(batch, field), shape).ravel()
+    for field in ('allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure'):
+        records[field] = np.broadcast_to(getattr(result, field), shape).ravel()
+    return records
+
+
+# Records for a wind_load_sweep result; the inputs are the sweep's arguments
+# (names or FACTORS codes), any of which may be None when not known
+def wind_records(writer, result, wind_speed=None, exposure_category=None, structural_shape=None, area=None,
+                 structure_type=None, specific_type=None):
+    shape = result.shape
+    records = np.empty(int(np.prod(shape)), dtype=WIND_RECORD)
+    categorical = (('exposure_category', exposure_category, str.upper),
+                   ('structural_shape', structural_shape, str.lower),
+                   ('structure_type', structure_type, str.lower),
+                   ('specific_type', specific_type, str.lower))
+    for field, values, normalize in categorical:
+        records[field] = MISSING if values is None else \
+            np.broadcast_to(writer.encode(field, values, normalize), shape).ravel()
+    for field, values in (('wind_speed', wind_speed), ('area', area)):
+        records[field] = np.nan if values is None else \
+            np.broadcast_to(np.asarray(values, dtype=np.float64), shape).ravel()
+    records['status'] = result.status.ravel()
+    records['wind_load'] = result.wind_load.ravel()
+    records['acceptable_limits'] = result.acceptable_limits.ravel()
+    return records
+
+
+def _read_csv_chunks(path, chunk_size):
+    with open(path, newline='') as file:
+        reader = csv.reader(file)
+        next(reader, None)
+        chunk = []
+        for line_number, row in enumerate(reader, start=2):
+            chunk.append((line_number, row))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _float_columns(chunk, indexes, path):
+    try:
+        return [np.array([float(row[i]) for _, row in chunk]) for i in indexes]
+    except (ValueError, IndexError):
+        for line_number, row in chunk:
+            try:
+                [float(row[i]) for i in indexes]
+            except (ValueError, IndexError):
+                raise ValueError(f"{path}:{line_number}: not a history row: {row!r}")
+        raise
+
+
+# Converts a CSV history file (history.py layout) into an archive; returns
+# the number of rows. The warning bits and wind status are recomputed from
+# the stored values.
+def csv_to_archive(kind, csv_path, archive_path, compression=None, level=None, chunk_size=BLOCK_ROWS):
+    with ArchiveWriter(archive_path, kind, compression, level) as writer:
+        for chunk in _read_csv_chunks(csv_path, chunk_size):
+            if kind == 'soil':
+                capacity, depth, water_table, allowable, settlement, lateral = _float_columns(chunk, range(1, 7),
+                                                                                             csv_path)
+                records = np.empty(len(chunk), dtype=SOIL_RECORD)
+                records['soil_type'] = writer.encode('soil_type', [row[0] for _, row in chunk])
+                records['soil_bearing_capacity'] = capacity
+                records['depth_of_soil_layer'] = depth
+                records['water_table_depth'] = water_table
+                records['allowable_bearing_capacity'] = allowable
+                records['settlement'] = settlement
+                records['lateral_earth_pressure'] = lateral
+                records['warnings'] = SoilAnalysisBatch(-1, capacity, depth, water_table).warning_flags(
+                    allowable, settlement, lateral)
+            else:
+                wind_load, acceptable_limits = _float_columns(chunk, (0, 3), csv_path)
+                records = np.empty(len(chunk), dtype=WIND_RECORD)
+                records['exposure_category'] = records['structural_shape'] = MISSING
+                records['structure_type'] = writer.encode('structure_type', [row[1] for _, row in chunk])
+                records['specific_type'] = writer.encode('specific_type', [row[2] for _, row in chunk])
+                records['wind_speed'] = records['area'] = np.nan
+                records['wind_load'] = wind_load
+                records['acceptable_limits'] = acceptable_limits
+                records['status'] = np.select([wind_load > acceptable_limits,
+                                               wind_load > CAUTION_RATIO * acceptable_limits], [EXCEED, CAUTION], SAFE)
+            writer.write(records)
+        return writer.rows
+
+
+# float32 values as their shortest decimal form; float64 ones are left to
+# the csv module, which writes the same repr as the history loggers
+def _text(column):
+    return column.astype(str) if column.dtype.itemsize == 4 else column
+
+
+# Writes an archive back out in the CSV history layout. float32 inputs are
+# written in their shortest form, so values with up to 7 significant digits
+# come back as they were entered.
+def archive_to_csv(archive_path, csv_path, chunk_size=BLOCK_ROWS):
+    archive = read_archive(archive_path)
+    with open(csv_path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        if archive.kind == 'soil':
+            writer.writerow(SOIL_HISTORY_HEADER)
+            soil_types = archive.lookup('soil_type', 'Unknown')
+        else:
+            writer.writerow(WIND_HISTORY_HEADER)
+            structures, specifics = archive.lookup('structure_type'), archive.lookup('specific_type')
+        for start in range(0, len(archive), chunk_size):
+            records = archive.records[start:start + chunk_size]
+            if archive.kind == 'soil':
+                effect = np.where((records['warnings'] & WARN_HIGH_WATER_TABLE) != 0, WATER_TABLE_TOO_HIGH,
+                                  WATER_TABLE_ADEQUATE)
+                columns = [soil_types[records['soil_type']]] + [_text(records[field]) for field in (
+                    'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth', 'allowable_bearing_capacity',
+                    'settlement', 'lateral_earth_pressure')] + [effect]
+            else:
+                columns = [_text(records['wind_load']), structures[records['structure_type']],
+                           specifics[records['specific_type']], _text(records['acceptable_limits'])]
+            writer.writerows(zip(*(column.tolist() for column in columns)))
+    return len(archive)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py archive',
+                                     description="Convert analysis history between CSV and the binary result archive.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    pack = commands.add_parser('pack', help="CSV history -> archive")
+    pack.add_argument('kind', choices=['soil', 'wind'])
+    pack.add_argument('csv')
+    pack.add_argument('archive', nargs='?', help=f"default: <csv without extension>{EXTENSION}")
+    pack.add_argument('--compress', choices=['zlib', 'zstd'])
+    pack.add_argument('--level', type=int)
+    unpack = commands.add_parser('unpack', help="archive -> CSV history")
+    unpack.add_argument('archive')
+    unpack.add_argument('csv')
+    info = commands.add_parser('info', help="print an archive's kind, size and categories")
+    info.add_argument('archive')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'pack':
+            archive_path = args.archive or args.csv.rsplit('.', 1)[0] + EXTENSION
+            rows = csv_to_archive(args.kind, args.csv, archive_path, args.compress, args.level)
+            print(f"Packed {rows:,} {args.kind} rows into {archive_path}")
+        elif args.command == 'unpack':
+            rows = archive_to_csv(args.archive, args.csv)
+            print(f"Unpacked {rows:,} rows into {args.csv}")
+        else:
+            archive = read_archive(args.archive)
+            print(f"{args.archive}: {len(archive):,} {archive.kind} records, {archive.records.dtype.itemsize} bytes "
+                  f"each, compression {archive.compression or 'none'}")
+            for field, names in archive.categories.items():
+                print(f"  {field}: {', '.join(names)}")
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+
+
+if __name__ == "__main__":
+    main()
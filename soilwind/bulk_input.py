@@ -0,0 +1,300 @@
+import argparse
+import csv
+import itertools
+import json
+import sys
+
+import numpy as np
+
+from . import instrument
+from .core import STATUS_NAMES
+from .factors import FACTORS
+from .soil_batch import CAPACITY_CLASSES, SoilAnalysisBatch
+from .wind_batch import wind_load_sweep
+
+SOIL_FIELDS = ['soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth']
+SOIL_RESULT_FIELDS = ['allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure',
+                      'capacity_class', 'warnings']
+WIND_FIELDS = ['wind_speed', 'exposure_category', 'structural_shape', 'area', 'structure_type', 'specific_type']
+WIND_RESULT_FIELDS = ['wind_load', 'acceptable_limits', 'utilization', 'status']
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+class RowError(ValueError):
+    pass
+
+
+def _positive_float(row, field):
+    try:
+        value = float(row[field])
+    except (KeyError, TypeError, ValueError):
+        raise RowError(f"{field}: expected a number, got {row.get(field)!r}")
+    if not value > 0:
+        raise RowError(f"{field}: must be a positive number, got {value}")
+    return value
+
+
+def _choice(row, field, table, normalize):
+    value = row.get(field)
+    name = normalize(str(value).strip()) if value is not None else None
+    if name not in table:
+        raise RowError(f"{field}: invalid value {value!r}")
+    return name
+
+
+# Each parser turns one raw record into a tuple of validated values, with the
+# same rules the interactive prompts apply
+def parse_soil_row(row):
+    return (_choice(row, 'soil_type', FACTORS.soils, str.capitalize),
+            _positive_float(row, 'soil_bearing_capacity'),
+            _positive_float(row, 'depth_of_soil_layer'),
+            _positive_float(row, 'water_table_depth'))
+
+
+def parse_wind_row(row):
+    structure_type = _choice(row, 'structure_type', FACTORS.structures, str.lower)
+    specific_type = str(row.get('specific_type', '')).strip().lower()
+    if FACTORS.acceptable_limit(structure_type, specific_type) is None:
+        raise RowError(f"specific_type: invalid value {row.get('specific_type')!r} for {structure_type}")
+    return (_positive_float(row, 'wind_speed'),
+            _choice(row, 'exposure_category', FACTORS.exposures, str.upper),
+            _choice(row, 'structural_shape', FACTORS.shapes, str.lower),
+            _positive_float(row, 'area'),
+            structure_type, specific_type)
+
+
+def _open_input(path):
+    return sys.stdin if path == '-' else open(path, newline='')
+
+
+def read_csv_records(path):
+    file = _open_input(path)
+    try:
+        # Records are numbered by the physical line they start on, counting
+        # the header as line 1; quoted fields may span several lines
+        reader = csv.DictReader(file)
+        reader.fieldnames
+        while True:
+            line_number = reader.line_num + 1
+            row = next(reader, None)
+            if row is None:
+                return
+            yield line_number, row
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def read_jsonl_records(path):
+    file = _open_input(path)
+    try:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                record = RowError(f"invalid JSON: {e.msg}")
+            if not isinstance(record, (dict, RowError)):
+                record = RowError("expected a JSON object")
+            yield line_number, record
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+
+def input_format(path):
+    return 'jsonl' if path.endswith(('.jsonl', '.json')) else 'csv'
+
+
+def read_records(path, format=None):
+    return read_jsonl_records(path) if (format or input_format(path)) == 'jsonl' else read_csv_records(path)
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# Parses a chunk of (line number, record) pairs, sending rejected rows to
+# on_error, and returns the valid rows as columns
+def parse_chunk(chunk, parse, on_error):
+    records, rows = [], []
+    for line_number, record in chunk:
+        try:
+            if isinstance(record, RowError):
+                raise record
+            rows.append(parse(record))
+            records.append(record)
+        except RowError as e:
+            on_error(line_number, record, str(e))
+    return records, [list(column) for column in zip(*rows)]
+
+
+def analyze_soil_chunk(columns):
+    batch = SoilAnalysisBatch(*columns)
+    result = batch.analyze()
+    return batch, result, [result.allowable_bearing_capacity, result.settlement, result.lateral_earth_pressure,
+                           np.asarray(CAPACITY_CLASSES)[result.capacity_class], result.warnings]
+
+
+def analyze_wind_chunk(columns):
+    result = wind_load_sweep(*columns)
+    return None, result, [result.wind_load, result.acceptable_limits, result.utilization,
+                          np.asarray(STATUS_NAMES)[result.status]]
+
+
+class CsvResultWriter:
+    def __init__(self, file, fields):
+        self.fields = fields
+        self.writer = csv.writer(file)
+        self.writer.writerow(fields)
+
+    def write(self, records, input_fields, result_columns):
+        inputs = [[record.get(field) for field in input_fields] for record in records]
+        results = zip(*(column.tolist() for column in result_columns))
+        self.writer.writerows(row + list(result) for row, result in zip(inputs, results))
+
+
+class JsonlResultWriter:
+    def __init__(self, file, fields):
+        self.file = file
+        self.fields = fields
+
+    def write(self, records, input_fields, result_columns):
+        results = zip(*(column.tolist() for column in result_columns))
+        self.file.writelines(json.dumps(dict(record, **dict(zip(self.fields[len(input_fields):], result)))) + '\n'
+                             for record, result in zip(records, results))
+
+
+class ErrorSidecar:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.count = 0
+
+    def __call__(self, line_number, record, message):
+        if self.file is None:
+            self.file = open(self.path, 'w')
+        self.count += 1
+        raw = None if isinstance(record, RowError) else record
+        self.file.write(json.dumps({'line': line_number, 'error': message, 'record': raw}) + '\n')
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+# Streams input_path through the batch engines chunk by chunk; memory use is
+# bounded by chunk_size no matter how large the input is. progress, if given,
+# is called after every chunk with the number of input rows read so far; an
+# exception raised from it aborts the run. archive, an archive.ArchiveWriter,
+# also receives every result as binary records. rules, a rules.RuleFile, adds
+# a rule_flags column with the bitmask of its rules; edits to the rules file
+# are picked up between chunks.
+def run_batch(kind, input_path, output, errors, chunk_size=DEFAULT_CHUNK_SIZE, log_history=False, format=None,
+              progress=None, archive=None, rules=None):
+    if kind == 'soil':
+        input_fields, result_fields, parse, analyze = SOIL_FIELDS, SOIL_RESULT_FIELDS, parse_soil_row, analyze_soil_chunk
+    else:
+        input_fields, result_fields, parse, analyze = WIND_FIELDS, WIND_RESULT_FIELDS, parse_wind_row, analyze_wind_chunk
+    if rules is not None:
+        from .rules import RULE_FLAGS_FIELD, analyze_with_rules
+        result_fields, analyze = result_fields + [RULE_FLAGS_FIELD], analyze_with_rules(kind, analyze, rules)
+    format = format or input_format(input_path)
+    writer_class = JsonlResultWriter if format == 'jsonl' else CsvResultWriter
+    writer = writer_class(output, input_fields + result_fields)
+
+    processed = rows_read = 0
+    for chunk in chunks(read_records(input_path, format), chunk_size):
+        with instrument.stage(f'batch.{kind}.parse'):
+            records, columns = parse_chunk(chunk, parse, errors)
+        if records:
+            with instrument.stage(f'batch.{kind}.analyze'):
+                batch, result, result_columns = analyze(columns)
+            with instrument.stage(f'batch.{kind}.write'):
+                writer.write(records, input_fields, result_columns)
+            if log_history:
+                with instrument.stage(f'batch.{kind}.history'):
+                    _log_chunk(kind, batch, result, columns)
+            if archive is not None:
+                with instrument.stage(f'batch.{kind}.archive'):
+                    _archive_chunk(kind, archive, batch, result, columns)
+            processed += len(records)
+        rows_read += len(chunk)
+        instrument.count(f'batch.{kind}.rows', len(chunk))
+        instrument.count(f'batch.{kind}.rejected', len(chunk) - len(records))
+        if progress is not None:
+            progress(rows_read)
+    return processed
+
+
+def _log_chunk(kind, batch, result, columns):
+    if kind == 'soil':
+        from .soil_batch import log_soil_batch_to_csv
+        log_soil_batch_to_csv(batch, result)
+    else:
+        from .wind_batch import log_wind_batch_to_csv
+        log_wind_batch_to_csv(result, columns[4], columns[5])
+
+
+def _archive_chunk(kind, archive, batch, result, columns):
+    from .archive import soil_records, wind_records
+
+    if kind == 'soil':
+        archive.write(soil_records(batch, result))
+    else:
+        archive.write(wind_records(archive, result, *columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py batch',
+                                     description="Run soil or wind analyses over a CSV or JSONL file without prompts.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--soil', metavar='FILE', help="soil samples (CSV or JSONL, '-' for stdin)")
+    source.add_argument('--wind', metavar='FILE', help="wind load scenarios (CSV or JSONL, '-' for stdin)")
+    parser.add_argument('-o', '--output', help="results file (default: stdout)")
+    parser.add_argument('--errors', help="sidecar for rejected rows (default: <output or input>.errors.jsonl)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="input/output format (default: from the file extension)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--log-history', action='store_true', help="also append results to the history files")
+    parser.add_argument('--archive', metavar='FILE', help="also write the results to a binary archive (.swr)")
+    parser.add_argument('--compress', choices=['zlib', 'zstd'], help="block compression for --archive")
+    parser.add_argument('--rules', metavar='FILE', help="warning rules file (JSON); adds a rule_flags column")
+    args = parser.parse_args(argv)
+
+    kind = 'soil' if args.soil else 'wind'
+    input_path = args.soil or args.wind
+    base = args.output or (input_path if input_path != '-' else f'{kind}_batch')
+    rules = archive = None
+    if args.rules:
+        from .rules import RuleFile
+        try:
+            rules = RuleFile(args.rules)
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"{parser.prog}: error: {e}\n")
+    if args.archive:
+        from .archive import ArchiveWriter
+        try:
+            archive = ArchiveWriter(args.archive, kind, args.compress)
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"{parser.prog}: error: {e}\n")
+    errors = ErrorSidecar(args.errors or f'{base}.errors.jsonl')
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    try:
+        processed = run_batch(kind, input_path, output, errors, args.chunk_size, args.log_history, args.format,
+                              archive=archive, rules=rules)
+    finally:
+        errors.close()
+        if archive is not None:
+            archive.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Processed {processed} {kind} rows, rejected {errors.count}"
+          + (f" (see {errors.path})" if errors.count else ""), file=sys.stderr)
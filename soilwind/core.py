@@ -0,0 +1,372 @@
+from array import array
+from bisect import bisect_right
+
+from .factors import FACTORS
+
+# Pure soil and wind load math shared by the CLI, the GUI and the batch
+# engines. Nothing in here touches tkinter, files or NumPy, so headless
+# workers can import it cheaply.
+
+# Soil analysis constants (shared with the batch engine in soil_batch.py)
+SAFETY_FACTOR = 3.0
+APPLIED_PRESSURE = 150   # Standard Applied pressure (in kN/m^2)
+FOUNDATION_WIDTH = 1   # Standard width of the foundation (in meters)
+YOUNG_MODULUS = 10e6  # Standard Young's modulus for the soil (in kN/m^2)
+POISSON_RATIO = 0.3  # Poisson's ratio for the soil (dimensionless)
+FRICTION_ANGLE = 30 # Assumed friction angle of the soil (in degrees)
+
+# Capacity classes and warning thresholds used by SoilAnalysis.report
+LOW_CAPACITY_LIMIT = 100
+HIGH_CAPACITY_LIMIT = 300
+MIN_ALLOWABLE_CAPACITY = 100
+MAX_SETTLEMENT = 0.01
+MAX_LATERAL_PRESSURE = 1.5
+MIN_WATER_TABLE_DEPTH = 2
+
+# Warning bits, one per [WARNING] line of the report
+WARN_LOW_CAPACITY = 1
+WARN_SETTLEMENT = 2
+WARN_LATERAL_PRESSURE = 4
+WARN_HIGH_WATER_TABLE = 8
+
+# Wind load status against the acceptable limit, indexed into STATUS_NAMES
+CAUTION_RATIO = 0.75
+SAFE, CAUTION, EXCEED = 0, 1, 2
+STATUS_NAMES = ("SAFE", "CAUTION", "EXCEED")
+
+WATER_TABLE_TOO_HIGH = "Water table is too high. This may reduce the bearing capacity significantly."
+WATER_TABLE_ADEQUATE = "Water table depth is adequate for construction."
+
+SOIL_WARNINGS = (
+    (WARN_LOW_CAPACITY, "[WARNING]: The allowable soil bearing capacity is too low for safe construction!"),
+    (WARN_SETTLEMENT, "[WARNING]: Settlement exceeds acceptable limits! Consider revising the foundation design."),
+    (WARN_LATERAL_PRESSURE, "[WARNING]: Lateral earth pressure is high. Consider reinforcing structures like retaining walls."),
+    (WARN_HIGH_WATER_TABLE, "[WARNING]: High water table detected. This may reduce soil stability and bearing capacity!"),
+)
+
+# Short names of the same warnings for summaries
+SOIL_WARNING_NAMES = ((WARN_LOW_CAPACITY, "low bearing capacity"), (WARN_SETTLEMENT, "excessive settlement"),
+                      (WARN_LATERAL_PRESSURE, "high lateral earth pressure"),
+                      (WARN_HIGH_WATER_TABLE, "high water table"))
+
+def soil_warning_flags(allowable_bearing_capacity, settlement, lateral_pressure, water_table_depth):
+    flags = 0
+    if allowable_bearing_capacity < MIN_ALLOWABLE_CAPACITY:
+        flags |= WARN_LOW_CAPACITY
+    if settlement > MAX_SETTLEMENT:
+        flags |= WARN_SETTLEMENT
+    if lateral_pressure > MAX_LATERAL_PRESSURE:
+        flags |= WARN_LATERAL_PRESSURE
+    if water_table_depth < MIN_WATER_TABLE_DEPTH:
+        flags |= WARN_HIGH_WATER_TABLE
+    return flags
+
+def capacity_evaluation(soil_bearing_capacity):
+    if soil_bearing_capacity < LOW_CAPACITY_LIMIT:
+        return "Low soil bearing capacity"
+    elif LOW_CAPACITY_LIMIT <= soil_bearing_capacity <= HIGH_CAPACITY_LIMIT:
+        return "Medium soil bearing capacity"
+    else:
+        return "High soil bearing capacity"
+
+# Settlement and lateral earth pressure coefficient for the given foundation
+# and soil parameters. Plain arithmetic, so NumPy arrays broadcast through.
+def calculate_settlement(applied_pressure=APPLIED_PRESSURE, foundation_width=FOUNDATION_WIDTH,
+                         young_modulus=YOUNG_MODULUS, poisson_ratio=POISSON_RATIO):
+    return (applied_pressure * foundation_width) / (young_modulus * (1 - poisson_ratio**2))
+
+def calculate_lateral_earth_pressure(friction_angle=FRICTION_ANGLE):
+    return (1 - (3.14159 * friction_angle) / (1 + (3.14159 * friction_angle))) # Simplified calculation
+
+# Total bearing capacity contributed by one homogeneous layer; SoilProfile
+# sums this over its layers
+def layer_bearing_capacity(soil_bearing_capacity, load_factor, thickness):
+    return soil_bearing_capacity * load_factor * thickness
+
+def wind_load_status(wind_load, acceptable_limits):
+    if wind_load > acceptable_limits:
+        return EXCEED
+    elif wind_load > CAUTION_RATIO * acceptable_limits:
+        return CAUTION
+    return SAFE
+
+
+# Multi-layer borehole profile: per-layer soil type, thickness and bearing
+# capacity in compact typed arrays, plus prefix sums over the layer
+# boundaries so depth queries are a binary search. Depths are measured down
+# from the surface; layer i spans [boundaries[i], boundaries[i + 1]).
+# The *_many methods take an array of depths and need NumPy.
+class SoilProfile:
+    __slots__ = ('soil_types', 'thickness', 'bearing_capacity', 'load_factor', 'water_table_depth',
+                 'boundaries', 'cumulative_capacity')
+
+    def __init__(self, soil_types, thickness, bearing_capacity, water_table_depth):
+        self.soil_types = tuple(soil_types)
+        self.thickness = array('d', thickness)
+        self.bearing_capacity = array('d', bearing_capacity)
+        if not self.soil_types or not len(self.soil_types) == len(self.thickness) == len(self.bearing_capacity):
+            raise ValueError("A soil profile needs the same number (at least one) of soil types, thicknesses "
+                             "and bearing capacities")
+        if not all(t > 0 for t in self.thickness):
+            raise ValueError("Layer thicknesses must be positive numbers.")
+        self.load_factor = array('d', (FACTORS.load_factor(soil_type) for soil_type in self.soil_types))
+        self.water_table_depth = water_table_depth
+        # boundaries[i] is the depth to the top of layer i and
+        # cumulative_capacity[i] the total bearing capacity of the layers above it
+        self.boundaries = array('d', [0.0])
+        self.cumulative_capacity = array('d', [0.0])
+        for capacity, load_factor, t in zip(self.bearing_capacity, self.load_factor, self.thickness):
+            self.boundaries.append(self.boundaries[-1] + t)
+            self.cumulative_capacity.append(self.cumulative_capacity[-1]
+                                            + layer_bearing_capacity(capacity, load_factor, t))
+
+    @classmethod
+    def single_layer(cls, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth):
+        return cls((soil_type,), (depth_of_soil_layer,), (soil_bearing_capacity,), water_table_depth)
+
+    def __len__(self):
+        return len(self.thickness)
+
+    @property
+    def total_depth(self):
+        return self.boundaries[-1]
+
+    # Index of the layer at depth, or -1 outside the profile; the bottom of
+    # the profile belongs to the last layer
+    def layer_at(self, depth):
+        if not 0 <= depth <= self.boundaries[-1]:
+            return -1
+        return min(bisect_right(self.boundaries, depth), len(self.thickness)) - 1
+
+    def soil_type_at(self, depth):
+        layer = self.layer_at(depth)
+        return None if layer < 0 else self.soil_types[layer]
+
+    # Total (unfactored) bearing capacity of the strata from the surface down
+    # to depth, the whole profile by default
+    def total_bearing_capacity(self, depth=None):
+        if depth is None:
+            return self.cumulative_capacity[-1]
+        layer = self.layer_at(depth)
+        if layer < 0:
+            raise ValueError(f"Depth {depth} is outside the soil profile (0 to {self.boundaries[-1]} m).")
+        return self.cumulative_capacity[layer] + layer_bearing_capacity(
+            self.bearing_capacity[layer], self.load_factor[layer], depth - self.boundaries[layer])
+
+    def allowable_bearing_capacity(self, depth=None):
+        return self.total_bearing_capacity(depth) / SAFETY_FACTOR
+
+    def water_table_layer(self):
+        return self.layer_at(self.water_table_depth)
+
+    # The water table counts as high when it is less than
+    # MIN_WATER_TABLE_DEPTH below the given (foundation) depth
+    def high_water_table(self, depth=0):
+        return self.water_table_depth - depth < MIN_WATER_TABLE_DEPTH
+
+    def water_table_effect(self, depth=0):
+        return WATER_TABLE_TOO_HIGH if self.high_water_table(depth) else WATER_TABLE_ADEQUATE
+
+    def _arrays(self):
+        import numpy as np
+
+        # Zero-copy views of the typed arrays
+        return (np, np.frombuffer(self.boundaries), np.frombuffer(self.cumulative_capacity),
+                np.frombuffer(self.bearing_capacity) * np.frombuffer(self.load_factor))
+
+    def layers_at(self, depths):
+        np, boundaries, _, _ = self._arrays()
+        depths = np.asarray(depths, dtype=np.float64)
+        layers = np.minimum(np.searchsorted(boundaries, depths, side='right'), len(self.thickness)) - 1
+        return np.where((depths >= 0) & (depths <= boundaries[-1]), layers, -1)
+
+    def allowable_bearing_capacity_many(self, depths):
+        np, boundaries, cumulative, capacity = self._arrays()
+        depths = np.asarray(depths, dtype=np.float64)
+        layers = self.layers_at(depths)
+        inside = np.maximum(layers, 0)
+        total = cumulative[inside] + capacity[inside] * (depths - boundaries[inside])
+        return np.where(layers >= 0, total / SAFETY_FACTOR, np.nan)
+
+    def high_water_table_many(self, depths):
+        import numpy as np
+
+        return self.water_table_depth - np.asarray(depths, dtype=np.float64) < MIN_WATER_TABLE_DEPTH
+
+
+# The foundation and soil parameters default to the standard values above
+class SoilAnalysis:
+
+    def __init__(self, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                 applied_pressure=APPLIED_PRESSURE, foundation_width=FOUNDATION_WIDTH, young_modulus=YOUNG_MODULUS,
+                 poisson_ratio=POISSON_RATIO, friction_angle=FRICTION_ANGLE):
+        self.soil_type = soil_type
+        self.soil_bearing_capacity = soil_bearing_capacity
+        self.depth_of_soil_layer = depth_of_soil_layer
+        self.water_table_depth = water_table_depth
+        self.applied_pressure = applied_pressure
+        self.foundation_width = foundation_width
+        self.young_modulus = young_modulus
+        self.poisson_ratio = poisson_ratio
+        self.friction_angle = friction_angle
+
+    def soil_type_info(self):
+        return FACTORS.soil_info(self.soil_type)
+    
+    def check_soil_bearing_capacity(self):
+        return capacity_evaluation(self.soil_bearing_capacity)
+        
+    # A single homogeneous layer, see SoilProfile for layered boreholes
+    def profile(self):
+        return SoilProfile.single_layer(self.soil_type, self.soil_bearing_capacity, self.depth_of_soil_layer,
+                                        self.water_table_depth)
+
+    # Same result as self.profile().allowable_bearing_capacity(), without
+    # building the profile on this hot path
+    def calculate_soil_bearing_capacity(self):
+        load_factor = FACTORS.load_factor(self.soil_type)
+        total_bearing_capacity = layer_bearing_capacity(self.soil_bearing_capacity, load_factor, self.depth_of_soil_layer)
+        return total_bearing_capacity / SAFETY_FACTOR
+    
+    def calculate_settlement(self):
+        return calculate_settlement(self.applied_pressure, self.foundation_width, self.young_modulus,
+                                    self.poisson_ratio)
+    
+    def calculate_lateral_earth_pressure(self):
+        return calculate_lateral_earth_pressure(self.friction_angle)
+    
+    def water_table_effect(self):
+        if self.water_table_depth < MIN_WATER_TABLE_DEPTH:
+            return WATER_TABLE_TOO_HIGH
+        else:
+            return WATER_TABLE_ADEQUATE
+
+    # (allowable bearing capacity, settlement, lateral earth pressure, water
+    # table effect), the values the report shows and the history records
+    def results(self):
+        return (self.calculate_soil_bearing_capacity(), self.calculate_settlement(),
+                self.calculate_lateral_earth_pressure(), self.water_table_effect())
+
+    # Compact record of the analysis; results may be the tuple from results()
+    # (or a SoilResult, returned as is) when they were already computed
+    def result(self, results=None):
+        if isinstance(results, SoilResult):
+            return results
+        if results is None:
+            allowable_bearing_capacity = self.calculate_soil_bearing_capacity()
+            settlement = self.calculate_settlement()
+            lateral_pressure = self.calculate_lateral_earth_pressure()
+        else:
+            allowable_bearing_capacity, settlement, lateral_pressure, _ = results
+        return SoilResult(self.soil_type, self.soil_bearing_capacity, self.depth_of_soil_layer,
+                          self.water_table_depth, allowable_bearing_capacity, settlement, lateral_pressure,
+                          soil_warning_flags(allowable_bearing_capacity, settlement, lateral_pressure,
+                                             self.water_table_depth))
+
+    def warning_flags(self, results=None):
+        allowable_bearing_capacity, settlement, lateral_pressure, _ = results or self.results()
+        return soil_warning_flags(allowable_bearing_capacity, settlement, lateral_pressure, self.water_table_depth)
+
+    # Text report shown by the CLI and the GUI; rounded=True trims the
+    # computed values for display in the GUI
+    def report(self, results=None, rounded=False):
+        return self.result(results).report(rounded)
+
+
+# The inputs and computed values of one soil analysis plus its warning
+# bitmask. Nothing is formatted until report(), history_row() or as_dict()
+# is called; the water table effect and capacity evaluation texts are derived
+# from the inputs and flags on access. Unpacks like SoilAnalysis.results().
+class SoilResult:
+    __slots__ = ('soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth',
+                 'allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'flags')
+
+    def __init__(self, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                 allowable_bearing_capacity, settlement, lateral_earth_pressure, flags):
+        self.soil_type = soil_type
+        self.soil_bearing_capacity = soil_bearing_capacity
+        self.depth_of_soil_layer = depth_of_soil_layer
+        self.water_table_depth = water_table_depth
+        self.allowable_bearing_capacity = allowable_bearing_capacity
+        self.settlement = settlement
+        self.lateral_earth_pressure = lateral_earth_pressure
+        self.flags = flags
+
+    def __iter__(self):
+        return iter((self.allowable_bearing_capacity, self.settlement, self.lateral_earth_pressure,
+                     self.water_table_effect))
+
+    def __repr__(self):
+        return (f"SoilResult({self.soil_type!r}, allowable_bearing_capacity={self.allowable_bearing_capacity!r}, "
+                f"settlement={self.settlement!r}, lateral_earth_pressure={self.lateral_earth_pressure!r}, "
+                f"flags={self.flags})")
+
+    @property
+    def water_table_effect(self):
+        return WATER_TABLE_TOO_HIGH if self.flags & WARN_HIGH_WATER_TABLE else WATER_TABLE_ADEQUATE
+
+    @property
+    def capacity_evaluation(self):
+        return capacity_evaluation(self.soil_bearing_capacity)
+
+    def warnings(self):
+        return [warning for flag, warning in SOIL_WARNINGS if self.flags & flag]
+
+    def report(self, rounded=False):
+        allowable_bearing_capacity, settlement, lateral_pressure = (
+            self.allowable_bearing_capacity, self.settlement, self.lateral_earth_pressure)
+        if rounded:
+            allowable_bearing_capacity = f"{allowable_bearing_capacity:.2f}"
+            settlement = f"{settlement:.4f}"
+            lateral_pressure = f"{lateral_pressure:.4f}"
+        lines = [
+            "",
+            f"Soil Type: {self.soil_type}",
+            f"Soil Type Information: {FACTORS.soil_info(self.soil_type)}",
+            f"Soil Bearing Capacity: {self.soil_bearing_capacity} kN/m^2",
+            f"Soil Bearing Capacity Evaluation: {self.capacity_evaluation}",
+            f"Depth of Soil Layer: {self.depth_of_soil_layer} meters",
+            f"Load Distribution Capacity: {allowable_bearing_capacity} kN",
+            f"Settlement (Estimated): {settlement} meters",
+            f"Lateral Earth Pressure Coefficient: {lateral_pressure}",
+            f"Water Table Depth: {self.water_table_depth} meters",
+            f"Water Table Effect: {self.water_table_effect}",
+        ]
+        return "\n".join(lines + [""] + self.warnings())
+
+    # Row of the soil history CSV (history.SOIL_HISTORY_HEADER)
+    def history_row(self):
+        return [self.soil_type, self.soil_bearing_capacity, self.depth_of_soil_layer, self.water_table_depth,
+                self.allowable_bearing_capacity, self.settlement, self.lateral_earth_pressure,
+                self.water_table_effect]
+
+    def as_dict(self):
+        return {'soil_type': self.soil_type, 'soil_bearing_capacity': self.soil_bearing_capacity,
+                'depth_of_soil_layer': self.depth_of_soil_layer, 'water_table_depth': self.water_table_depth,
+                'allowable_bearing_capacity': self.allowable_bearing_capacity, 'settlement': self.settlement,
+                'lateral_earth_pressure': self.lateral_earth_pressure, 'water_table_effect': self.water_table_effect,
+                'warnings': self.flags}
+
+
+def calculate_wind_load(q, G, Cd, area):
+    calculate_wind_load = q * G * Cd * area
+    return calculate_wind_load
+
+# Non-interactive wind load evaluation: returns (wind load, acceptable limit,
+# status code) or raises ValueError for an invalid input
+def evaluate_wind_load(wind_speed, exposure_category, structural_shape, area, structure_type, specific_type):
+    if wind_speed <= 0:
+        raise ValueError("Wind speed must be a positive number.")
+    if area <= 0:
+        raise ValueError("Area must be a positive number.")
+    if exposure_category not in FACTORS.exposures:
+        raise ValueError(f"Invalid exposure category: {exposure_category}")
+    if structural_shape not in FACTORS.shapes:
+        raise ValueError(f"Invalid structural shape: {structural_shape}")
+    acceptable_limits = FACTORS.acceptable_limit(structure_type, specific_type)
+    if acceptable_limits is None:
+        raise ValueError(f"Invalid structure type: {structure_type}/{specific_type}")
+    q = 0.613 * wind_speed**2
+    wind_load = calculate_wind_load(q, FACTORS.gust_factor(exposure_category),
+                                    FACTORS.drag_coefficient(structural_shape), area)
+    return wind_load, acceptable_limits, wind_load_status(wind_load, acceptable_limits)
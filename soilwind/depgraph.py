@@ -0,0 +1,108 @@
+# Small dependency-tracked computation graph for interactive what-if editing.
+# Inputs are set by name; every computed node names the nodes it reads.
+# Setting an input to a new value only marks its downstream nodes dirty, and
+# a dirty node is recomputed the next time it (or something below it) is
+# read, so changing the wind speed recomputes q and the loads but not the
+# gust factor, drag coefficient or limit lookups.
+#
+#   graph = Graph()
+#   graph.input('wind_speed', 30)
+#   graph.node('q', lambda wind_speed: 0.613 * wind_speed**2, 'wind_speed')
+#   graph['q']                      # computed
+#   graph.set('wind_speed', 31)     # q is dirty; recomputed on the next read
+#
+# A node that raises keeps the exception as its value and re-raises it on
+# every read until one of its inputs changes.
+
+MISSING = object()
+
+
+class _Failure:
+    __slots__ = ('error',)
+
+    def __init__(self, error):
+        self.error = error
+
+
+class Graph:
+    def __init__(self):
+        self._functions = {}
+        self._dependencies = {}
+        self._dependents = {}
+        self._missing_errors = {}
+        self._values = {}
+        self._dirty = set()
+        self.recomputed = {}   # recompute count per node, for profiling and tests
+
+    # missing_error is raised when the input is read before it is set
+    def input(self, name, value=MISSING, missing_error=None):
+        self._add(name, None, ())
+        self._missing_errors[name] = missing_error or ValueError(f"{name} is required")
+        if value is not MISSING:
+            self._values[name] = value
+        return self
+
+    def node(self, name, function, *dependencies):
+        for dependency in dependencies:
+            if dependency not in self._dependencies:
+                raise ValueError(f"Unknown dependency {dependency!r} of {name!r}")
+        self._add(name, function, dependencies)
+        self._dirty.add(name)
+        return self
+
+    def _add(self, name, function, dependencies):
+        if name in self._dependencies:
+            raise ValueError(f"Node {name!r} is already defined")
+        self._functions[name] = function
+        self._dependencies[name] = dependencies
+        self._dependents[name] = []
+        for dependency in dependencies:
+            self._dependents[dependency].append(name)
+
+    # Sets an input; an unchanged value leaves everything computed
+    def set(self, name, value):
+        if name not in self._missing_errors:
+            raise ValueError(f"{name!r} is not an input")
+        if name in self._values and self._values[name] == value:
+            return False
+        self._values[name] = value
+        self._invalidate(name)
+        return True
+
+    def update(self, **values):
+        changed = False
+        for name, value in values.items():
+            changed |= self.set(name, value)
+        return changed
+
+    def _invalidate(self, name):
+        pending = list(self._dependents[name])
+        while pending:
+            node = pending.pop()
+            if node not in self._dirty:
+                self._dirty.add(node)
+                pending.extend(self._dependents[node])
+
+    def dirty(self):
+        return set(self._dirty)
+
+    def get(self, name):
+        if name in self._dirty:
+            self._compute(name)
+        elif name not in self._values:
+            raise self._missing_errors[name]
+        value = self._values[name]
+        if isinstance(value, _Failure):
+            raise value.error.with_traceback(None)
+        return value
+
+    __getitem__ = get
+
+    def _compute(self, name):
+        try:
+            value = self._functions[name](*(self.get(dependency) for dependency in self._dependencies[name]))
+        except Exception as e:
+            value = _Failure(e)
+        self._values[name] = value
+        self._dirty.discard(name)
+        self.recomputed[name] = self.recomputed.get(name, 0) + 1
@@ -0,0 +1,142 @@
+from types import MappingProxyType
+
+# Single source of truth for the wind and soil factor tables used by
+# the core math, the CLI, the GUI and the batch engines. Every category string is
+# interned to a small integer code (its position in the table) so lookups are
+# a tuple index, and the batch paths can index NumPy arrays with the codes.
+
+DEFAULT_LOAD_FACTOR = 1.0
+CLAY_LOAD_FACTOR = 1.2
+
+
+class FactorTable:
+    __slots__ = ('names', 'values', 'codes', 'labels', 'descriptions')
+
+    def __init__(self, items, labels=None, descriptions=None):
+        items = tuple(items)
+        object.__setattr__(self, 'names', tuple(name for name, _ in items))
+        object.__setattr__(self, 'values', tuple(value for _, value in items))
+        object.__setattr__(self, 'codes', MappingProxyType({name: code for code, name in enumerate(self.names)}))
+        object.__setattr__(self, 'labels', tuple(labels) if labels else self.names)
+        object.__setattr__(self, 'descriptions', tuple(descriptions) if descriptions else ())
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Factor tables are read-only")
+
+    def __contains__(self, name):
+        return name in self.codes
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, name):
+        return self.codes[name]
+
+    def value(self, name):
+        return self.values[self.codes[name]]
+
+    def get(self, name, default=None):
+        code = self.codes.get(name)
+        return default if code is None else self.values[code]
+
+    def encode_array(self, values, normalize=None):
+        # Vectorized name -> code conversion; unknown names become -1. Integer
+        # arrays are taken to be codes already.
+        import numpy as np
+
+        values = np.asarray(values)
+        if values.dtype.kind in 'iu':
+            return values
+        if normalize is None:
+            codes = np.full(values.shape, -1, dtype=np.int16)
+            for code, name in enumerate(self.names):
+                codes[values == name] = code
+            return codes
+        unique, inverse = np.unique(values, return_inverse=True)
+        lookup = np.array([self.codes.get(normalize(str(value)), -1) for value in unique], dtype=np.int16)
+        return lookup[inverse].reshape(values.shape)
+
+
+class FactorRegistry:
+    __slots__ = ('exposures', 'shapes', 'structures', 'specific_types', 'limits', 'soils')
+
+    def __init__(self, exposures, shapes, limits, soils):
+        object.__setattr__(self, 'exposures', exposures)
+        object.__setattr__(self, 'shapes', shapes)
+        object.__setattr__(self, 'soils', soils)
+        # Structure codes map to the tuple of their specific types; the limit
+        # matrix is indexed [structure code][specific type code], None where
+        # the specific type does not belong to the structure
+        object.__setattr__(self, 'structures', FactorTable((structure, tuple(specifics)) for structure, specifics in limits))
+        specific_names = []
+        for _, specifics in limits:
+            specific_names.extend(name for name in specifics if name not in specific_names)
+        object.__setattr__(self, 'specific_types', FactorTable((name, name) for name in specific_names))
+        object.__setattr__(self, 'limits', tuple(
+            tuple(specifics.get(name) for name in specific_names) for _, specifics in limits))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("The factor registry is read-only")
+
+    def gust_factor(self, exposure_category):
+        return self.exposures.value(exposure_category)
+
+    def drag_coefficient(self, structural_shape):
+        return self.shapes.value(structural_shape)
+
+    def specific_types_for(self, structure_type):
+        return self.structures.get(structure_type, ())
+
+    def acceptable_limit(self, structure_type, specific_type):
+        structure_code = self.structures.codes.get(structure_type)
+        specific_code = self.specific_types.codes.get(specific_type)
+        if structure_code is None or specific_code is None:
+            return None
+        return self.limits[structure_code][specific_code]
+
+    def load_factor(self, soil_type):
+        return self.soils.get(soil_type, DEFAULT_LOAD_FACTOR)
+
+    def soil_info(self, soil_type):
+        code = self.soils.codes.get(soil_type)
+        return 'Unknown soil type' if code is None else self.soils.descriptions[code]
+
+
+FACTORS = FactorRegistry(
+    exposures=FactorTable(
+        [("A", 0.8), ("B", 1.0), ("C", 1.2), ("D", 1.4), ("E", 1.4), ("F", 1.8)],
+        labels=["Open water or flat terrain (A)", "Suburban terrain (B)", "Urban areas (C)",
+                "Open terrain (D)", "Moderate density (E)", "High density (F)"],
+        descriptions=["Open water or flat terrain", "Suburban terrain", "Urban areas with buildings and trees",
+                      "Open terrain with no obstructions", "Intermediate category for areas with moderate density",
+                      "Areas with very high density and tall structures"]),
+    shapes=FactorTable(
+        [("rectangular", 1.3), ("cylindrical", 0.6), ("triangular", 1.2), ("hexagonal", 1.1),
+         ("octagonal", 1.05), ("dome", 0.4), ("parabolic", 0.9), ("irregular", 1.5),
+         ("sphere", 0.47), ("cone", 0.5), ("airfoil", 0.04)]),
+    limits=[
+        ("residential", {"single-family": 1200, "duplex": 1300, "apartment": 1400}),
+        ("commercial", {"retail": 2800, "office": 2900, "shopping mall": 3000}),
+        ("industrial", {"factory": 5000, "warehouse": 4000, "power plant": 6000}),
+        ("infrastructural", {"bridge": 5000, "tower": 6000, "dam": 5000}),
+        ("institutional", {"school": 2300, "university": 2400, "hospital": 2500}),
+        ("agricultural", {"barn": 1800, "silo": 1900, "greenhouse": 2000}),
+        ("recreational", {"sports complex": 2800, "fitness center": 2900, "recreation center": 3000,
+                          "stadium": 7000, "theater": 3000, "arena": 4000}),
+        ("mixed use", {"live-work": 3300, "mixed development": 3500}),
+        ("civic", {"community center": 2200, "library": 2300, "cultural facility": 2400}),
+        ("transportation", {"airport": 3900, "train station": 4000, "bus terminal": 4100}),
+        ("hospitality", {"hotel": 2800, "motel": 2900, "resort": 3000}),
+    ],
+    soils=FactorTable(
+        [("Clay", CLAY_LOAD_FACTOR), ("Sand", DEFAULT_LOAD_FACTOR), ("Silt", DEFAULT_LOAD_FACTOR),
+         ("Loam", DEFAULT_LOAD_FACTOR)],
+        descriptions=['Clay soils are cohesive, sticky, and often have poor drainage.',
+                      'Sand soils are loose, non-cohesive, and drain quickly.',
+                      'Silt soils are smooth, slippery, and drain moderately.',
+                      'Loam soils are a mixture of sand, silt, and clay and have good drainage.']),
+)
+
@@ -0,0 +1,270 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from .core import SAFE, CAUTION, EXCEED, SOIL_WARNING_NAMES, STATUS_NAMES
+from .factors import FACTORS
+from .soil_batch import SoilAnalysisBatch
+from .wind_batch import wind_load_sweep
+
+# Site screening over rasters. Every input is a 2-D grid (a .npy file or a
+# raw binary file, memory-mapped) or a constant; the soil analysis and the
+# wind load check run tile by tile through the batch engines and the per-cell
+# results go straight into memory-mapped .npy outputs, so only one tile of
+# inputs and temporaries is in memory whatever the grid size.
+#
+# Outputs (in the output directory):
+#   soil_warnings.npy  uint8   warning bitmask (core.WARN_*), NODATA where a soil input is missing
+#   wind_status.npy    uint8   SAFE / CAUTION / EXCEED, NODATA where a wind input is missing
+#   utilization.npy    float32 wind load / acceptable limit, NaN where a wind input is missing
+#
+# Missing cells are non-finite values, non-positive wind speeds and category
+# codes outside the FACTORS tables (e.g. 255).
+
+SOIL_INPUTS = ('soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth')
+WIND_INPUTS = ('wind_speed', 'exposure_category')
+CATEGORICAL = {'soil_type': FACTORS.soils, 'exposure_category': FACTORS.exposures}
+
+NODATA = 255
+DEFAULT_TILE = 1024
+
+# dtype of raw binary rasters by file extension
+RAW_DTYPES = {'.f32': np.float32, '.f64': np.float64, '.u8': np.uint8, '.i16': np.int16, '.u16': np.uint16}
+
+
+# A raster input: .npy files are memory-mapped, raw binary files are mapped
+# with the dtype of their extension (or `dtype`) and the grid shape; anything
+# else (a number or a category name) is a constant over the grid
+def open_raster(source, shape=None, dtype=None):
+    if isinstance(source, np.ndarray) or not isinstance(source, str) or not os.path.isfile(source):
+        return source
+    if source.endswith('.npy'):
+        return np.load(source, mmap_mode='r')
+    dtype = dtype or RAW_DTYPES.get(os.path.splitext(source)[1].lower())
+    if dtype is None:
+        raise ValueError(f"Unknown raw raster type for {source}; use one of {', '.join(RAW_DTYPES)} or .npy")
+    if shape is None:
+        raise ValueError(f"The grid shape is needed to read the raw raster {source}")
+    expected = shape[0] * shape[1] * np.dtype(dtype).itemsize
+    if os.path.getsize(source) != expected:
+        raise ValueError(f"{source} holds {os.path.getsize(source):,} bytes, not the {expected:,} of a "
+                         f"{shape[0]} x {shape[1]} {np.dtype(dtype).name} grid")
+    return np.memmap(source, dtype=dtype, mode='r', shape=shape)
+
+
+def _constant_category(name, value):
+    table = CATEGORICAL[name]
+    normalize = str.upper if name == 'exposure_category' else str.capitalize
+    code = table.codes.get(normalize(str(value)), -1)
+    if code < 0:
+        raise ValueError(f"Invalid {name.replace('_', ' ')}: {value}")
+    return code
+
+
+class GridScreening:
+    # inputs: raster (or constant) per name in SOIL_INPUTS and/or WIND_INPUTS.
+    # Categorical rasters hold FACTORS codes. The candidate structure
+    # (shape, area, structure and specific type) is the same on every cell.
+    # soil_parameters go to SoilAnalysisBatch (applied_pressure, ...).
+    def __init__(self, inputs, structural_shape=None, area=None, structure_type=None, specific_type=None,
+                 shape=None, tile=DEFAULT_TILE, soil_parameters=None):
+        unknown = set(inputs) - set(SOIL_INPUTS) - set(WIND_INPUTS)
+        if unknown:
+            raise ValueError(f"Unknown grid inputs: {', '.join(sorted(unknown))}")
+        self.soil = all(name in inputs for name in SOIL_INPUTS)
+        self.wind = all(name in inputs for name in WIND_INPUTS)
+        if not self.soil and not self.wind:
+            raise ValueError(f"Give all soil inputs ({', '.join(SOIL_INPUTS)}) "
+                             f"and/or all wind inputs ({', '.join(WIND_INPUTS)})")
+        if self.wind and None in (structural_shape, area, structure_type, specific_type):
+            raise ValueError("Wind screening needs the structural shape, area, structure type and specific type")
+
+        # .npy inputs first: raw rasters take their shape when none is given
+        self.inputs = {name: open_raster(source) for name, source in inputs.items()
+                       if not isinstance(source, str) or source.endswith('.npy') or not os.path.isfile(source)}
+        shapes = {np.shape(raster) for raster in self.inputs.values() if np.ndim(raster)}
+        if shape is not None:
+            shapes.add(tuple(shape))
+        raw_shape = shape or (next(iter(shapes)) if len(shapes) == 1 else None)
+        for name, source in inputs.items():
+            if name not in self.inputs:
+                self.inputs[name] = open_raster(source, raw_shape)
+                shapes.add(self.inputs[name].shape)
+        if len(shapes) != 1 or len(next(iter(shapes))) != 2:
+            raise ValueError(f"Raster inputs must share one 2-D shape, got {sorted(shapes)}")
+        self.shape = shapes.pop()
+        for name in CATEGORICAL:
+            if name in self.inputs and not np.ndim(self.inputs[name]):
+                self.inputs[name] = _constant_category(name, self.inputs[name])
+        self.structure = (structural_shape, area, structure_type, specific_type)
+        self.tile = tile
+        self.soil_parameters = soil_parameters or {}
+
+    def tiles(self):
+        rows, columns = self.shape
+        for top in range(0, rows, self.tile):
+            for left in range(0, columns, self.tile):
+                yield slice(top, min(top + self.tile, rows)), slice(left, min(left + self.tile, columns))
+
+    def _read(self, name, window):
+        raster = self.inputs[name]
+        return np.asarray(raster[window]) if np.ndim(raster) else raster
+
+    def _soil_tile(self, window, shape):
+        soil_type = np.broadcast_to(self._read('soil_type', window), shape)
+        values = [np.broadcast_to(np.asarray(self._read(name, window), dtype=np.float64), shape)
+                  for name in SOIL_INPUTS[1:]]
+        valid = (soil_type >= 0) & (soil_type < len(FACTORS.soils))
+        for column in values:
+            valid &= np.isfinite(column)
+        warnings = SoilAnalysisBatch(np.where(valid, soil_type, 0).astype(np.int16), *values,
+                                     **self.soil_parameters).warning_flags()
+        warnings[~valid] = NODATA
+        return warnings
+
+    def _wind_tile(self, window, shape):
+        wind_speed = np.broadcast_to(np.asarray(self._read('wind_speed', window), dtype=np.float64), shape)
+        exposure = np.broadcast_to(self._read('exposure_category', window), shape)
+        valid = np.isfinite(wind_speed) & (wind_speed > 0) & (exposure >= 0) & (exposure < len(FACTORS.exposures))
+        result = wind_load_sweep(np.where(valid, wind_speed, 1.0), np.where(valid, exposure, 0).astype(np.int16),
+                                 *self.structure)
+        utilization = np.where(valid, result.utilization, np.nan).astype(np.float32)
+        status = result.status.astype(np.uint8)
+        status[~valid] = NODATA
+        return status, utilization
+
+    # Screens every tile into output_dir and returns a GridSummary.
+    # progress(cells_done, cells_total) is called after every tile.
+    def run(self, output_dir, progress=None):
+        os.makedirs(output_dir, exist_ok=True)
+        outputs = {}
+        if self.soil:
+            outputs['soil_warnings'] = _open_output(output_dir, 'soil_warnings', np.uint8, self.shape)
+        if self.wind:
+            outputs['wind_status'] = _open_output(output_dir, 'wind_status', np.uint8, self.shape)
+            outputs['utilization'] = _open_output(output_dir, 'utilization', np.float32, self.shape)
+        summary = GridSummary(self.shape, output_dir)
+        start = time.perf_counter()
+        done, total = 0, self.shape[0] * self.shape[1]
+        for window in self.tiles():
+            shape = (window[0].stop - window[0].start, window[1].stop - window[1].start)
+            if self.soil:
+                warnings = self._soil_tile(window, shape)
+                outputs['soil_warnings'][window] = warnings
+                summary.add_soil(warnings)
+            if self.wind:
+                status, utilization = self._wind_tile(window, shape)
+                outputs['wind_status'][window] = status
+                outputs['utilization'][window] = utilization
+                summary.add_wind(status, utilization)
+            done += shape[0] * shape[1]
+            if window[1].stop == self.shape[1]:
+                # End of a band of tiles: write it back so dirty pages stay bounded too
+                for output in outputs.values():
+                    output.flush()
+            if progress is not None:
+                progress(done, total)
+        summary.elapsed = time.perf_counter() - start
+        return summary
+
+
+def _open_output(output_dir, name, dtype, shape):
+    return np.lib.format.open_memmap(os.path.join(output_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=shape)
+
+
+# Cell counts gathered while the tiles are written
+class GridSummary:
+    def __init__(self, shape, output_dir):
+        self.shape = shape
+        self.output_dir = output_dir
+        self.soil_histogram = np.zeros(NODATA + 1, dtype=np.int64)
+        self.wind_histogram = np.zeros(NODATA + 1, dtype=np.int64)
+        self.max_utilization = np.nan
+        self.elapsed = 0.0
+
+    def add_soil(self, warnings):
+        self.soil_histogram += np.bincount(warnings.ravel(), minlength=NODATA + 1)
+
+    def add_wind(self, status, utilization):
+        self.wind_histogram += np.bincount(status.ravel(), minlength=NODATA + 1)
+        if not np.isnan(utilization).all():
+            self.max_utilization = np.nanmax((self.max_utilization, np.nanmax(utilization)))
+
+    def warning_count(self, flag):
+        codes = np.arange(NODATA)
+        return int(self.soil_histogram[:NODATA][(codes & flag) != 0].sum())
+
+    def report(self):
+        cells = self.shape[0] * self.shape[1]
+        lines = [f"{self.shape[0]:,} x {self.shape[1]:,} grid ({cells:,} cells) screened in {self.elapsed:.2f} s "
+                 f"into {self.output_dir}"]
+        if self.soil_histogram.any():
+            lines.append(f"Soil: {self.soil_histogram[NODATA]:,} cells without data, "
+                         f"{self.soil_histogram[0]:,} without warnings")
+            for flag, name in SOIL_WARNING_NAMES:
+                count = self.warning_count(flag)
+                lines.append(f"  {name}: {count:,} cells ({count / cells:.2%})")
+        if self.wind_histogram.any():
+            lines.append(f"Wind: {self.wind_histogram[NODATA]:,} cells without data, max utilization "
+                         f"{self.max_utilization:.3f}")
+            for status in (SAFE, CAUTION, EXCEED):
+                count = int(self.wind_histogram[status])
+                lines.append(f"  {STATUS_NAMES[status]}: {count:,} cells ({count / cells:.2%})")
+        return "\n".join(lines)
+
+
+def _shape(spec):
+    try:
+        rows, columns = (int(value) for value in spec.lower().replace('x', ',').split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected ROWS,COLUMNS, got {spec!r}")
+    return rows, columns
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py grid',
+                                     description="Screen candidate sites over raster grids: soil warnings, wind "
+                                                 "load status and utilization per cell.")
+    soil = parser.add_argument_group("soil rasters (.npy, raw .f32/.f64/.u8/.i16/.u16, or a constant)")
+    soil.add_argument('--soil-type', help="soil type name, or a raster of FACTORS soil codes")
+    soil.add_argument('--capacity', dest='soil_bearing_capacity', metavar='RASTER')
+    soil.add_argument('--depth', dest='depth_of_soil_layer', metavar='RASTER')
+    soil.add_argument('--water-table', dest='water_table_depth', metavar='RASTER')
+    wind = parser.add_argument_group("wind rasters and the candidate structure")
+    wind.add_argument('--wind-speed', metavar='RASTER')
+    wind.add_argument('--exposure', dest='exposure_category', help="exposure category, or a raster of codes")
+    wind.add_argument('--structure', nargs=4, metavar=('SHAPE', 'AREA', 'TYPE', 'SPECIFIC'))
+    parser.add_argument('--shape', type=_shape, metavar='ROWS,COLUMNS', help="grid shape (needed for raw rasters)")
+    parser.add_argument('--tile', type=int, default=DEFAULT_TILE)
+    parser.add_argument('-o', '--output', default='grid_screening', help="output directory (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    inputs = {}
+    for name in SOIL_INPUTS + WIND_INPUTS:
+        value = getattr(args, name)
+        if value is not None:
+            inputs[name] = value if name in CATEGORICAL or os.path.isfile(value) else _number(parser, name, value)
+    structural_shape, area, structure_type, specific_type = args.structure or (None,) * 4
+    try:
+        screening = GridScreening(inputs, structural_shape, _number(parser, 'area', area) if area else None,
+                                  structure_type, specific_type, args.shape, args.tile)
+        summary = screening.run(args.output, progress=lambda done, total: print(
+            f"\r{done / total:.0%} of {total:,} cells", end='', file=sys.stderr, flush=True))
+    except ValueError as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    print(file=sys.stderr)
+    print(summary.report())
+
+
+def _number(parser, name, value):
+    try:
+        return float(value)
+    except ValueError:
+        parser.exit(2, f"{parser.prog}: error: {name}: {value!r} is neither a raster file nor a number\n")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,490 @@
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from functools import partial
+
+from .core import (CAUTION_RATIO, SoilAnalysis, SoilResult, calculate_lateral_earth_pressure, calculate_settlement,
+                   calculate_wind_load, soil_warning_flags)
+from .depgraph import Graph
+from .factors import FACTORS
+from .gui_tasks import Debouncer, ProgressPanel, TaskRunner
+
+
+# Wind Load Calculation classes
+def show_wind_error(e):
+    messagebox.showerror("Error", wind_error_text(e))
+
+
+def wind_error_text(e):
+    if isinstance(e, ValueError):
+        return str(e)
+    return f"Invalid input or selection: {str(e)}"
+
+
+def evaluate_wind_inputs(wind_speed_input, area_input, gust_factor_selection, shape_factor_selection, structure_type, specific_type):
+    graph = wind_inputs_graph()
+    graph.update(**dict(zip(WIND_INPUTS, (wind_speed_input, area_input, gust_factor_selection, shape_factor_selection,
+                                          structure_type, specific_type))))
+    return graph['report']
+
+
+# Computation graphs behind the live panels (see depgraph.py). Inputs are the
+# raw widget texts; each lookup or conversion is its own node, so editing one
+# field recomputes only what depends on it, e.g. a new wind speed recomputes
+# q, the wind load and the report but not G, Cd or the acceptable limit.
+WIND_INPUTS = ('wind_speed_input', 'area_input', 'gust_factor_selection', 'shape_factor_selection',
+               'structure_type', 'specific_type')
+SOIL_INPUTS = ('soil_type_input', 'soil_bearing_capacity_input', 'depth_of_soil_layer_input',
+               'water_table_depth_input')
+
+
+def positive_input(text, name):
+    if not text:
+        raise ValueError(f"{name} is required.")
+    value = float(text)
+    if value <= 0:
+        raise ValueError(f"{name} must be a positive number.")
+    return value
+
+
+def gust_factor_value(gust_factor_selection):
+    if not gust_factor_selection or gust_factor_selection not in gust_factor_map:
+        raise ValueError(f"Invalid gust factor selected: {gust_factor_selection}")
+    return gust_factor_map[gust_factor_selection]
+
+
+def drag_coefficient_value(shape_factor_selection):
+    if not shape_factor_selection or shape_factor_selection.lower() not in FACTORS.shapes:
+        raise ValueError(f"Invalid shape factor selected: {shape_factor_selection}")
+    return FACTORS.drag_coefficient(shape_factor_selection.lower())
+
+
+def acceptable_limits_value(structure_type, specific_type):
+    if not structure_type or structure_type not in FACTORS.structures:
+        raise ValueError(f"Invalid structure type selected: {structure_type}")
+    acceptable_limits = FACTORS.acceptable_limit(structure_type, specific_type)
+    if acceptable_limits is None:
+        raise ValueError(f"Invalid specific structure type selected: {specific_type}")
+    return acceptable_limits
+
+
+def wind_load_report(wind_load, acceptable_limits):
+    # Display wind load result and warnings
+    result = f"Calculated Wind Load: {wind_load:.2f} N\n"
+    if wind_load > acceptable_limits:
+        result += "[WARNING!] Wind load exceeds the acceptable limit!\n[RECOMMENDATION] Reinforce the structure."
+    elif wind_load > CAUTION_RATIO * acceptable_limits:
+        result += "[CAUTION!] Wind load is approaching the limit.\n[RECOMMENDATION] Monitor for damage."
+    else:
+        result += "[SAFE] Wind load is within acceptable limits."
+    return result
+
+
+# Nodes are read in the order evaluate_wind_inputs always validated them, so
+# the first error reported for a form is unchanged
+def wind_inputs_graph():
+    graph = Graph()
+    for name in WIND_INPUTS:
+        graph.input(name)
+    graph.node('q', lambda text: 0.613 * positive_input(text, "Wind speed")**2, 'wind_speed_input')
+    graph.node('G', gust_factor_value, 'gust_factor_selection')
+    graph.node('Cd', drag_coefficient_value, 'shape_factor_selection')
+    graph.node('area', lambda text: positive_input(text, "Area"), 'area_input')
+    graph.node('wind_load', calculate_wind_load, 'q', 'G', 'Cd', 'area')
+    graph.node('acceptable_limits', acceptable_limits_value, 'structure_type', 'specific_type')
+    graph.node('report', wind_load_report, 'wind_load', 'acceptable_limits')
+    return graph
+
+
+# The bearing capacity does not depend on the water table depth
+def allowable_bearing_capacity(soil_type, soil_bearing_capacity, depth_of_soil_layer):
+    return SoilAnalysis(soil_type, soil_bearing_capacity, depth_of_soil_layer, None).calculate_soil_bearing_capacity()
+
+
+def soil_inputs_graph():
+    graph = Graph()
+    for name in SOIL_INPUTS:
+        graph.input(name)
+    graph.node('soil_type', str.strip, 'soil_type_input')
+    graph.node('soil_bearing_capacity', float, 'soil_bearing_capacity_input')
+    graph.node('depth_of_soil_layer', float, 'depth_of_soil_layer_input')
+    graph.node('water_table_depth', float, 'water_table_depth_input')
+    graph.node('allowable_bearing_capacity', allowable_bearing_capacity,
+               'soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer')
+    graph.node('settlement', calculate_settlement)
+    graph.node('lateral_earth_pressure', calculate_lateral_earth_pressure)
+    graph.node('flags', soil_warning_flags,
+               'allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'water_table_depth')
+    graph.node('result', SoilResult, 'soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth',
+               'allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'flags')
+    graph.node('report', lambda result: result.report(rounded=True), 'result')
+    return graph
+
+
+# Runs a CSV/JSONL file through the batch engine on a worker thread, writing
+# <file>.results.<ext> next to it and reporting progress by rows read
+def import_batch_file(kind, path, task):
+    from .bulk_input import ErrorSidecar, run_batch
+
+    base, extension = os.path.splitext(path)
+    output_path = f"{base}.results{extension or '.csv'}"
+    estimated_rows = estimate_rows(path)
+    errors = ErrorSidecar(f"{output_path}.errors.jsonl")
+    task.report(0, estimated_rows, f"Reading {os.path.basename(path)}...")
+    with open(output_path, 'w', newline='') as output:
+        try:
+            processed = run_batch(kind, path, output, errors, chunk_size=10_000,
+                                  progress=lambda rows: task.report(rows, max(rows, estimated_rows),
+                                                                    f"{rows:,} rows analysed"))
+        finally:
+            errors.close()
+    summary = f"Analysed {processed:,} rows from {os.path.basename(path)} into {os.path.basename(output_path)}"
+    if errors.count:
+        summary += f"\nRejected {errors.count:,} rows (see {os.path.basename(errors.path)})"
+    return summary
+
+
+def estimate_rows(path, sample_size=1 << 16):
+    size = os.path.getsize(path)
+    with open(path, 'rb') as file:
+        sample = file.read(sample_size)
+    lines = sample.count(b'\n')
+    return max(1, int(size * lines / len(sample))) if lines else 1
+
+
+# Header and last rows of the soil or wind history file. Goes through the
+# row offset index (history_reader.py), so only the rows shown are read.
+def recent_history(kind, count=100):
+    from .history import soil_history, wind_history
+    from .history_reader import HistoryReader
+
+    history = soil_history if kind == 'soil' else wind_history
+    history.flush()
+    with HistoryReader(history.path) as reader:
+        return reader.header or history.header, reader.tail(count), len(reader)
+
+
+# Mappings for Wind Load, built once from the shared factor registry
+gust_factor_map = dict(zip(FACTORS.exposures.labels, FACTORS.exposures.values))
+
+MAX_WIND_SPEED = 100   # top of the what-if wind speed slider (m/s)
+
+shape_names = [shape.capitalize() for shape in FACTORS.shapes.names]
+
+specific_types_map = {structure.title(): [specific.title() for specific in specifics]
+                      for structure, specifics in zip(FACTORS.structures.names, FACTORS.structures.values)}
+
+# Wind Load Calculation function
+class WindLoadCalculator:
+    title = "Wind Load Calculator"
+
+    def __init__(self, root):
+        self.root = root
+        self.runner = TaskRunner(root)
+
+        self.wind_speed_label = tk.Label(root, text="Wind Speed (m/s):")
+        self.wind_speed_label.grid(row=0, column=0)
+        self.wind_speed_entry = tk.Entry(root)
+        self.wind_speed_entry.grid(row=0, column=1)
+
+        self.area_label = tk.Label(root, text="Area (m²):")
+        self.area_label.grid(row=1, column=0)
+        self.area_entry = tk.Entry(root)
+        self.area_entry.grid(row=1, column=1)
+
+        self.gust_factor_label = tk.Label(root, text="Gust Factor:")
+        self.gust_factor_label.grid(row=2, column=0)
+        self.gust_factor_combobox = ttk.Combobox(root, values=list(gust_factor_map))
+        self.gust_factor_combobox.grid(row=2, column=1)
+
+        self.shape_label = tk.Label(root, text="Shape Factor:")
+        self.shape_label.grid(row=3, column=0)
+        self.shape_combobox = ttk.Combobox(root, values=shape_names)
+        self.shape_combobox.grid(row=3, column=1)
+
+        self.structure_label = tk.Label(root, text="Structure Type:")
+        self.structure_label.grid(row=4, column=0)
+        self.structure_combobox = ttk.Combobox(root, values=list(specific_types_map))
+        self.structure_combobox.grid(row=4, column=1)
+        self.structure_combobox.bind("<<ComboboxSelected>>", self.update_specific_types)
+
+        self.specific_type_label = tk.Label(root, text="Specific Structure Type:")
+        self.specific_type_label.grid(row=5, column=0)
+        self.specific_type_combobox = ttk.Combobox(root)
+        self.specific_type_combobox.grid(row=5, column=1)
+
+        self.wind_load_result_label = tk.Label(root, text="Wind Load Result: ")
+        self.wind_load_result_label.grid(row=6, column=0, columnspan=2)
+
+        self.calculate_button = tk.Button(root, text="Calculate", command=self.calculate)
+        self.calculate_button.grid(row=7, column=0, columnspan=2)
+
+        self.import_button = tk.Button(root, text="Import File...", command=self.import_file)
+        self.import_button.grid(row=8, column=0, columnspan=2)
+
+        self.progress_panel = ProgressPanel(root, self.runner)
+        self.progress_panel.grid(row=9, column=0, columnspan=2)
+
+        # What-if slider for the wind speed; it writes into the entry
+        self.wind_speed_scale = tk.Scale(root, from_=0, to=MAX_WIND_SPEED, resolution=0.5, orient=tk.HORIZONTAL,
+                                         showvalue=False, command=self.slide_wind_speed)
+        self.wind_speed_scale.grid(row=0, column=2)
+
+        # The result follows the form as it is edited
+        self.graph = wind_inputs_graph()
+        self.live_update = Debouncer(root, self.show_live_result)
+        for entry in (self.wind_speed_entry, self.area_entry):
+            entry.bind("<KeyRelease>", self.live_update)
+        for combobox in (self.gust_factor_combobox, self.shape_combobox, self.structure_combobox,
+                         self.specific_type_combobox):
+            combobox.bind("<KeyRelease>", self.live_update)
+            combobox.bind("<<ComboboxSelected>>", self.live_update, add='+')
+
+    def inputs(self):
+        return dict(zip(WIND_INPUTS, (self.wind_speed_entry.get(), self.area_entry.get(),
+                                      self.gust_factor_combobox.get().strip(), self.shape_combobox.get().strip(),
+                                      self.structure_combobox.get().strip().lower(),
+                                      self.specific_type_combobox.get().strip().lower())))
+
+    # Runs on the Tk thread like the soil panel's evaluate(); the graph is
+    # not shared with the TaskRunner's worker
+    def evaluate(self):
+        self.graph.update(**self.inputs())
+        return self.graph['report']
+
+    def calculate(self):
+        self.live_update.cancel()
+        try:
+            self.wind_load_result_label.config(text=self.evaluate())
+        except Exception as e:
+            show_wind_error(e)
+
+    # Errors are shown in place while typing rather than in a dialog
+    def show_live_result(self):
+        try:
+            text = self.evaluate()
+        except Exception as e:
+            text = wind_error_text(e)
+        self.wind_load_result_label.config(text=text)
+
+    def slide_wind_speed(self, value):
+        self.wind_speed_entry.delete(0, tk.END)
+        self.wind_speed_entry.insert(0, value)
+        self.live_update()
+
+    def import_file(self):
+        path = filedialog.askopenfilename(title="Import wind load scenarios",
+                                          filetypes=[("CSV or JSONL", "*.csv *.jsonl"), ("All files", "*.*")])
+        if path:
+            self.runner.submit(partial(import_batch_file, 'wind', path),
+                               partial(messagebox.showinfo, "Import complete"), on_error=show_wind_error)
+
+    def update_specific_types(self, event):
+        
+        structure_type = self.structure_combobox.get().strip()
+
+        if structure_type in specific_types_map:
+            self.specific_type_combobox['values'] = specific_types_map[structure_type]
+        else:
+            self.specific_type_combobox['values'] = []
+
+       
+        self.specific_type_combobox.set("")
+
+class SoilAnalysisGUI:
+    title = "Soil Analysis"
+
+    def __init__(self, root):
+        self.root = root
+        self.runner = TaskRunner(root)
+
+        # Soil Parameters Entry
+        self.soil_type_label = tk.Label(root, text="Soil Type (Clay, Sand, Silt, Loam):")
+        self.soil_type_label.grid(row=0, column=0)
+        self.soil_type_entry = tk.Entry(root)
+        self.soil_type_entry.grid(row=0, column=1)
+
+        self.soil_bearing_capacity_label = tk.Label(root, text="Soil Bearing Capacity (kN/m²):")
+        self.soil_bearing_capacity_label.grid(row=1, column=0)
+        self.soil_bearing_capacity_entry = tk.Entry(root)
+        self.soil_bearing_capacity_entry.grid(row=1, column=1)
+
+        self.depth_of_soil_layer_label = tk.Label(root, text="Depth of Soil Layer (m):")
+        self.depth_of_soil_layer_label.grid(row=2, column=0)
+        self.depth_of_soil_layer_entry = tk.Entry(root)
+        self.depth_of_soil_layer_entry.grid(row=2, column=1)
+
+        self.water_table_depth_label = tk.Label(root, text="Water Table Depth (m):")
+        self.water_table_depth_label.grid(row=3, column=0)
+        self.water_table_depth_entry = tk.Entry(root)
+        self.water_table_depth_entry.grid(row=3, column=1)
+
+       
+        self.result_label = tk.Label(root, text="Soil Analysis Results:")
+        self.result_label.grid(row=4, column=0, columnspan=2)
+
+      
+        self.calculate_button = tk.Button(root, text="Calculate", command=self.perform_soil_analysis)
+        self.calculate_button.grid(row=5, column=0, columnspan=2)
+
+        self.import_button = tk.Button(root, text="Import File...", command=self.import_file)
+        self.import_button.grid(row=6, column=0, columnspan=2)
+
+        self.progress_panel = ProgressPanel(root, self.runner)
+        self.progress_panel.grid(row=7, column=0, columnspan=2)
+
+        # The result follows the form as it is edited
+        self.graph = soil_inputs_graph()
+        self.live_update = Debouncer(root, self.show_live_result)
+        for entry in (self.soil_type_entry, self.soil_bearing_capacity_entry, self.depth_of_soil_layer_entry,
+                      self.water_table_depth_entry):
+            entry.bind("<KeyRelease>", self.live_update)
+
+    def inputs(self):
+        return dict(zip(SOIL_INPUTS, (self.soil_type_entry.get(), self.soil_bearing_capacity_entry.get(),
+                                      self.depth_of_soil_layer_entry.get(), self.water_table_depth_entry.get())))
+
+    # Only the nodes below the edited fields are recomputed, which takes
+    # microseconds, so this runs on the Tk thread rather than the TaskRunner
+    # (which also keeps the graph off the worker thread); imports still go
+    # through the runner
+    def evaluate(self):
+        self.graph.update(**self.inputs())
+        return self.graph['report']
+
+    def perform_soil_analysis(self):
+        self.live_update.cancel()
+        try:
+            self.result_label.config(text=self.evaluate())
+        except Exception as e:
+            self.show_error(e)
+
+    def show_live_result(self):
+        try:
+            text = self.evaluate()
+        except Exception as e:
+            text = f"Invalid input: {str(e)}"
+        self.result_label.config(text=text)
+
+    def import_file(self):
+        path = filedialog.askopenfilename(title="Import soil samples",
+                                          filetypes=[("CSV or JSONL", "*.csv *.jsonl"), ("All files", "*.*")])
+        if path:
+            self.runner.submit(partial(import_batch_file, 'soil', path),
+                               partial(messagebox.showinfo, "Import complete"), on_error=self.show_error)
+
+    def show_error(self, e):
+        messagebox.showerror("Input Error", f"Invalid input: {str(e)}")
+
+class HistoryViewer:
+    title = "Analysis History"
+    rows_shown = 100
+
+    def __init__(self, root):
+        self.root = root
+        self.runner = TaskRunner(root)
+
+        self.kind = tk.StringVar(value='soil')
+        tk.Radiobutton(root, text="Soil analyses", variable=self.kind, value='soil',
+                       command=self.load).grid(row=0, column=0)
+        tk.Radiobutton(root, text="Wind load calculations", variable=self.kind, value='wind',
+                       command=self.load).grid(row=0, column=1)
+        self.refresh_button = tk.Button(root, text="Refresh", command=self.load)
+        self.refresh_button.grid(row=0, column=2)
+
+        self.table = ttk.Treeview(root, show='headings', height=20)
+        self.table.grid(row=1, column=0, columnspan=3)
+        self.status_label = tk.Label(root, text="")
+        self.status_label.grid(row=2, column=0, columnspan=3)
+        self.load()
+
+    def load(self):
+        kind = self.kind.get()
+        self.runner.submit(lambda task: recent_history(kind, self.rows_shown), self.show_rows,
+                           on_error=self.show_error)
+
+    def show_rows(self, result):
+        header, rows, total = result
+        self.table.delete(*self.table.get_children())
+        self.table['columns'] = list(range(len(header)))
+        for column, name in enumerate(header):
+            self.table.heading(column, text=name)
+            self.table.column(column, width=120)
+        # Newest first
+        for row in reversed(rows):
+            self.table.insert('', tk.END, values=row)
+        self.status_label.config(text=f"Latest {len(rows):,} of {total:,} records")
+
+    def show_error(self, e):
+        messagebox.showerror("History Error", f"Could not read the history: {str(e)}")
+
+# Main Menu window to select between Soil Analysis or Wind Load Calculation.
+# Everything lives in one Tk root: each panel is built in its own frame on
+# first visit and kept, so switching back and forth is instant and keeps
+# whatever was entered.
+class MainMenu:
+    title = "Main Menu"
+
+    def __init__(self, root):
+        self.root = root
+        self.panels = {}
+        self.frames = {}
+        self.current = None
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        self.menu_frame = tk.Frame(root)
+        self.soil_analysis_button = tk.Button(self.menu_frame, text="Soil Analysis", command=self.start_soil_analysis)
+        self.soil_analysis_button.grid(row=0, column=0, pady=10)
+
+        self.wind_load_button = tk.Button(self.menu_frame, text="Wind Load Calculation", command=self.start_wind_load_calculator)
+        self.wind_load_button.grid(row=1, column=0, pady=10)
+
+        self.history_button = tk.Button(self.menu_frame, text="Analysis History", command=self.start_history_viewer)
+        self.history_button.grid(row=2, column=0, pady=10)
+        self.frames[MainMenu] = self.menu_frame
+        self.show(MainMenu)
+
+    def start_soil_analysis(self):
+        self.show(SoilAnalysisGUI)
+
+    def start_wind_load_calculator(self):
+        self.show(WindLoadCalculator)
+
+    def start_history_viewer(self):
+        self.show(HistoryViewer)
+
+    def show_menu(self):
+        self.show(MainMenu)
+
+    def panel(self, panel_class):
+        if panel_class not in self.panels:
+            frame = tk.Frame(self.root)
+            body = tk.Frame(frame)
+            body.grid(row=0, column=0)
+            self.panels[panel_class] = panel_class(body)
+            tk.Button(frame, text="Back to Menu", command=self.show_menu).grid(row=1, column=0, pady=5)
+            self.frames[panel_class] = frame
+        return self.panels[panel_class]
+
+    def show(self, panel_class):
+        if panel_class is not MainMenu:
+            self.panel(panel_class)
+        if self.current is not None:
+            self.frames[self.current].grid_forget()
+        self.frames[panel_class].grid(row=0, column=0)
+        self.root.title(panel_class.title)
+        self.current = panel_class
+
+    def close(self):
+        for panel in self.panels.values():
+            panel.runner.shutdown()
+        self.root.destroy()
+
+def main():
+    root = tk.Tk()
+    app = MainMenu(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
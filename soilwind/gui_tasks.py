@@ -0,0 +1,166 @@
+import queue
+import threading
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import ttk
+
+# ~60 updates per second; results and progress are handed to Tk no more often
+FRAME_INTERVAL_MS = 16
+# Quiet period after the last keystroke before live results are recomputed
+DEBOUNCE_MS = 150
+
+
+class Cancelled(Exception):
+    pass
+
+
+# Handle passed to a running job. Jobs call report() as they go and
+# check_cancelled() between chunks of work; both are safe off the Tk thread.
+class Task:
+    def __init__(self, runner):
+        self._runner = runner
+        self._cancel = threading.Event()
+        self.progress = None
+
+    def report(self, done, total=None, message=""):
+        self.check_cancelled()
+        self.progress = (done, total, message)
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise Cancelled()
+
+
+# Runs jobs on a worker thread and marshals their results back onto the Tk
+# thread with root.after, so button callbacks return immediately and the
+# window keeps repainting while a job runs.
+class TaskRunner:
+    def __init__(self, root, workers=1):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gui-task")
+        self._done = queue.Queue()
+        self._active = []
+        self._polling = False
+        self.listeners = []
+
+    def submit(self, job, on_done, on_error=None, on_cancel=None):
+        task = Task(self)
+        self._active.append(task)
+
+        def run():
+            try:
+                self._done.put((task, on_done, (job(task),)))
+            except Cancelled:
+                self._done.put((task, on_cancel, ()))
+            except Exception as e:
+                self._done.put((task, on_error, (e,)))
+
+        self._executor.submit(run)
+        self._notify()
+        self._schedule()
+        return task
+
+    def cancel_all(self):
+        for task in self._active:
+            task.cancel()
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def current_progress(self):
+        for task in self._active:
+            if task.progress is not None:
+                return task.progress
+        return None
+
+    def _schedule(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(FRAME_INTERVAL_MS, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                task, callback, args = self._done.get_nowait()
+            except queue.Empty:
+                break
+            self._active.remove(task)
+            if callback is not None:
+                callback(*args)
+        self._notify()
+        if self._active:
+            self._schedule()
+
+    def _notify(self):
+        for listener in self.listeners:
+            listener(self)
+
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Progress bar with a cancel button that follows a TaskRunner
+class ProgressPanel(tk.Frame):
+    def __init__(self, parent, runner):
+        super().__init__(parent)
+        self.runner = runner
+        self.progress_bar = ttk.Progressbar(self, length=200, mode='determinate', maximum=1000)
+        self.progress_bar.grid(row=0, column=0, padx=2)
+        self.cancel_button = tk.Button(self, text="Cancel", command=runner.cancel_all, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=1, padx=2)
+        self.status_label = tk.Label(self, text="")
+        self.status_label.grid(row=1, column=0, columnspan=2)
+        runner.listeners.append(self.update_progress)
+
+    def update_progress(self, runner):
+        self.cancel_button.config(state=tk.NORMAL if runner.busy else tk.DISABLED)
+        progress = runner.current_progress()
+        if not runner.busy:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=0)
+            self.status_label.config(text="")
+            return
+        if progress is None or progress[1] is None:
+            if str(self.progress_bar.cget('mode')) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(FRAME_INTERVAL_MS)
+        else:
+            done, total, _ = progress
+            if str(self.progress_bar.cget('mode')) != 'determinate':
+                self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=1000 * min(done / total, 1.0) if total else 0)
+        if progress is not None:
+            self.status_label.config(text=progress[2])
+
+
+# Collapses a burst of calls (one per keystroke) into a single callback
+# delay_ms after the last one, on the Tk thread
+class Debouncer:
+    def __init__(self, root, callback, delay_ms=DEBOUNCE_MS):
+        self.root = root
+        self.callback = callback
+        self.delay_ms = delay_ms
+        self._pending = None
+
+    def __call__(self, event=None):
+        self.cancel()
+        self._pending = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        if self._pending is not None:
+            self.root.after_cancel(self._pending)
+            self._pending = None
+
+    def _fire(self):
+        self._pending = None
+        self.callback()
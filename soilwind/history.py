@@ -0,0 +1,40 @@
+from .history_logger import open_history
+
+SOIL_HISTORY_HEADER = ['Soil Type', 'Soil Bearing Capacity (kN/m^2)', 'Depth  of Soil layer (m)',
+                       'Water table Depeth (m)', 'Allowable Bearing Capacity (kN)', 'Settlement (m)',
+                       'Lateral Earth Pressure', 'Water Table Effect']
+WIND_HISTORY_HEADER = ['Wind Load Calculation', 'Structure Type', 'Specific Type', 'Acceptable Limits']
+
+# History files are kept open by background writers; rows are queued and
+# written in batches (see history_logger.py)
+soil_history = open_history('soil_analysis_history.csv', SOIL_HISTORY_HEADER)
+wind_history = open_history('wind_load_history.csv', WIND_HISTORY_HEADER)
+
+# Extra history backends (e.g. history_store.SQLiteHistoryStore) that receive
+# every record logged to the CSV files
+history_backends = []
+
+def add_history_backend(backend):
+    history_backends.append(backend)
+    return backend
+
+def log_soil_analysis_to_csv(soil_analysis, results=None):
+    # results: the SoilResult (or results() tuple) when the caller already
+    # computed them
+    result = soil_analysis.result(results)
+    row = result.history_row()
+    soil_history.log(row)
+    for backend in history_backends:
+        backend.log_soil(*row[:7])
+        
+def log_wind_load_to_csv(wind_load, structure_type, specific_type, acceptable_limits):
+    wind_history.log([wind_load, structure_type, specific_type, acceptable_limits])
+    for backend in history_backends:
+        backend.log_wind(wind_load, structure_type, specific_type, acceptable_limits)
+
+def configure_history(batch_size=None, flush_interval=None):
+    for logger in (soil_history, wind_history):
+        if batch_size is not None:
+            logger.batch_size = batch_size
+        if flush_interval is not None:
+            logger.flush_interval = flush_interval
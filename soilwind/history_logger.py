@@ -0,0 +1,119 @@
+import atexit
+import csv
+import os
+import queue
+import threading
+import time
+
+from . import instrument
+
+_STOP = object()
+_FLUSH = object()
+
+
+# Appends rows to a CSV history file from a background thread. The file is
+# opened once, rows are queued by the caller and written in batches of
+# batch_size, or every flush_interval seconds when fewer rows are waiting.
+class HistoryLogger:
+    def __init__(self, path, header, batch_size=1000, flush_interval=1.0):
+        self.path = path
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._error = None
+
+    def log(self, row):
+        self.log_many([row])
+
+    def log_many(self, rows):
+        if self._error is not None:
+            raise self._error
+        self._start()
+        self._queue.put(rows if isinstance(rows, list) else list(rows))
+
+    def flush(self):
+        # Blocks until every queued row has been written to disk
+        if self._thread is not None:
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"history:{self.path}", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        try:
+            file_exists = os.path.isfile(self.path) and os.path.getsize(self.path) > 0
+            file = open(self.path, mode='a', newline='')
+        except OSError as e:
+            # Keep draining so flush() and close() callers are not left waiting
+            self._error = e
+            while self._queue.get() is not _STOP:
+                self._queue.task_done()
+            self._queue.task_done()
+            return
+        with file:
+            writer = csv.writer(file)
+            if not file_exists:
+                writer.writerow(self.header)
+            self._write_loop(file, writer)
+
+    def _write_loop(self, file, writer):
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            try:
+                if isinstance(item, list):
+                    pending.extend(item)
+                    if len(pending) < self.batch_size and time.monotonic() < deadline:
+                        continue
+                if pending:
+                    with instrument.stage('history.write'):
+                        writer.writerows(pending)
+                        file.flush()
+                    instrument.count('history.rows_written', len(pending))
+                deadline = time.monotonic() + self.flush_interval
+            except Exception as e:
+                self._error = e
+            finally:
+                # Rows are marked done as soon as they are taken; a _FLUSH or
+                # _STOP marker only after everything before it is written
+                if item is not None:
+                    self._queue.task_done()
+            pending = []
+            if item is _STOP:
+                return
+
+
+_loggers = []
+
+
+def open_history(path, header, batch_size=1000, flush_interval=1.0):
+    logger = HistoryLogger(path, header, batch_size, flush_interval)
+    _loggers.append(logger)
+    return logger
+
+
+@atexit.register
+def close_all():
+    for logger in _loggers:
+        logger.close()
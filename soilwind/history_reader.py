@@ -0,0 +1,215 @@
+import csv
+import mmap
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Random access to the CSV history files without reading them whole. The file
+# is memory-mapped and the byte offset of every row is kept in a persisted
+# index next to it (<file>.idx), so row N, the last rows or a row range is a
+# slice of the map. refresh() indexes only the bytes appended since the index
+# was last written; a row the writer is still appending (no newline yet) is
+# left for the next refresh.
+#
+# Index file: a 24-byte header (magic, bytes of the CSV covered, CRC-32 of the
+# last FINGERPRINT_BYTES of them) followed by the uint64 start offset of every
+# data row. A CSV that shrank or whose covered bytes changed is reindexed.
+
+INDEX_MAGIC = b'SWHIDX1\n'
+INDEX_HEADER = struct.Struct('<8sQI4x')
+FINGERPRINT_BYTES = 64
+SCAN_BLOCK = 64 << 20   # bytes searched for newlines at a time
+
+
+class HistoryReader:
+    def __init__(self, path, index_path=None, persist=True):
+        self.path = path
+        self.index_path = index_path or f'{path}.idx'
+        self.persist = persist
+        self.header = None
+        self.offsets = np.empty(0, dtype=np.uint64)
+        self.indexed_bytes = 0
+        self._file = None
+        self._map = None
+        self._loaded = False
+        self.refresh()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.offsets = np.empty(0, dtype=np.uint64)
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    # Maps any bytes appended to the CSV and indexes their complete rows;
+    # returns the number of new rows
+    def refresh(self):
+        if self._file is not None and self._replaced():
+            self.close()
+            self.header = None
+            self.indexed_bytes = 0
+        if self._file is None:
+            try:
+                self._file = open(self.path, 'rb')
+            except FileNotFoundError:
+                return 0
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            return 0
+        if self._map is None or len(self._map) != size:
+            if self._map is not None:
+                self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.header is None:
+            end = self._map.find(b'\n')
+            if end < 0:
+                return 0
+            self.header = next(csv.reader([self._map[:end].decode()]))
+            self._header_bytes = end + 1
+        if not self._loaded:
+            self._loaded = True
+            self._load_index(size)
+        if self.indexed_bytes > size or self._fingerprint(self.indexed_bytes) != self._indexed_fingerprint:
+            self.offsets = np.empty(0, dtype=np.uint64)
+            self.indexed_bytes = 0
+        rebuilt = self.indexed_bytes == 0
+        start = self.indexed_bytes or self._header_bytes
+        new_offsets = self._index_rows(start, size)
+        if len(new_offsets):
+            self.offsets = np.concatenate((self.offsets, new_offsets)) if len(self.offsets) else new_offsets
+            self.indexed_bytes = int(self._row_end)
+        elif rebuilt:
+            self.indexed_bytes = start
+        self._indexed_fingerprint = self._fingerprint(self.indexed_bytes)
+        if self.persist and (len(new_offsets) or rebuilt):
+            self._save_index(new_offsets, rebuilt)
+        return len(new_offsets)
+
+    # The history was rotated or rewritten under a new file
+    def _replaced(self):
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _fingerprint(self, end):
+        if self._map is None or end > len(self._map):
+            return None
+        return zlib.crc32(self._map[max(0, end - FINGERPRINT_BYTES):end])
+
+    def _load_index(self, size):
+        self._indexed_fingerprint = self._fingerprint(0)
+        try:
+            with open(self.index_path, 'rb') as file:
+                magic, indexed_bytes, fingerprint = INDEX_HEADER.unpack(file.read(INDEX_HEADER.size))
+        except (FileNotFoundError, struct.error):
+            return
+        if magic != INDEX_MAGIC or indexed_bytes > size or self._fingerprint(indexed_bytes) != fingerprint:
+            return
+        offsets = np.memmap(self.index_path, dtype='<u8', mode='r', offset=INDEX_HEADER.size) \
+            if os.path.getsize(self.index_path) > INDEX_HEADER.size else np.empty(0, dtype=np.uint64)
+        # Offsets appended after the header was last written are dropped
+        self.offsets = offsets[:np.searchsorted(offsets, indexed_bytes)]
+        self.indexed_bytes = indexed_bytes
+        self._indexed_fingerprint = fingerprint
+
+    # Start offsets of the complete rows in [start, size); self._row_end is
+    # set to the end of the last one
+    def _index_rows(self, start, size):
+        newlines = []
+        for block in range(start, size, SCAN_BLOCK):
+            data = np.frombuffer(self._map, dtype=np.uint8, count=min(SCAN_BLOCK, size - block), offset=block)
+            newlines.append(np.flatnonzero(data == 10).astype(np.uint64) + np.uint64(block))
+        ends = np.concatenate(newlines) + np.uint64(1) if newlines else np.empty(0, dtype=np.uint64)
+        if not len(ends):
+            return ends
+        self._row_end = ends[-1]
+        return np.concatenate(([np.uint64(start)], ends[:-1]))
+
+    def _save_index(self, new_offsets, rebuilt):
+        # Offsets first, header last: a reader never trusts rows the header does not cover
+        try:
+            with open(self.index_path, 'wb' if rebuilt else 'r+b') as file:
+                if rebuilt:
+                    file.write(INDEX_HEADER.pack(INDEX_MAGIC, 0, 0))
+                    file.write(self.offsets.astype('<u8').tobytes())
+                else:
+                    file.seek(INDEX_HEADER.size + (len(self.offsets) - len(new_offsets)) * 8)
+                    file.write(new_offsets.astype('<u8').tobytes())
+                    file.truncate()
+                file.flush()
+                file.seek(0)
+                file.write(INDEX_HEADER.pack(INDEX_MAGIC, self.indexed_bytes, self._indexed_fingerprint))
+        except OSError:
+            # Read-only location: the in-memory index still works
+            self.persist = False
+
+    def _byte_range(self, start, stop):
+        begin = int(self.offsets[start])
+        end = int(self.offsets[stop]) if stop < len(self.offsets) else self.indexed_bytes
+        return begin, end
+
+    # Raw bytes of row n, without the line ending
+    def line(self, n):
+        n = range(len(self))[n]
+        begin, end = self._byte_range(n, n + 1)
+        return self._map[begin:end].rstrip(b'\r\n')
+
+    def row(self, n):
+        return next(csv.reader([self.line(n).decode()]))
+
+    # Parsed rows [start, stop), decoded in one go
+    def rows(self, start=0, stop=None):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        begin, end = self._byte_range(start, stop)
+        return list(csv.reader(self._map[begin:end].decode().splitlines()))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.step not in (None, 1):
+                return [self.row(n) for n in range(len(self))[index]]
+            return self.rows(index.start, index.stop)
+        return self.row(index)
+
+    def tail(self, count=100):
+        return self.rows(max(0, len(self) - count))
+
+    # (start, stop) row ranges of about equal size covering the file
+    def chunks(self, parts):
+        bounds = np.linspace(0, len(self), max(1, parts) + 1).astype(int)
+        return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+    # Calls func(rows) on every chunk in worker processes, each mapping the
+    # file itself, and returns the results in file order. func must be
+    # picklable (a module-level function).
+    def scan(self, func, workers=None, parts=None):
+        workers = workers or os.cpu_count()
+        ranges = [self._byte_range(start, stop) for start, stop in self.chunks(parts or workers * 4)]
+        if workers == 1:
+            return [func(self._decode_range(begin, end)) for begin, end in ranges]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_scan_range, [self.path] * len(ranges), *zip(*ranges), [func] * len(ranges)))
+
+    def _decode_range(self, begin, end):
+        return list(csv.reader(self._map[begin:end].decode().splitlines()))
+
+
+def _scan_range(path, begin, end, func):
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return func(list(csv.reader(mapped[begin:end].decode().splitlines())))
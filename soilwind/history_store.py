@@ -0,0 +1,322 @@
+import argparse
+import atexit
+import csv
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from .core import STATUS_NAMES, soil_warning_flags, wind_load_status
+from .factors import FACTORS
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS soil_history (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL,
+    soil_type INTEGER NOT NULL,
+    soil_bearing_capacity REAL NOT NULL,
+    depth_of_soil_layer REAL NOT NULL,
+    water_table_depth REAL NOT NULL,
+    allowable_bearing_capacity REAL NOT NULL,
+    settlement REAL NOT NULL,
+    lateral_earth_pressure REAL NOT NULL,
+    warnings INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS soil_history_soil_type ON soil_history (soil_type, timestamp);
+CREATE INDEX IF NOT EXISTS soil_history_timestamp ON soil_history (timestamp);
+
+CREATE TABLE IF NOT EXISTS wind_history (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL,
+    wind_load REAL NOT NULL,
+    structure_type INTEGER NOT NULL,
+    specific_type INTEGER NOT NULL,
+    acceptable_limits REAL NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wind_history_structure_type ON wind_history (structure_type, specific_type, timestamp);
+CREATE INDEX IF NOT EXISTS wind_history_timestamp ON wind_history (timestamp);
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path TEXT PRIMARY KEY,
+    line INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+'''
+
+SOIL_COLUMNS = ('timestamp', 'soil_type', 'soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth',
+                'allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'warnings')
+WIND_COLUMNS = ('timestamp', 'wind_load', 'structure_type', 'specific_type', 'acceptable_limits', 'status')
+IMPORT_BATCH_ROWS = 10_000
+
+# Enum columns are stored as FACTORS codes; -1 marks a name the registry does not know
+ENUM_TABLES = {'soil_type': FACTORS.soils, 'structure_type': FACTORS.structures,
+               'specific_type': FACTORS.specific_types}
+
+
+# Default timestamp: the time the record is logged. Pass None to store NULL.
+NOW = object()
+
+
+def _timestamp(timestamp):
+    return time.time() if timestamp is NOW else timestamp
+
+
+def _encode(column, name):
+    return ENUM_TABLES[column].codes.get(name, -1)
+
+
+def _decode(column, code):
+    table = ENUM_TABLES[column]
+    return table.names[code] if 0 <= code < len(table) else None
+
+
+def _status_code(status):
+    if isinstance(status, str):
+        if status.upper() not in STATUS_NAMES:
+            raise ValueError(f"Unknown wind load status: {status} (expected one of {', '.join(STATUS_NAMES)})")
+        return STATUS_NAMES.index(status.upper())
+    return status
+
+
+def _insert_sql(table):
+    columns = SOIL_COLUMNS if table == 'soil_history' else WIND_COLUMNS
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+# NaN would be stored as NULL in the NOT NULL columns
+def _check_finite(columns, values):
+    for column, value in zip(columns, values):
+        if not math.isfinite(value):
+            raise ValueError(f"{column} must be a finite number, got {value!r}")
+
+
+def soil_row(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth, allowable_bearing_capacity,
+             settlement, lateral_earth_pressure, timestamp=NOW):
+    _check_finite(SOIL_COLUMNS[2:8], (soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                                      allowable_bearing_capacity, settlement, lateral_earth_pressure))
+    warnings = soil_warning_flags(allowable_bearing_capacity, settlement, lateral_earth_pressure, water_table_depth)
+    return (_timestamp(timestamp), _encode('soil_type', soil_type), soil_bearing_capacity, depth_of_soil_layer,
+            water_table_depth, allowable_bearing_capacity, settlement, lateral_earth_pressure, warnings)
+
+
+def wind_row(wind_load, structure_type, specific_type, acceptable_limits, timestamp=NOW):
+    _check_finite(('wind_load', 'acceptable_limits'), (wind_load, acceptable_limits))
+    return (_timestamp(timestamp), wind_load, _encode('structure_type', structure_type),
+            _encode('specific_type', specific_type), acceptable_limits, wind_load_status(wind_load, acceptable_limits))
+
+
+# SQLite history backend with typed columns and indexes on soil type,
+# structure type and timestamp. Rows are buffered and inserted with one
+# executemany per batch_size rows; pass it to history.add_history_backend
+# to receive everything the CSV loggers write.
+class SQLiteHistoryStore:
+    def __init__(self, path='analysis_history.sqlite', batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+        self._pending = {'soil_history': [], 'wind_history': []}
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def log_soil(self, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                 allowable_bearing_capacity, settlement, lateral_earth_pressure, timestamp=NOW):
+        self._add('soil_history', soil_row(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                                           allowable_bearing_capacity, settlement, lateral_earth_pressure, timestamp))
+
+    def log_wind(self, wind_load, structure_type, specific_type, acceptable_limits, timestamp=NOW):
+        self._add('wind_history', wind_row(wind_load, structure_type, specific_type, acceptable_limits, timestamp))
+
+    def log_soil_batch(self, batch, result, timestamp=NOW):
+        import numpy as np
+
+        shape = batch.shape
+        columns = [np.full(shape, _timestamp(timestamp)),
+                   np.broadcast_to(batch.soil_type, shape), np.broadcast_to(batch.soil_bearing_capacity, shape),
+                   np.broadcast_to(batch.depth_of_soil_layer, shape), np.broadcast_to(batch.water_table_depth, shape),
+                   result.allowable_bearing_capacity, result.settlement, result.lateral_earth_pressure,
+                   result.warnings]
+        self._add_many('soil_history', zip(*(column.tolist() for column in columns)))
+
+    # structure_type and specific_type are the names (or FACTORS codes) the
+    # wind_load_sweep result was computed from
+    def log_wind_batch(self, result, structure_type, specific_type, timestamp=NOW):
+        import numpy as np
+
+        shape = result.shape
+        columns = [np.full(shape, _timestamp(timestamp)), result.wind_load,
+                   np.broadcast_to(FACTORS.structures.encode_array(structure_type, str.lower), shape),
+                   np.broadcast_to(FACTORS.specific_types.encode_array(specific_type, str.lower), shape),
+                   result.acceptable_limits, result.status]
+        self._add_many('wind_history', zip(*(column.tolist() for column in columns)))
+
+    def _add(self, table, row):
+        with self._lock:
+            pending = self._pending[table]
+            pending.append(row)
+            if len(pending) >= self.batch_size:
+                self._write(table)
+
+    def _add_many(self, table, rows):
+        with self._lock:
+            self._pending[table].extend(rows)
+            self._write(table)
+
+    def _write(self, table):
+        pending = self._pending[table]
+        if pending:
+            with self.connection:
+                self.connection.executemany(_insert_sql(table), pending)
+            pending.clear()
+
+    def flush(self):
+        with self._lock:
+            for table in self._pending:
+                self._write(table)
+
+    # Where a CSV import of path stopped: (last line imported, file size then)
+    def import_position(self, path):
+        row = self.connection.execute("SELECT line, size FROM imported_files WHERE path = ?", (path,)).fetchone()
+        return row or (0, 0)
+
+    # Inserts imported rows and moves the file's import position in one
+    # transaction, so an interrupted import resumes without duplicates
+    def import_rows(self, table, rows, path, line, size):
+        with self._lock, self.connection:
+            self.connection.executemany(_insert_sql(table), rows)
+            self.connection.execute("INSERT OR REPLACE INTO imported_files (path, line, size) VALUES (?, ?, ?)",
+                                    (path, line, size))
+
+    def close(self):
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+            atexit.unregister(self.close)
+
+    # Queries take equality filters on the enum columns and the wind status
+    # (by name), a [since, until) timestamp range and inclusive min_<column>/max_<column>
+    # bounds on any numeric column, e.g. query_soil(soil_type='Clay', min_settlement=0.01)
+    def query_soil(self, limit=None, **filters):
+        return self._query('soil_history', SOIL_COLUMNS, limit, filters)
+
+    def query_wind(self, limit=None, **filters):
+        return self._query('wind_history', WIND_COLUMNS, limit, filters)
+
+    def count_soil(self, **filters):
+        return self._count('soil_history', SOIL_COLUMNS, filters)
+
+    def count_wind(self, **filters):
+        return self._count('wind_history', WIND_COLUMNS, filters)
+
+    def _where(self, columns, filters):
+        clauses, params = [], []
+        for key, value in filters.items():
+            if key == 'since':
+                clauses.append("timestamp >= ?")
+            elif key == 'until':
+                clauses.append("timestamp < ?")
+            elif key.startswith(('min_', 'max_')) and key[4:] in columns:
+                clauses.append(f"{key[4:]} {'>=' if key.startswith('min_') else '<='} ?")
+            elif key in ENUM_TABLES and key in columns:
+                clauses.append(f"{key} = ?")
+                value = _encode(key, value)
+            elif key == 'status' and key in columns:
+                clauses.append("status = ?")
+                value = _status_code(value)
+            elif key in columns:
+                clauses.append(f"{key} = ?")
+            else:
+                raise ValueError(f"Unknown history filter: {key}")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _query(self, table, columns, limit, filters):
+        self.flush()
+        where, params = self._where(columns, filters)
+        sql = f"SELECT {', '.join(columns)} FROM {table}{where} ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = []
+        for values in self.connection.execute(sql, params):
+            row = dict(zip(columns, values))
+            for column in ENUM_TABLES:
+                if column in row:
+                    row[column] = _decode(column, row[column])
+            if 'status' in row:
+                row['status'] = STATUS_NAMES[row['status']]
+            rows.append(row)
+        return rows
+
+    def _count(self, table, columns, filters):
+        self.flush()
+        where, params = self._where(columns, filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+
+
+# Imports the existing CSV history files. The CSV rows carry no timestamp, so
+# imported rows have a NULL one; the free-text water table effect is dropped
+# since it is derived from the stored water table depth. The store remembers
+# how far each file was imported, so importing again only adds the rows
+# appended since (a file that got smaller is taken to be a new one and is
+# imported from the start). Malformed rows are skipped and returned in
+# 'errors' as (path, line, message).
+def import_csv_history(store, soil_path='soil_analysis_history.csv', wind_path='wind_load_history.csv'):
+    imported = {'soil': 0, 'wind': 0, 'errors': []}
+    for path, kind in ((soil_path, 'soil'), (wind_path, 'wind')):
+        try:
+            file = open(path, newline='')
+        except FileNotFoundError:
+            continue
+        with file:
+            imported[kind] = _import_file(store, file, os.path.abspath(path), kind, imported['errors'])
+    return imported
+
+
+def _import_file(store, file, path, kind, errors):
+    table = f'{kind}_history'
+    size = os.fstat(file.fileno()).st_size
+    done, previous_size = store.import_position(path)
+    if size < previous_size:
+        done = 0
+    reader = csv.reader(file)
+    next(reader, None)
+    rows, count = [], 0
+    for row in reader:
+        if reader.line_num <= done:
+            continue
+        try:
+            if kind == 'soil':
+                rows.append(soil_row(row[0], *(float(value) for value in row[1:7]), timestamp=None))
+            else:
+                rows.append(wind_row(float(row[0]), row[1], row[2], float(row[3]), timestamp=None))
+        except (IndexError, ValueError) as e:
+            errors.append((path, reader.line_num, f"{type(e).__name__}: {e}"))
+        if len(rows) >= IMPORT_BATCH_ROWS:
+            store.import_rows(table, rows, path, reader.line_num, size)
+            count += len(rows)
+            rows = []
+    store.import_rows(table, rows, path, max(reader.line_num, done), size)
+    return count + len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the CSV analysis history into a SQLite store.")
+    parser.add_argument('--db', default='analysis_history.sqlite')
+    parser.add_argument('--soil', default='soil_analysis_history.csv')
+    parser.add_argument('--wind', default='wind_load_history.csv')
+    args = parser.parse_args()
+    store = SQLiteHistoryStore(args.db)
+    imported = import_csv_history(store, args.soil, args.wind)
+    store.close()
+    for path, line, message in imported['errors']:
+        print(f"{path}:{line}: skipped: {message}", file=sys.stderr)
+    print(f"Imported {imported['soil']} soil and {imported['wind']} wind records into {args.db}"
+          + (f", skipped {len(imported['errors'])} malformed rows" if imported['errors'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+# Opt-in per-stage timers and counters for the analysis and logging paths.
+#
+# Disabled (the default) it costs nothing on the per-call hot paths: the
+# hooked functions and methods are only swapped for timing wrappers while
+# instrumentation is enabled, and put back by disable(). Coarser stages
+# (batch chunks, history writes) use stage(), which returns a shared no-op
+# context manager while disabled.
+#
+#   instrument.enable(trace=True)
+#   ... run analyses ...
+#   print(instrument.summary())
+#   instrument.write_chrome_trace('run.trace.json')   # chrome://tracing, Perfetto
+
+enabled = False
+stages = {}
+counters = {}
+
+TRACE_LIMIT = 1_000_000   # trace events kept per run; later ones are only counted
+
+# (module, attribute path, stage name) of the per-call hot paths
+HOOKS = [
+    ('soilwind.core', 'SoilAnalysis.check_soil_bearing_capacity', 'soil.check_soil_bearing_capacity'),
+    ('soilwind.core', 'SoilAnalysis.calculate_soil_bearing_capacity', 'soil.calculate_soil_bearing_capacity'),
+    ('soilwind.core', 'SoilAnalysis.calculate_settlement', 'soil.calculate_settlement'),
+    ('soilwind.core', 'SoilAnalysis.calculate_lateral_earth_pressure', 'soil.calculate_lateral_earth_pressure'),
+    ('soilwind.core', 'SoilAnalysis.water_table_effect', 'soil.water_table_effect'),
+    ('soilwind.core', 'SoilAnalysis.result', 'soil.result'),
+    # SoilAnalysis.report renders through SoilResult.report, so this times both
+    ('soilwind.core', 'SoilResult.report', 'soil.report'),
+    ('soilwind.core', 'SoilResult.history_row', 'soil.history_row'),
+    ('soilwind.core', 'SoilResult.as_dict', 'soil.as_dict'),
+    ('soilwind.core', 'calculate_wind_load', 'wind.calculate_wind_load'),
+    ('soilwind.core', 'evaluate_wind_load', 'wind.evaluate_wind_load'),
+    ('soilwind.history', 'log_soil_analysis_to_csv', 'history.log_soil'),
+    ('soilwind.history', 'log_wind_load_to_csv', 'history.log_wind'),
+]
+
+_lock = threading.Lock()
+_trace = None
+_trace_origin = 0
+_patched = []
+
+
+class StageStats:
+    __slots__ = ('calls', 'total_ns', 'max_ns')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+
+def record(name, start_ns, end_ns):
+    duration = end_ns - start_ns
+    with _lock:
+        stats = stages.get(name)
+        if stats is None:
+            stats = stages[name] = StageStats()
+        stats.calls += 1
+        stats.total_ns += duration
+        if duration > stats.max_ns:
+            stats.max_ns = duration
+        if _trace is not None and len(_trace) < TRACE_LIMIT:
+            _trace.append((name, start_ns, duration, threading.get_ident()))
+
+
+def count(name, n=1):
+    if enabled:
+        with _lock:
+            counters[name] = counters.get(name, 0) + n
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, self.start, time.perf_counter_ns())
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    return _Stage(name) if enabled else _NULL_STAGE
+
+
+def timed(name, func):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, start, time.perf_counter_ns())
+    wrapper.__wrapped__ = func
+    wrapper.__name__ = getattr(func, '__name__', name)
+    wrapper.__qualname__ = getattr(func, '__qualname__', name)
+    return wrapper
+
+
+# Registers another hot path, e.g. add_hook(SoilAnalysis, 'display_analysis',
+# 'soil.display_analysis'); owner is a class or a module
+def add_hook(owner, attribute, name):
+    HOOKS.append((owner, attribute, name))
+    if enabled:
+        _patch(owner, attribute, name)
+
+
+def _resolve(owner, attribute):
+    if isinstance(owner, str):
+        owner = importlib.import_module(owner)
+    *path, attribute = attribute.split('.')
+    for part in path:
+        owner = getattr(owner, part)
+    return owner, attribute
+
+
+def _patch(owner, attribute, name):
+    owner, attribute = _resolve(owner, attribute)
+    original = owner.__dict__[attribute]
+    wrapper = timed(name, original)
+    setattr(owner, attribute, wrapper)
+    _patched.append((owner.__dict__ if isinstance(owner, type) else vars(owner), attribute, original, owner))
+    if not isinstance(owner, type):
+        # Module functions are also bound by name elsewhere (from ... import);
+        # swap those bindings too
+        for module in list(sys.modules.values()):
+            namespace = getattr(module, '__dict__', None)
+            if namespace is None or module is owner or not _is_ours(module):
+                continue
+            for key, value in list(namespace.items()):
+                if value is original:
+                    namespace[key] = wrapper
+                    _patched.append((namespace, key, original, module))
+
+
+def _is_ours(module):
+    name = getattr(module, '__name__', '')
+    return name.startswith('soilwind') or name in ('__main__', 'Calculator')
+
+
+def enable(trace=False):
+    global enabled, _trace, _trace_origin
+    if enabled:
+        return
+    _trace = [] if trace else None
+    _trace_origin = time.perf_counter_ns()
+    for owner, attribute, name in HOOKS:
+        _patch(owner, attribute, name)
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+    while _patched:
+        namespace, key, original, owner = _patched.pop()
+        if isinstance(owner, type):
+            setattr(owner, key, original)
+        else:
+            namespace[key] = original
+
+
+def reset():
+    with _lock:
+        stages.clear()
+        counters.clear()
+        if _trace is not None:
+            _trace.clear()
+
+
+def summary(wall_seconds=None):
+    rows = sorted(stages.items(), key=lambda item: -item[1].total_ns)
+    lines = [f"{'stage':40s} {'calls':>11s} {'total ms':>11s} {'mean us':>10s} {'max us':>10s}"
+             + (f" {'% wall':>7s}" if wall_seconds else "")]
+    for name, stats in rows:
+        line = (f"{name:40s} {stats.calls:>11,} {stats.total_ns / 1e6:>11.2f} "
+                f"{stats.total_ns / stats.calls / 1e3:>10.2f} {stats.max_ns / 1e3:>10.2f}")
+        if wall_seconds:
+            line += f" {stats.total_ns / 1e9 / wall_seconds:>7.1%}"
+        lines.append(line)
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name:40s} {value:>11,}")
+    if wall_seconds:
+        lines.append(f"{'wall time':40s} {'':>11s} {wall_seconds * 1000:>11.2f}")
+    return "\n".join(lines)
+
+
+# Chrome trace-event JSON (complete "X" events, microseconds)
+def write_chrome_trace(path):
+    events = [{'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'pid': os.getpid(), 'tid': thread,
+               'ts': (start - _trace_origin) / 1e3, 'dur': duration / 1e3}
+              for name, start, duration, thread in (_trace or ())]
+    with open(path, 'w') as file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+# Runs func() with instrumentation on and writes the requested outputs: the
+# stage summary to stderr, a pstats file (cProfile) and/or a Chrome trace
+def run_profiled(func, summary_to=sys.stderr, pstats_path=None, trace_path=None):
+    profiler = None
+    if pstats_path:
+        import cProfile
+        profiler = cProfile.Profile()
+    enable(trace=bool(trace_path))
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            return profiler.runcall(func)
+        return func()
+    finally:
+        wall = time.perf_counter() - start
+        disable()
+        if summary_to is not None:
+            print("\n" + summary(wall), file=summary_to)
+        if profiler is not None:
+            profiler.dump_stats(pstats_path)
+        if trace_path:
+            write_chrome_trace(trace_path)
+
+
+# Pulls --profile, --profile-pstats FILE and --profile-trace FILE out of argv.
+# Returns the options (None when profiling was not asked for) and the rest.
+def extract_options(argv):
+    options, rest = {}, []
+    arguments = iter(argv)
+    for argument in arguments:
+        name, _, value = argument.partition('=')
+        if name == '--profile':
+            options.setdefault('summary', True)
+        elif name in ('--profile-pstats', '--profile-trace'):
+            options[name[len('--profile-'):]] = value or next(arguments, None)
+        else:
+            rest.append(argument)
+    return (options or None), rest
@@ -0,0 +1,269 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from .core import CAUTION_RATIO, calculate_wind_load
+from .factors import FACTORS
+from .wind_batch import DRAG_COEFFICIENTS, GUST_FACTORS, lookup_acceptable_limits, lookup_factor
+
+# Monte Carlo wind risk: for every structure, draw wind speeds from a
+# distribution (and optionally perturb G and Cd), and estimate how often the
+# wind load exceeds (or approaches) the structure's acceptable limit.
+#
+# Samples are drawn in work units of block_size samples for one structure.
+# Unit (structure i, block j) always uses the RNG stream
+# SeedSequence(seed, spawn_key=(i, j)) and contributes integer counts, so the
+# totals are identical whatever the number of workers or the completion order.
+# Only one block per worker is in memory at a time.
+
+DEFAULT_BLOCK_SIZE = 1_000_000
+DEFAULT_CONFIDENCE = 0.95
+
+
+class Weibull:
+    def __init__(self, shape, scale):
+        self.shape = shape
+        self.scale = scale
+
+    def sample(self, rng, size):
+        return self.scale * rng.weibull(self.shape, size)
+
+    def __repr__(self):
+        return f"Weibull(shape={self.shape}, scale={self.scale})"
+
+
+# Gumbel (type I extreme value) distribution of annual maximum wind speed;
+# the rare negative draws are clipped to calm air
+class Gumbel:
+    def __init__(self, loc, scale):
+        self.loc = loc
+        self.scale = scale
+
+    def sample(self, rng, size):
+        return np.maximum(rng.gumbel(self.loc, self.scale, size), 0.0)
+
+    def __repr__(self):
+        return f"Gumbel(loc={self.loc}, scale={self.scale})"
+
+
+# Multiplicative factor with mean 1 and the given coefficient of variation
+# (lognormal, so G and Cd stay positive)
+def _uncertainty(rng, cov, size):
+    if not cov:
+        return 1.0
+    sigma = np.sqrt(np.log1p(cov**2))
+    return rng.lognormal(-sigma**2 / 2, sigma, size)
+
+
+# Worker entry point: counts for one work unit
+def _simulate_block(distribution, G, Cd, area, acceptable_limits, gust_cov, drag_cov, seed, structure, block, size):
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(structure, block)))
+    wind_speed = distribution.sample(rng, size)
+    q = 0.613 * wind_speed**2
+    wind_load = calculate_wind_load(q, G * _uncertainty(rng, gust_cov, size), Cd * _uncertainty(rng, drag_cov, size),
+                                    area)
+    return (structure, size, int(np.count_nonzero(wind_load > acceptable_limits)),
+            int(np.count_nonzero(wind_load > CAUTION_RATIO * acceptable_limits)), float(wind_load.sum()))
+
+
+def wilson_interval(successes, trials, confidence=DEFAULT_CONFIDENCE):
+    successes = np.asarray(successes, dtype=np.float64)
+    trials = np.asarray(trials, dtype=np.float64)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = successes / trials
+        denominator = 1 + z**2 / trials
+        centre = (p + z**2 / (2 * trials)) / denominator
+        margin = z * np.sqrt(p * (1 - p) / trials + z**2 / (4 * trials**2)) / denominator
+    return np.clip(centre - margin, 0, 1), np.clip(centre + margin, 0, 1)
+
+
+# Running totals per structure. exceedances counts samples over the
+# acceptable limit; cautions counts samples over CAUTION_RATIO of it
+# (exceedances included).
+class RiskEstimate:
+    def __init__(self, acceptable_limits, target_samples):
+        self.acceptable_limits = acceptable_limits
+        self.target_samples = target_samples
+        self.samples = np.zeros(len(acceptable_limits), dtype=np.int64)
+        self.exceedances = np.zeros(len(acceptable_limits), dtype=np.int64)
+        self.cautions = np.zeros(len(acceptable_limits), dtype=np.int64)
+        self.load_sum = np.zeros(len(acceptable_limits))
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, structure, size, exceedances, cautions, load_sum):
+        self.samples[structure] += size
+        self.exceedances[structure] += exceedances
+        self.cautions[structure] += cautions
+        self.load_sum[structure] += load_sum
+
+    @property
+    def done(self):
+        return bool((self.samples >= self.target_samples).all())
+
+    def exceedance_probability(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.exceedances / self.samples
+
+    def caution_probability(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.cautions / self.samples
+
+    def confidence_interval(self, confidence=DEFAULT_CONFIDENCE):
+        return wilson_interval(self.exceedances, self.samples, confidence)
+
+    def mean_wind_load(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.load_sum / self.samples
+
+    def report(self, labels=None, confidence=DEFAULT_CONFIDENCE):
+        low, high = self.confidence_interval(confidence)
+        lines = []
+        for i, (p, caution, mean, limit) in enumerate(zip(self.exceedance_probability(), self.caution_probability(),
+                                                           self.mean_wind_load(), self.acceptable_limits)):
+            label = labels[i] if labels is not None else f"structure {i}"
+            lines.append(f"{label}: P(exceed {limit:g} N) = {p:.3e} [{low[i]:.3e}, {high[i]:.3e}] "
+                         f"({confidence:.0%} CI), P(caution) = {caution:.3e}, mean load {mean:.1f} N, "
+                         f"{self.samples[i]:,} samples")
+        return "\n".join(lines)
+
+
+def _work_units(structures, samples, block_size):
+    # Block-major order, so the running estimates cover every structure early
+    for block, start in enumerate(range(0, samples, block_size)):
+        for structure in range(structures):
+            yield structure, block, min(block_size, samples - start)
+
+
+# Yields the running RiskEstimate after every finished work unit; the last
+# one holds all `samples` draws per structure. wind_speed_distribution is a
+# Weibull or Gumbel instance. Structure arguments broadcast
+# against each other like wind_batch.wind_load_sweep. workers defaults to
+# every CPU; workers=1 runs in-process.
+def simulate_wind_risk(wind_speed_distribution, exposure_category, structural_shape, area, structure_type,
+                       specific_type, samples, gust_cov=0.0, drag_cov=0.0, seed=None, block_size=DEFAULT_BLOCK_SIZE,
+                       workers=None):
+    if samples < 1:
+        raise ValueError(f"Samples per structure must be at least 1, got {samples}")
+    G = lookup_factor(exposure_category, FACTORS.exposures, GUST_FACTORS, "exposure category", str.upper)
+    Cd = lookup_factor(structural_shape, FACTORS.shapes, DRAG_COEFFICIENTS, "structural shape", str.lower)
+    acceptable_limits = lookup_acceptable_limits(structure_type, specific_type)
+    area = np.asarray(area, dtype=np.float64)
+    if (~(area > 0)).any():
+        raise ValueError("Area must be a positive number.")
+    G, Cd, area, acceptable_limits = (column.ravel() for column in np.broadcast_arrays(G, Cd, area, acceptable_limits))
+    seed = np.random.SeedSequence(seed).entropy
+
+    estimate = RiskEstimate(acceptable_limits, samples)
+    units = list(_work_units(len(acceptable_limits), samples, block_size))
+    arguments = [(wind_speed_distribution, G[i], Cd[i], area[i], acceptable_limits[i], gust_cov, drag_cov, seed, i, block, size)
+                 for i, block, size in units]
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        for unit in arguments:
+            estimate.add(*_simulate_block(*unit))
+            yield estimate
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for counts in executor.map(_simulate_block, *zip(*arguments)):
+                estimate.add(*counts)
+                yield estimate
+
+
+def wind_risk(*args, **kwargs):
+    estimate = None
+    for estimate in simulate_wind_risk(*args, **kwargs):
+        pass
+    return estimate
+
+
+PORTFOLIO_FIELDS = ('exposure_category', 'structural_shape', 'area', 'structure_type', 'specific_type')
+
+
+def _area(value, where=''):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}area: expected a number, got {value!r}")
+
+
+# Structure columns of a portfolio file, in PORTFOLIO_FIELDS order
+def read_portfolio(path):
+    from .bulk_input import RowError, read_records
+
+    columns = [[] for _ in PORTFOLIO_FIELDS]
+    for line_number, record in read_records(path):
+        where = f"{path} line {line_number}: "
+        if isinstance(record, RowError):
+            raise ValueError(f"{where}{record}")
+        missing = [field for field in PORTFOLIO_FIELDS if record.get(field) in (None, '')]
+        if missing:
+            raise ValueError(f"{where}missing {', '.join(missing)}")
+        for column, field in zip(columns, PORTFOLIO_FIELDS):
+            column.append(_area(record[field], where) if field == 'area' else record[field])
+    if not columns[0]:
+        raise ValueError(f"{path}: no structures")
+    return columns
+
+
+def _distribution(spec):
+    name, _, parameters = spec.partition(':')
+    try:
+        first, second = (float(value) for value in parameters.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected weibull:SHAPE,SCALE or gumbel:LOC,SCALE, got {spec!r}")
+    if name.lower() == 'weibull':
+        return Weibull(first, second)
+    if name.lower() == 'gumbel':
+        return Gumbel(first, second)
+    raise argparse.ArgumentTypeError(f"unknown distribution {name!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py risk',
+                                     description="Monte Carlo wind load exceedance probabilities.")
+    parser.add_argument('--wind', type=_distribution, required=True, metavar='DIST',
+                        help="wind speed distribution in m/s: weibull:SHAPE,SCALE or gumbel:LOC,SCALE")
+    structures = parser.add_mutually_exclusive_group(required=True)
+    structures.add_argument('--portfolio', metavar='FILE',
+                            help="CSV or JSONL of structures (batch mode wind columns; wind_speed is ignored)")
+    structures.add_argument('--structure', nargs=5, metavar=('EXPOSURE', 'SHAPE', 'AREA', 'TYPE', 'SPECIFIC'))
+    parser.add_argument('--samples', type=float, default=1e6, help="samples per structure")
+    parser.add_argument('--gust-cov', type=float, default=0.0, help="coefficient of variation of G")
+    parser.add_argument('--drag-cov', type=float, default=0.0, help="coefficient of variation of Cd")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE)
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE)
+    args = parser.parse_args(argv)
+
+    seed = args.seed if args.seed is not None else np.random.SeedSequence().entropy
+    try:
+        if args.portfolio:
+            columns = read_portfolio(args.portfolio)
+        else:
+            columns = [[value] for value in args.structure]
+            columns[2] = [_area(args.structure[2])]
+        labels = [f"{structure_type}/{specific_type}" for structure_type, specific_type in zip(columns[3], columns[4])]
+        for estimate in simulate_wind_risk(args.wind, *columns, samples=int(args.samples), gust_cov=args.gust_cov,
+                                           drag_cov=args.drag_cov, seed=seed, block_size=args.block_size,
+                                           workers=args.workers):
+            low, high = estimate.confidence_interval(args.confidence)
+            print(f"\r{estimate.samples.sum():,} samples, worst P(exceed) "
+                  f"{np.nanmax(estimate.exceedance_probability()):.3e}, widest CI {np.nanmax(high - low):.2e}",
+                  end='', file=sys.stderr, flush=True)
+    except ValueError as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    print(file=sys.stderr)
+    print(f"{args.wind}, seed {seed}")
+    print(estimate.report(labels, args.confidence))
+
+
+if __name__ == "__main__":
+    main()
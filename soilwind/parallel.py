@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .factors import FACTORS
+from .soil_batch import SoilAnalysisBatch, SoilBatchResult
+from .wind_batch import (
+    DRAG_COEFFICIENTS, GUST_FACTORS, WindSweepResult, lookup_acceptable_limits, lookup_factor, wind_load_sweep,
+)
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+# Worker entry points. They receive the chunk's shape and its inputs as NumPy
+# arrays (categories already encoded to FACTORS codes) that are still
+# unbroadcast, so a scalar or a sweep axis crosses the process boundary once
+# per chunk at its own size, and return contiguous result columns.
+def _soil_chunk(shape, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth):
+    result = SoilAnalysisBatch(*(np.broadcast_to(column, shape) for column in
+                                 (soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth))).analyze()
+    return (np.ravel(result.allowable_bearing_capacity), np.ravel(result.settlement),
+            np.ravel(result.lateral_earth_pressure), np.ravel(result.capacity_class), np.ravel(result.warnings))
+
+
+def _wind_chunk(shape, wind_speed, exposure_category, structural_shape, area, structure_type, specific_type):
+    result = wind_load_sweep(*(np.broadcast_to(column, shape) for column in
+                               (wind_speed, exposure_category, structural_shape, area, structure_type, specific_type)))
+    return (np.ascontiguousarray(result.wind_load), np.ascontiguousarray(result.acceptable_limits),
+            result.utilization, result.status)
+
+
+# Splits the inputs along the leading axis of their broadcast shape into
+# chunks of about chunk_size cells. Inputs that are broadcast along that axis
+# go to every chunk whole; the others are sliced. A zero-row input still
+# yields one (empty) chunk, so the results keep their dtypes.
+def _split(columns, shape, chunk_size):
+    columns = [column.reshape((1,) * (len(shape) - column.ndim) + column.shape) for column in columns]
+    row_cells = max(1, int(np.prod(shape[1:])))
+    rows_per_chunk = max(1, (chunk_size or DEFAULT_CHUNK_SIZE) // row_cells)
+    for start in range(0, max(shape[0], 1), rows_per_chunk):
+        stop = min(start + rows_per_chunk, shape[0])
+        yield [(stop - start,) + shape[1:]] + [column if column.shape[0] == 1 else column[start:stop]
+                                               for column in columns]
+
+
+def _run(worker, chunks, workers):
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        parts = [worker(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map yields results in submission order, so rows stay in input order
+            parts = list(executor.map(worker, *zip(*chunks)))
+    return [np.concatenate(column) for column in zip(*parts)]
+
+
+# Process-pool counterpart of soil_batch.analyze_soil_batch for large inputs.
+# workers defaults to every CPU; workers=1 runs in-process. Results are flat,
+# one row per cell of the broadcast inputs.
+def parallel_soil_analysis(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                           workers=None, chunk_size=None):
+    columns = [FACTORS.soils.encode_array(soil_type), np.asarray(soil_bearing_capacity, dtype=np.float64),
+               np.asarray(depth_of_soil_layer, dtype=np.float64), np.asarray(water_table_depth, dtype=np.float64)]
+    shape = np.broadcast_shapes(*(column.shape for column in columns)) or (1,)
+    return SoilBatchResult(*_run(_soil_chunk, list(_split(columns, shape, chunk_size)), workers))
+
+
+# Process-pool counterpart of wind_batch.wind_load_sweep. Arguments broadcast
+# as in the single-process sweep; the sweep is split along its first axis.
+def parallel_wind_load_sweep(wind_speed, exposure_category, structural_shape, area, structure_type, specific_type,
+                             workers=None, chunk_size=None):
+    # Validate the (usually small, unbroadcast) category inputs up front so
+    # errors name the offending values rather than failing inside a worker
+    lookup_factor(exposure_category, FACTORS.exposures, GUST_FACTORS, "exposure category", str.upper)
+    lookup_factor(structural_shape, FACTORS.shapes, DRAG_COEFFICIENTS, "structural shape", str.lower)
+    lookup_acceptable_limits(structure_type, specific_type)
+    columns = [np.asarray(wind_speed, dtype=np.float64),
+               FACTORS.exposures.encode_array(exposure_category, str.upper),
+               FACTORS.shapes.encode_array(structural_shape, str.lower),
+               np.asarray(area, dtype=np.float64),
+               FACTORS.structures.encode_array(structure_type, str.lower),
+               FACTORS.specific_types.encode_array(specific_type, str.lower)]
+    shape = np.broadcast_shapes(*(column.shape for column in columns))
+    if not shape:
+        return wind_load_sweep(*columns)
+    return WindSweepResult(*_run(_wind_chunk, list(_split(columns, shape, chunk_size)), workers))
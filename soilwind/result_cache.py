@@ -0,0 +1,107 @@
+import threading
+from collections import OrderedDict
+
+from .core import SoilAnalysis, evaluate_wind_load, soil_warning_flags
+
+# Quantization policy for float inputs in cache keys: every float is rounded
+# to SIGNIFICANT_DIGITS significant digits before it becomes part of a key, so
+# inputs that agree to that many digits (e.g. 25.0 and 25.0000000001) share
+# one entry. Results are always computed from the quantized values, so a hit
+# and a miss for the same key return the same numbers.
+# Rounding is relative, so it behaves the same for a 0.5 m water table and a
+# 5000 m^2 area. Use significant_digits=None to key on exact float values.
+SIGNIFICANT_DIGITS = 9
+
+
+def quantize(value, significant_digits=SIGNIFICANT_DIGITS):
+    if significant_digits is None or not isinstance(value, float):
+        return value
+    return float(f"{value:.{significant_digits}g}")
+
+
+# Bounded LRU cache with hit/miss/eviction counters. maxsize=0 disables
+# caching (every call computes). compute() runs outside the lock; a value
+# whose computation started before an invalidate() is returned to its caller
+# but not stored.
+class LRUCache:
+    def __init__(self, maxsize=4096, significant_digits=SIGNIFICANT_DIGITS):
+        self.maxsize = maxsize
+        self.significant_digits = significant_digits
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def key(self, *args):
+        return tuple(quantize(arg, self.significant_digits) for arg in args)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generation
+        value = compute()
+        if self.maxsize > 0:
+            with self._lock:
+                if generation != self._generation:
+                    return value
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > max(maxsize, 0):
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        return {'size': len(self._entries), 'maxsize': self.maxsize, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions}
+
+    def __len__(self):
+        return len(self._entries)
+
+
+wind_cache = LRUCache()
+soil_cache = LRUCache()
+
+
+# Cached core.evaluate_wind_load: (wind load, acceptable limit, status)
+def cached_wind_evaluation(wind_speed, exposure_category, structural_shape, area, structure_type, specific_type,
+                           cache=None):
+    cache = wind_cache if cache is None else cache
+    key = cache.key(float(wind_speed), exposure_category, structural_shape, float(area), structure_type, specific_type)
+    return cache.get_or_compute(key, lambda: evaluate_wind_load(*key))
+
+
+# Cached SoilAnalysis evaluation: (allowable bearing capacity, settlement,
+# lateral earth pressure, capacity evaluation, water table effect, warning flags)
+def cached_soil_evaluation(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth, cache=None):
+    cache = soil_cache if cache is None else cache
+    key = cache.key(soil_type, float(soil_bearing_capacity), float(depth_of_soil_layer), float(water_table_depth))
+    return cache.get_or_compute(key, lambda: _evaluate_soil(SoilAnalysis(*key)))
+
+
+def _evaluate_soil(soil_analysis):
+    allowable_bearing_capacity = soil_analysis.calculate_soil_bearing_capacity()
+    settlement = soil_analysis.calculate_settlement()
+    lateral_pressure = soil_analysis.calculate_lateral_earth_pressure()
+    return (allowable_bearing_capacity, settlement, lateral_pressure,
+            soil_analysis.check_soil_bearing_capacity(), soil_analysis.water_table_effect(),
+            soil_warning_flags(allowable_bearing_capacity, settlement, lateral_pressure,
+                               soil_analysis.water_table_depth))
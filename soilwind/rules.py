@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from .core import (CAUTION_RATIO, MAX_LATERAL_PRESSURE, MAX_SETTLEMENT, MIN_ALLOWABLE_CAPACITY,
+                   MIN_WATER_TABLE_DEPTH, SOIL_WARNING_NAMES, SOIL_WARNINGS)
+
+# User-defined warning thresholds for the soil and wind results.
+#
+# A rules file is JSON with a list of rules per kind; each rule compares one
+# result (or input) column against a number, or checks that it lies in a
+# range:
+#
+#   {"soil": [{"name": "low bearing capacity", "when": "allowable_bearing_capacity < 150",
+#              "message": "Bearing capacity is below the 150 kPa design minimum."}],
+#    "wind": [{"name": "caution", "when": "0.6 < utilization <= 1"}]}
+#
+# Rule i sets bit 1 << i of the per-row bitmask. A kind missing from the file
+# keeps DEFAULT_RULES, which are the built-in checks: the soil rules have the
+# same bits as the WARN_* flags, so the default soil bitmask equals
+# SoilBatchResult.warnings, and exactly one of the two wind rules is set for
+# a CAUTION or EXCEED row (caution is a range, so it is not set when the load
+# also exceeds the limit).
+#
+# Rules are compiled once per load, one lookup table per column: each rule
+# cuts the column's number line just below its threshold (x >= t passes the
+# cut) or just above it (x > t), and the table holds the bitmask for every
+# region between cuts. Evaluating a column finds each row's region and looks
+# it up, counting the cuts passed when there are only a few, or, when there
+# are many, scaling the value into a bucket array in which every bucket holds
+# at most one threshold (a binary search if the thresholds are too close
+# together for that). The cost per row is bounded by the number of columns
+# the rules read, not by the number of rules.
+
+SOIL_COLUMNS = ('allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'soil_bearing_capacity',
+                'depth_of_soil_layer', 'water_table_depth')
+WIND_COLUMNS = ('wind_load', 'acceptable_limits', 'utilization', 'wind_speed', 'area')
+COLUMNS = {'soil': SOIL_COLUMNS, 'wind': WIND_COLUMNS}
+
+OPERATORS = ('<', '<=', '>', '>=')
+MAX_RULES = 64
+RULE_FLAGS_FIELD = 'rule_flags'
+CHECK_INTERVAL = 1.0   # seconds between checks of the rules file for changes
+COUNT_CUTS = 8         # columns with more cuts than this are bucketed
+MAX_BUCKETS = 1 << 16
+
+CONDITION = re.compile(r'^\s*([A-Za-z_]\w*)\s*(<=|>=|<|>)\s*(\S+)\s*$')
+RANGE_CONDITION = re.compile(r'^\s*(\S+?)\s*(<=|<)\s*([A-Za-z_]\w*)\s*(<=|<)\s*(\S+)\s*$')
+
+_SOIL_CONDITIONS = (f'allowable_bearing_capacity < {MIN_ALLOWABLE_CAPACITY}', f'settlement > {MAX_SETTLEMENT}',
+                    f'lateral_earth_pressure > {MAX_LATERAL_PRESSURE}', f'water_table_depth < {MIN_WATER_TABLE_DEPTH}')
+
+DEFAULT_RULES = {
+    'soil': [{'name': name, 'when': when, 'message': message}
+             for (_, name), (_, message), when in zip(SOIL_WARNING_NAMES, SOIL_WARNINGS, _SOIL_CONDITIONS)],
+    'wind': [{'name': 'caution', 'when': f'{CAUTION_RATIO} < utilization <= 1',
+              'message': "Wind load is approaching the acceptable limit."},
+             {'name': 'exceed', 'when': 'utilization > 1',
+              'message': "Wind load exceeds the acceptable limit!"}],
+}
+
+
+# A range rule "low < field <= threshold" keeps its lower bound in lower as
+# (low, op); op and threshold are then the upper bound's
+class Rule:
+    __slots__ = ('name', 'field', 'op', 'threshold', 'message', 'lower')
+
+    def __init__(self, name, field, op, threshold, message='', lower=None):
+        self.name = name
+        self.field = field
+        self.op = op
+        self.threshold = threshold
+        self.message = message
+        self.lower = lower
+
+    @property
+    def when(self):
+        if self.lower is not None:
+            low, op = self.lower
+            return f'{low:g} {op} {self.field} {self.op} {self.threshold:g}'
+        return f'{self.field} {self.op} {self.threshold:g}'
+
+    # The cuts (see the module comment) the rule passes at: (threshold, strict)
+    # where strict means the value must be above the threshold, not at it
+    def cuts(self):
+        upper = (self.threshold, self.op in ('<=', '>'))
+        if self.lower is None:
+            return [upper]
+        low, op = self.lower
+        return [(low, op == '<'), upper]
+
+    def as_dict(self):
+        return {'name': self.name, 'when': self.when, 'message': self.message}
+
+
+def parse_rule(entry, kind):
+    if not isinstance(entry, dict):
+        raise ValueError(f"{kind} rule: expected an object, got {entry!r}")
+    name = entry.get('name')
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"{kind} rule: missing name in {entry!r}")
+    when = str(entry.get('when', ''))
+    lower = None
+    match = CONDITION.match(when)
+    if match is not None:
+        field, op, value = match.groups()
+    else:
+        match = RANGE_CONDITION.match(when)
+        if match is None:
+            raise ValueError(f"{kind} rule {name!r}: 'when' must look like '<column> <op> <number>' or "
+                             f"'<number> <op> <column> <op> <number>', got {entry.get('when')!r}")
+        low, low_op, field, op, value = match.groups()
+        lower = (_threshold(low, kind, name), low_op)
+    if field not in COLUMNS[kind]:
+        raise ValueError(f"{kind} rule {name!r}: unknown column {field!r} (choose from {', '.join(COLUMNS[kind])})")
+    rule = Rule(name, field, op, _threshold(value, kind, name), str(entry.get('message', '')), lower)
+    if lower is not None:
+        (low, low_strict), (high, high_strict) = rule.cuts()
+        if (low, low_strict) >= (high, high_strict):
+            raise ValueError(f"{kind} rule {name!r}: the range {rule.when} is empty")
+    return rule
+
+
+def _threshold(value, kind, name):
+    try:
+        threshold = float(value)
+    except ValueError:
+        threshold = math.nan
+    if not math.isfinite(threshold):
+        raise ValueError(f"{kind} rule {name!r}: threshold must be a finite number, got {value!r}")
+    return threshold
+
+
+# The rules of one kind, compiled into one region table per column
+class RuleSet:
+    def __init__(self, kind, rules):
+        if kind not in COLUMNS:
+            raise ValueError(f"unknown rule kind {kind!r}")
+        if len(rules) > MAX_RULES:
+            raise ValueError(f"{kind}: at most {MAX_RULES} rules fit in the bitmask, got {len(rules)}")
+        names = [rule.name for rule in rules]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"{kind}: duplicate rule names {', '.join(duplicates)}")
+        self.kind = kind
+        self.rules = list(rules)
+        self.dtype = next(dtype for dtype in (np.uint8, np.uint16, np.uint32, np.uint64)
+                          if len(rules) <= np.dtype(dtype).itemsize * 8)
+        self._columns = [self._compile(field) for field in dict.fromkeys(rule.field for rule in self.rules)]
+
+    @classmethod
+    def from_config(cls, kind, entries):
+        if not isinstance(entries, list):
+            raise ValueError(f"{kind}: expected a list of rules")
+        return cls(kind, [parse_rule(entry, kind) for entry in entries])
+
+    def _compile(self, field):
+        rules = [(self.dtype(1) << self.dtype(bit), rule) for bit, rule in enumerate(self.rules)
+                 if rule.field == field]
+        cuts = sorted({cut for _, rule in rules for cut in rule.cuts()})
+        # Region k holds the values that passed the first k cuts; the last
+        # entry is for NaN, which fails every comparison
+        table = np.zeros(len(cuts) + 2, dtype=self.dtype)
+        for bit, rule in rules:
+            cut = [cuts.index(cut) for cut in rule.cuts()]
+            if rule.lower is not None:
+                table[cut[0] + 1:cut[1] + 1] |= bit
+            elif rule.op in ('<', '<='):
+                table[:cut[0] + 1] |= bit
+            else:
+                table[cut[0] + 1:-1] |= bit
+        buckets = _buckets(cuts) if len(cuts) > COUNT_CUTS else None
+        return field, cuts, buckets, table
+
+    def __len__(self):
+        return len(self.rules)
+
+    def bit(self, name):
+        for bit, rule in enumerate(self.rules):
+            if rule.name == name:
+                return self.dtype(1) << self.dtype(bit)
+        raise KeyError(name)
+
+    # Bitmask per row for a mapping of column name -> array (or scalar)
+    def evaluate(self, columns):
+        values = {}
+        for field, _, _, _ in self._columns:
+            if field not in columns:
+                raise ValueError(f"{self.kind} rules need the {field!r} column")
+            values[field] = np.asarray(columns[field], dtype=np.float64)
+        flags = np.zeros(np.broadcast_shapes(*(np.shape(column) for column in columns.values())), dtype=self.dtype)
+        for field, cuts, buckets, table in self._columns:
+            flags |= table[_regions(values[field], cuts, buckets, len(table) - 1)]
+        return flags
+
+    def names(self, flags):
+        return [rule.name for bit, rule in enumerate(self.rules) if int(flags) >> bit & 1]
+
+    def messages(self, flags):
+        return [rule.message or f"{rule.name}: {rule.when}" for bit, rule in enumerate(self.rules)
+                if int(flags) >> bit & 1]
+
+
+# Spreads the cut thresholds over a power of two buckets, few enough that
+# each holds at most one distinct threshold. Returns None if the thresholds are
+# too close together for MAX_BUCKETS.
+def _buckets(cuts):
+    thresholds = np.array(sorted({threshold for threshold, _ in cuts}))
+    low, span = thresholds[0], thresholds[-1] - thresholds[0]
+    count = 1 << (len(thresholds) - 1).bit_length()
+    while count <= MAX_BUCKETS:
+        scale = (count - 1) / span
+        index = _bucket_index(thresholds, low, scale, count)
+        if (np.diff(index) > 0).all():
+            break
+        count <<= 1
+    else:
+        return None
+    # The cuts before each bucket, and the threshold in it with the cuts at
+    # it (inf and no cuts for an empty bucket)
+    threshold = np.full(count, np.inf)
+    threshold[index] = thresholds
+    below = np.zeros(count, dtype=np.uint8)
+    above = np.zeros(count, dtype=np.uint8)
+    for value, strict in cuts:
+        (above if strict else below)[index[np.searchsorted(thresholds, value)]] = 1
+    before = np.zeros(count, dtype=np.uint8)
+    before[1:] = np.cumsum(below + above)[:-1]
+    return low, scale, count, before, threshold, below, above
+
+
+# Computed the same way for the thresholds and the values, so that a value
+# never lands in a later bucket than a threshold it is below
+def _bucket_index(values, low, scale, count):
+    return np.clip((values - low) * scale, 0, count - 1).astype(np.intp)
+
+
+# The number of cuts each value passed, or nan_region for NaN
+def _regions(value, cuts, buckets, nan_region):
+    nan = np.isnan(value)
+    has_nan = nan.any()
+    if has_nan:
+        value = np.where(nan, 0, value)
+    if len(cuts) <= COUNT_CUTS:
+        regions = np.zeros(value.shape, dtype=np.uint8)
+        for threshold, strict in cuts:
+            regions += (value > threshold) if strict else (value >= threshold)
+    elif buckets is not None:
+        low, scale, count, before, threshold, below, above = buckets
+        index = _bucket_index(value, low, scale, count)
+        bucket_threshold = threshold[index]
+        regions = before[index]
+        regions += below[index] * (value >= bucket_threshold)
+        regions += above[index] * (value > bucket_threshold)
+    else:
+        # Thresholds too close together to bucket: binary search instead
+        regions = (np.searchsorted([threshold for threshold, strict in cuts if not strict], value, 'right')
+                   + np.searchsorted([threshold for threshold, strict in cuts if strict], value, 'left'))
+    if has_nan:
+        regions = np.where(nan, nan_region, regions)
+    return regions
+
+
+def compile_rules(config):
+    if not isinstance(config, dict):
+        raise ValueError("rules file must hold a JSON object with 'soil' and/or 'wind' lists")
+    unknown = sorted(set(config) - set(COLUMNS))
+    if unknown:
+        raise ValueError(f"unknown rule kinds {', '.join(unknown)} (expected soil, wind)")
+    return {kind: RuleSet.from_config(kind, config.get(kind, DEFAULT_RULES[kind])) for kind in COLUMNS}
+
+
+def default_rules():
+    return compile_rules(DEFAULT_RULES)
+
+
+def load_rules(path):
+    with open(path) as file:
+        try:
+            config = json.load(file)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: invalid JSON: {e}")
+    try:
+        return compile_rules(config)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}")
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+# A rules file that is reloaded when it changes. rules(kind) checks the file
+# at most every check_interval seconds (None turns the check off, e.g. when
+# watch() runs instead). A bad edit keeps the previous rules in use and is
+# reported in error until the file is fixed.
+class RuleFile:
+    def __init__(self, path, check_interval=CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._stamp = _stamp(path)
+        self.rule_sets = load_rules(path)
+        self._checked = time.monotonic()
+        self.reloads = 0
+        self.error = None
+
+    def rules(self, kind):
+        if self.check_interval is not None and time.monotonic() - self._checked >= self.check_interval:
+            self.refresh()
+        return self.rule_sets[kind]
+
+    def refresh(self):
+        self._checked = time.monotonic()
+        try:
+            stamp = _stamp(self.path)
+        except OSError as e:
+            self.error = str(e)
+            return False
+        if stamp == self._stamp:
+            return False
+        self._stamp = stamp
+        try:
+            self.rule_sets = load_rules(self.path)
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            print(f"rules: keeping the previous rules: {e}", file=sys.stderr)
+            return False
+        self.reloads += 1
+        self.error = None
+        return True
+
+    async def watch(self, interval=CHECK_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            self.refresh()
+
+    def status(self):
+        return {'path': self.path, 'reloads': self.reloads, 'error': self.error}
+
+
+def soil_columns(batch, result):
+    return {'allowable_bearing_capacity': result.allowable_bearing_capacity, 'settlement': result.settlement,
+            'lateral_earth_pressure': result.lateral_earth_pressure,
+            'soil_bearing_capacity': batch.soil_bearing_capacity, 'depth_of_soil_layer': batch.depth_of_soil_layer,
+            'water_table_depth': batch.water_table_depth}
+
+
+def wind_columns(result, wind_speed=None, area=None):
+    columns = {'wind_load': result.wind_load, 'acceptable_limits': result.acceptable_limits,
+               'utilization': result.utilization}
+    if wind_speed is not None:
+        columns['wind_speed'] = wind_speed
+    if area is not None:
+        columns['area'] = area
+    return columns
+
+
+# Wraps one of the bulk_input chunk analyzers so that its result columns end
+# with the rule bitmask; rules is a RuleFile, or a dict of RuleSets per kind
+def analyze_with_rules(kind, analyze, rules):
+    def analyze_chunk(columns):
+        batch, result, result_columns = analyze(columns)
+        rule_set = rules.rules(kind) if isinstance(rules, RuleFile) else rules[kind]
+        if kind == 'soil':
+            flags = rule_set.evaluate(soil_columns(batch, result))
+        else:
+            flags = rule_set.evaluate(wind_columns(result, columns[0], columns[3]))
+        return batch, result, result_columns + [flags]
+    return analyze_chunk
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py rules',
+                                     description="Check a warning rules file and show the bit of every rule.")
+    parser.add_argument('file', nargs='?', help="rules file (JSON); without it the built-in rules are shown")
+    parser.add_argument('--defaults', action='store_true', help="print the built-in rules as a rules file")
+    args = parser.parse_args(argv)
+
+    if args.defaults:
+        print(json.dumps(DEFAULT_RULES, indent=2))
+        return
+    try:
+        rule_sets = load_rules(args.file) if args.file else default_rules()
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    for kind, rule_set in rule_sets.items():
+        print(f"{kind}: {len(rule_set)} rules, {np.dtype(rule_set.dtype).name} bitmask")
+        for bit, rule in enumerate(rule_set.rules):
+            print(f"  bit {bit:2} ({1 << bit:>{len(str(1 << max(len(rule_set) - 1, 0)))}})  {rule.name}: {rule.when}")
+
+
+if __name__ == "__main__":
+    main()
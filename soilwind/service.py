@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import bisect
+import json
+import time
+
+from .bulk_input import (
+    SOIL_RESULT_FIELDS, WIND_RESULT_FIELDS, RowError, analyze_soil_chunk, analyze_wind_chunk, parse_soil_row,
+    parse_wind_row,
+)
+
+# Local HTTP/JSON front end for the soil and wind evaluations.
+#
+#   POST /soil     {"soil_type": "Clay", "soil_bearing_capacity": 200, ...}
+#   POST /wind     {"wind_speed": 30, "exposure_category": "B", ...}
+#   GET  /metrics  latency histograms, batch sizes and queue depth
+#
+# Requests take the same fields as the batch mode input files (a JSON list of
+# them is evaluated row by row) and get the batch mode result fields back.
+# Requests that arrive within BATCH_WINDOW of each other are evaluated together
+# in one call to the NumPy batch engines.
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+BATCH_WINDOW = 0.002   # seconds to wait for more requests before evaluating
+MAX_BATCH_SIZE = 4096
+MAX_BODY_SIZE = 1 << 20
+
+# Histogram bucket upper bounds; latencies are in milliseconds
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+# Fixed-bucket histogram; quantiles are read off the bucket bounds, so they
+# are upper estimates accurate to one bucket
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def snapshot(self):
+        return {'count': self.count, 'sum': self.total, 'max': self.max,
+                'mean': self.total / self.count if self.count else None,
+                'p50': self.quantile(0.5), 'p90': self.quantile(0.9), 'p99': self.quantile(0.99),
+                'buckets': {str(bound): count for bound, count in zip(self.bounds + ('+Inf',), self.counts)}}
+
+
+# Collects rows from concurrent requests and evaluates them together. The
+# first row of a batch starts a BATCH_WINDOW timer; the batch is evaluated when
+# the timer fires or when MAX_BATCH_SIZE rows are waiting, whichever is first.
+class MicroBatcher:
+    def __init__(self, parse, analyze, result_fields, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE):
+        self.parse = parse
+        self.analyze = analyze
+        self.result_fields = result_fields
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending = []
+        self._timer = None
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.evaluation_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self):
+        return len(self._pending)
+
+    # Validates one record and waits for its result dict; raises RowError
+    # for invalid input without holding up the rest of the batch
+    async def submit(self, record):
+        row = self.parse(record)
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((row, future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._pending))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        start = time.perf_counter()
+        try:
+            _, _, result_columns = self.analyze([list(column) for column in zip(*(row for row, _ in pending))])
+            results = zip(*(column.tolist() for column in result_columns))
+            for (_, future), result in zip(pending, results):
+                if not future.done():
+                    future.set_result(dict(zip(self.result_fields, result)))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+        self.evaluation_ms.observe((time.perf_counter() - start) * 1000)
+        self.batch_sizes.observe(len(pending))
+
+    def metrics(self):
+        return {'queue_depth': self.queue_depth, 'max_queue_depth': self.max_queue_depth,
+                'batch_size': self.batch_sizes.snapshot(), 'evaluation_ms': self.evaluation_ms.snapshot()}
+
+
+# rules, a rules.RuleFile, adds the rule_flags bitmask to every result
+class AnalysisService:
+    def __init__(self, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE, rules=None):
+        self.batchers = {
+            '/soil': MicroBatcher(parse_soil_row, analyze_soil_chunk, SOIL_RESULT_FIELDS, window, max_batch_size),
+            '/wind': MicroBatcher(parse_wind_row, analyze_wind_chunk, WIND_RESULT_FIELDS, window, max_batch_size),
+        }
+        if rules is not None:
+            from .rules import RULE_FLAGS_FIELD, analyze_with_rules
+            for path, batcher in self.batchers.items():
+                batcher.analyze = analyze_with_rules(path[1:], batcher.analyze, rules)
+                batcher.result_fields = batcher.result_fields + [RULE_FLAGS_FIELD]
+        self.rules = rules
+        self.latency_ms = {path: Histogram(LATENCY_BUCKETS_MS) for path in self.batchers}
+        self.responses = {}
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                start = time.perf_counter()
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                self.responses[status] = self.responses.get(status, 0) + 1
+                if path in self.latency_ms:
+                    self.latency_ms[path].observe((time.perf_counter() - start) * 1000)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, body):
+        if path == '/metrics':
+            return (200, self.metrics()) if method == 'GET' else (405, {'error': "use GET"})
+        batcher = self.batchers.get(path)
+        if batcher is None:
+            return 404, {'error': f"unknown endpoint {path}"}
+        if method != 'POST':
+            return 405, {'error': "use POST"}
+        try:
+            record = json.loads(body or b'null')
+        except ValueError as e:
+            return 400, {'error': f"invalid JSON: {e}"}
+        records = record if isinstance(record, list) else [record]
+        for index, item in enumerate(records):
+            if not isinstance(item, dict):
+                where = f" (item {index} is {type(item).__name__})" if isinstance(record, list) else ""
+                return 400, {'error': f"expected a JSON object or a list of objects{where}"}
+        try:
+            if isinstance(record, list):
+                return 200, await asyncio.gather(*(batcher.submit(item) for item in record))
+            return 200, await batcher.submit(record)
+        except RowError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+
+    def metrics(self):
+        metrics = {'endpoints': {path: dict(batcher.metrics(), latency_ms=self.latency_ms[path].snapshot())
+                                 for path, batcher in self.batchers.items()},
+                   'responses': {str(status): count for status, count in sorted(self.responses.items())}}
+        if self.rules is not None:
+            metrics['rules'] = self.rules.status()
+        return metrics
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# Minimal HTTP/1.1 request reader: request line, headers and a
+# Content-Length body. Returns None when the client closed the connection.
+async def read_request(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HttpError(400, f"invalid Content-Length: {headers['content-length']!r}")
+    if length < 0:
+        raise HttpError(400, f"invalid Content-Length: {length}")
+    if length > MAX_BODY_SIZE:
+        raise HttpError(413, f"request body over {MAX_BODY_SIZE} bytes")
+    body = await reader.readexactly(length) if length else b''
+    return method, target.split('?', 1)[0], headers, body
+
+
+def write_response(writer, status, payload, keep_alive=True):
+    body = json.dumps(payload).encode()
+    writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body)
+
+
+# The rules file, if any, is watched in the background rather than checked
+# on the request path
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, window=BATCH_WINDOW, max_batch_size=MAX_BATCH_SIZE, rules=None):
+    if rules is not None:
+        rules.check_interval = None
+        watcher = asyncio.create_task(rules.watch())
+    service = AnalysisService(window, max_batch_size, rules)
+    server = await service.start(host, port)
+    print(f"Serving soil and wind analyses on http://{host}:{service.port}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if rules is not None:
+            watcher.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py serve',
+                                     description="Serve the soil and wind evaluations over HTTP/JSON on localhost.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--batch-window', type=float, default=BATCH_WINDOW * 1000, metavar='MS',
+                        help="how long to collect concurrent requests into one evaluation (default: %(default)s)")
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--rules', metavar='FILE', help="warning rules file (JSON), reloaded when it changes")
+    args = parser.parse_args(argv)
+    rules = None
+    if args.rules:
+        from .rules import RuleFile
+        try:
+            rules = RuleFile(args.rules)
+        except (OSError, ValueError) as e:
+            parser.exit(2, f"{parser.prog}: error: {e}\n")
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window / 1000, args.max_batch_size, rules))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import numpy as np
+
+from .core import (
+    SAFETY_FACTOR,
+    APPLIED_PRESSURE, FOUNDATION_WIDTH, YOUNG_MODULUS, POISSON_RATIO, FRICTION_ANGLE,
+    calculate_lateral_earth_pressure, calculate_settlement,
+    LOW_CAPACITY_LIMIT, HIGH_CAPACITY_LIMIT, MIN_ALLOWABLE_CAPACITY,
+    MAX_SETTLEMENT, MAX_LATERAL_PRESSURE, MIN_WATER_TABLE_DEPTH,
+    WARN_LOW_CAPACITY, WARN_SETTLEMENT, WARN_LATERAL_PRESSURE, WARN_HIGH_WATER_TABLE,
+    WATER_TABLE_ADEQUATE, WATER_TABLE_TOO_HIGH,
+)
+from .factors import DEFAULT_LOAD_FACTOR, FACTORS
+
+# Load factor by soil code; the trailing default is what code -1 (unknown) picks up
+LOAD_FACTORS = np.array(FACTORS.soils.values + (DEFAULT_LOAD_FACTOR,))
+
+# Capacity classes returned by check_soil_bearing_capacity, indexed by class code
+CAPACITY_CLASSES = ("Low soil bearing capacity", "Medium soil bearing capacity", "High soil bearing capacity")
+LOW_CAPACITY, MEDIUM_CAPACITY, HIGH_CAPACITY = 0, 1, 2
+
+
+# Columnar counterpart of core.SoilAnalysis: every argument is an array
+# (or a scalar that broadcasts) and every method evaluates all rows at once.
+# soil_type may be given as names or as FACTORS.soils codes; codes skip the
+# string comparison pass entirely. The foundation and soil parameters may be
+# arrays too, e.g. to sweep the Young's modulus (see sweep.py).
+class SoilAnalysisBatch:
+    def __init__(self, soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth,
+                 applied_pressure=APPLIED_PRESSURE, foundation_width=FOUNDATION_WIDTH, young_modulus=YOUNG_MODULUS,
+                 poisson_ratio=POISSON_RATIO, friction_angle=FRICTION_ANGLE):
+        self.soil_type = FACTORS.soils.encode_array(soil_type)
+        self.soil_bearing_capacity = np.asarray(soil_bearing_capacity, dtype=np.float64)
+        self.depth_of_soil_layer = np.asarray(depth_of_soil_layer, dtype=np.float64)
+        self.water_table_depth = np.asarray(water_table_depth, dtype=np.float64)
+        self.applied_pressure = np.asarray(applied_pressure, dtype=np.float64)
+        self.foundation_width = np.asarray(foundation_width, dtype=np.float64)
+        self.young_modulus = np.asarray(young_modulus, dtype=np.float64)
+        self.poisson_ratio = np.asarray(poisson_ratio, dtype=np.float64)
+        self.friction_angle = np.asarray(friction_angle, dtype=np.float64)
+        self.shape = np.broadcast_shapes(self.soil_type.shape, self.soil_bearing_capacity.shape,
+                                         self.depth_of_soil_layer.shape, self.water_table_depth.shape,
+                                         self.applied_pressure.shape, self.foundation_width.shape,
+                                         self.young_modulus.shape, self.poisson_ratio.shape,
+                                         self.friction_angle.shape)
+
+    def __len__(self):
+        return self.shape[0] if self.shape else 1
+
+    def load_factor(self):
+        return LOAD_FACTORS[self.soil_type]
+
+    def check_soil_bearing_capacity(self):
+        # Same comparisons as the scalar method, so NaN falls through to "High"
+        capacity = self.soil_bearing_capacity
+        codes = np.full(capacity.shape, HIGH_CAPACITY, dtype=np.int8)
+        codes[capacity <= HIGH_CAPACITY_LIMIT] = MEDIUM_CAPACITY
+        codes[capacity < LOW_CAPACITY_LIMIT] = LOW_CAPACITY
+        return np.broadcast_to(codes, self.shape)
+
+    def calculate_soil_bearing_capacity(self):
+        total_bearing_capacity = self.soil_bearing_capacity * self.load_factor() * self.depth_of_soil_layer
+        return np.broadcast_to(total_bearing_capacity / SAFETY_FACTOR, self.shape)
+
+    def calculate_settlement(self):
+        settlement = calculate_settlement(self.applied_pressure, self.foundation_width, self.young_modulus,
+                                          self.poisson_ratio)
+        return np.broadcast_to(settlement, self.shape)
+
+    def calculate_lateral_earth_pressure(self):
+        return np.broadcast_to(calculate_lateral_earth_pressure(self.friction_angle), self.shape)
+
+    def water_table_effect(self):
+        # True where the scalar method reports "Water table is too high"
+        return np.broadcast_to(self.water_table_depth < MIN_WATER_TABLE_DEPTH, self.shape)
+
+    def analyze(self):
+        allowable_bearing_capacity = self.calculate_soil_bearing_capacity()
+        settlement = self.calculate_settlement()
+        lateral_pressure = self.calculate_lateral_earth_pressure()
+        warnings = self.warning_flags(allowable_bearing_capacity, settlement, lateral_pressure)
+        return SoilBatchResult(allowable_bearing_capacity, settlement, lateral_pressure,
+                               self.check_soil_bearing_capacity(), warnings)
+
+    # Warning bitmask per row; pass already computed results to skip recomputing them
+    def warning_flags(self, allowable_bearing_capacity=None, settlement=None, lateral_pressure=None):
+        if allowable_bearing_capacity is None:
+            allowable_bearing_capacity = self.calculate_soil_bearing_capacity()
+        if settlement is None:
+            settlement = self.calculate_settlement()
+        if lateral_pressure is None:
+            lateral_pressure = self.calculate_lateral_earth_pressure()
+
+        warnings = np.zeros(self.shape, dtype=np.uint8)
+        warnings |= np.where(allowable_bearing_capacity < MIN_ALLOWABLE_CAPACITY, WARN_LOW_CAPACITY, 0).astype(np.uint8)
+        warnings |= np.where(settlement > MAX_SETTLEMENT, WARN_SETTLEMENT, 0).astype(np.uint8)
+        warnings |= np.where(lateral_pressure > MAX_LATERAL_PRESSURE, WARN_LATERAL_PRESSURE, 0).astype(np.uint8)
+        warnings |= np.where(self.water_table_effect(), WARN_HIGH_WATER_TABLE, 0).astype(np.uint8)
+        return warnings
+
+
+class SoilBatchResult:
+    def __init__(self, allowable_bearing_capacity, settlement, lateral_earth_pressure, capacity_class, warnings):
+        self.allowable_bearing_capacity = allowable_bearing_capacity
+        self.settlement = settlement
+        self.lateral_earth_pressure = lateral_earth_pressure
+        self.capacity_class = capacity_class
+        self.warnings = warnings
+
+    def __len__(self):
+        return len(self.warnings)
+
+    def capacity_class_names(self):
+        return np.asarray(CAPACITY_CLASSES)[self.capacity_class]
+
+    @property
+    def low_capacity(self):
+        return (self.warnings & WARN_LOW_CAPACITY) != 0
+
+    @property
+    def excessive_settlement(self):
+        return (self.warnings & WARN_SETTLEMENT) != 0
+
+    @property
+    def high_lateral_pressure(self):
+        return (self.warnings & WARN_LATERAL_PRESSURE) != 0
+
+    @property
+    def high_water_table(self):
+        return (self.warnings & WARN_HIGH_WATER_TABLE) != 0
+
+
+def analyze_soil_batch(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth):
+    return SoilAnalysisBatch(soil_type, soil_bearing_capacity, depth_of_soil_layer, water_table_depth).analyze()
+
+
+# Queues every row of a batch to the soil history in one hand-off to the
+# background writer, using the already computed results. Without an explicit
+# history logger the extra history.history_backends receive the batch too.
+def log_soil_batch_to_csv(batch, result, history=None):
+    if history is None:
+        from .history import history_backends, soil_history
+
+        history = soil_history
+        for backend in history_backends:
+            backend.log_soil_batch(batch, result)
+    shape = batch.shape
+    columns = [np.asarray(FACTORS.soils.names + ('Unknown',))[np.broadcast_to(batch.soil_type, shape)],
+               np.broadcast_to(batch.soil_bearing_capacity, shape),
+               np.broadcast_to(batch.depth_of_soil_layer, shape),
+               np.broadcast_to(batch.water_table_depth, shape),
+               result.allowable_bearing_capacity, result.settlement, result.lateral_earth_pressure,
+               np.where(result.high_water_table, WATER_TABLE_TOO_HIGH, WATER_TABLE_ADEQUATE)]
+    history.log_many(zip(*(column.tolist() for column in columns)))
@@ -0,0 +1,371 @@
+import argparse
+import json
+import math
+import socket
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from . import instrument
+from .bulk_input import read_records
+from .core import CAUTION_RATIO, SAFE, STATUS_NAMES, calculate_wind_load
+from .factors import FACTORS
+from .wind_batch import DRAG_COEFFICIENTS, GUST_FACTORS, lookup_acceptable_limits, lookup_factor
+
+# Continuous wind load evaluation over anemometer readings. Every reading
+# (time in epoch seconds, station id, wind speed in m/s) is turned into
+# q = 0.613 * v**2 and the wind load of the structure the station monitors,
+# and compared with that structure's acceptable limit. Only changes of a
+# structure's SAFE / CAUTION / EXCEED state are reported, together with the
+# peak and mean wind speed over the rolling window that ends at the reading.
+#
+# Readings arrive in chunks, either as text lines "time,station,wind_speed"
+# or as packed READING records, from a file, a pipe ('-') or a local socket
+# (tcp:HOST:PORT or unix:PATH). A chunk is evaluated at once: readings are
+# grouped by station with a stable sort, so each station's readings stay in
+# arrival order, and the window is kept as per-station rings of
+# resolution-second buckets (max, sum and count of the wind speed).
+# Readings older than the latest one already seen for their station are
+# dropped as late.
+
+READING = np.dtype([('time', '<f8'), ('station', '<u4'), ('wind_speed', '<f4')])
+STRUCTURE_FIELDS = ['station', 'exposure_category', 'structural_shape', 'area', 'structure_type', 'specific_type']
+
+DEFAULT_WINDOW = 60.0      # seconds
+DEFAULT_RESOLUTION = 1.0   # seconds per window bucket
+DEFAULT_CHUNK_BYTES = 1 << 20
+
+
+# The structures being monitored, one per anemometer station, with their
+# wind load per unit of dynamic pressure and acceptable limit
+class MonitoredStructures:
+    def __init__(self, station, exposure_category, structural_shape, area, structure_type, specific_type):
+        station = np.asarray(station, dtype=np.int64)
+        area = np.asarray(area, dtype=np.float64)
+        if len(np.unique(station)) != len(station):
+            raise ValueError("Station ids must be unique")
+        if (~(area > 0)).any():
+            raise ValueError("Area must be a positive number.")
+        order = np.argsort(station)
+        self.station = station[order]
+        self.structure_type = np.asarray(structure_type)[order]
+        self.specific_type = np.asarray(specific_type)[order]
+        G = lookup_factor(exposure_category, FACTORS.exposures, GUST_FACTORS, "exposure category", str.upper)
+        Cd = lookup_factor(structural_shape, FACTORS.shapes, DRAG_COEFFICIENTS, "structural shape", str.lower)
+        self.load_per_q = calculate_wind_load(1.0, G, Cd, area)[order]
+        self.acceptable_limits = lookup_acceptable_limits(structure_type, specific_type)[order]
+        self.caution_limits = CAUTION_RATIO * self.acceptable_limits
+
+    def __len__(self):
+        return len(self.station)
+
+    # Reads a CSV or JSONL file with the STRUCTURE_FIELDS columns
+    @classmethod
+    def load(cls, path):
+        columns = {field: [] for field in STRUCTURE_FIELDS}
+        for line_number, record in read_records(path):
+            try:
+                for field in STRUCTURE_FIELDS:
+                    columns[field].append(record[field])
+                float(record['area'])
+                int(record['station'])
+            except (KeyError, TypeError, ValueError):
+                raise ValueError(f"{path}:{line_number}: expected the columns {', '.join(STRUCTURE_FIELDS)}")
+        if not columns['station']:
+            raise ValueError(f"{path}: no structures")
+        return cls(*(columns[field] for field in STRUCTURE_FIELDS))
+
+    # Index of every station id; -1 for ids that are not monitored
+    def index(self, station):
+        index = np.searchsorted(self.station, station)
+        np.minimum(index, len(self.station) - 1, out=index)
+        return np.where(self.station[index] == station, index, -1)
+
+
+class Transition:
+    __slots__ = ('time', 'station', 'previous', 'status', 'wind_speed', 'wind_load', 'acceptable_limits',
+                 'peak_wind_speed', 'mean_wind_speed')
+
+    def __init__(self, time, station, previous, status, wind_speed, wind_load, acceptable_limits, peak_wind_speed,
+                 mean_wind_speed):
+        self.time = time
+        self.station = station
+        self.previous = previous
+        self.status = status
+        self.wind_speed = wind_speed
+        self.wind_load = wind_load
+        self.acceptable_limits = acceptable_limits
+        self.peak_wind_speed = peak_wind_speed
+        self.mean_wind_speed = mean_wind_speed
+
+    def __repr__(self):
+        return (f"Transition(time={self.time!r}, station={self.station}, "
+                f"{STATUS_NAMES[self.previous]} -> {STATUS_NAMES[self.status]}, wind_load={self.wind_load:.1f})")
+
+    def as_dict(self):
+        return {'time': self.time, 'station': self.station, 'from': STATUS_NAMES[self.previous],
+                'to': STATUS_NAMES[self.status], 'wind_speed': self.wind_speed, 'wind_load': self.wind_load,
+                'acceptable_limits': self.acceptable_limits, 'utilization': self.wind_load / self.acceptable_limits,
+                'peak_wind_speed': self.peak_wind_speed, 'mean_wind_speed': self.mean_wind_speed}
+
+
+class StreamEvaluator:
+    def __init__(self, structures, window=DEFAULT_WINDOW, resolution=DEFAULT_RESOLUTION):
+        if window <= 0 or resolution <= 0:
+            raise ValueError("The window and its resolution must be positive")
+        self.structures = structures
+        self.resolution = resolution
+        self.buckets = max(1, math.ceil(window / resolution))
+        size = len(structures) * self.buckets
+        self.bucket = np.full(size, np.iinfo(np.int64).min, dtype=np.int64)
+        self.bucket_max = np.zeros(size)
+        self.bucket_sum = np.zeros(size)
+        self.bucket_count = np.zeros(size, dtype=np.int64)
+        self.status = np.full(len(structures), SAFE, dtype=np.int8)
+        self.last_time = np.full(len(structures), -np.inf)
+        self._sort_dtype = np.uint16 if len(structures) <= np.iinfo(np.uint16).max else np.uint32
+        self.readings = self.late = self.unknown = self.transitions = 0
+
+    # Evaluates a chunk of readings; returns the state changes it caused, in
+    # time order
+    def feed(self, time, station, wind_speed):
+        time = np.asarray(time, dtype=np.float64)
+        wind_speed = np.asarray(wind_speed, dtype=np.float64)
+        index = self.structures.index(np.asarray(station))
+        known = index >= 0
+        self.unknown += len(index) - int(np.count_nonzero(known))
+        on_time = known & (time >= self.last_time[index])
+        self.late += int(np.count_nonzero(known)) - int(np.count_nonzero(on_time))
+        if not on_time.all():
+            time, index, wind_speed = time[on_time], index[on_time], wind_speed[on_time]
+        if not len(index):
+            return []
+        self.readings += len(index)
+
+        # Group by station; the sort is stable, so a station's readings stay in order
+        order = np.argsort(index.astype(self._sort_dtype), kind='stable')
+        time, index, wind_speed = time[order], index[order], wind_speed[order]
+        same_station = index[1:] == index[:-1]
+        if (same_station & (time[1:] < time[:-1])).any():
+            order = np.lexsort((time, index))
+            time, index, wind_speed = time[order], index[order], wind_speed[order]
+        starts = np.flatnonzero(np.concatenate(([True], ~same_station)))
+
+        wind_load = 0.613 * wind_speed**2 * self.structures.load_per_q[index]
+        status = (wind_load > self.structures.caution_limits[index]).astype(np.int8)
+        status += wind_load > self.structures.acceptable_limits[index]
+        previous = np.empty_like(status)
+        previous[1:] = status[:-1]
+        previous[starts] = self.status[index[starts]]
+        bucket = np.floor(time / self.resolution).astype(np.int64)
+
+        changed = np.flatnonzero(status != previous)
+        transitions = self._transitions(changed, time, index, wind_speed, wind_load, bucket, previous, status) \
+            if len(changed) else []
+        self.transitions += len(transitions)
+
+        self._add_to_window(index, bucket, wind_speed)
+        ends = np.append(starts[1:], len(index)) - 1
+        self.status[index[ends]] = status[ends]
+        self.last_time[index[ends]] = time[ends]
+        return transitions
+
+    # Called before the chunk is added to the window: the window at reading i
+    # is the station's buckets from earlier chunks plus its readings in this
+    # chunk up to i, limited to the last self.buckets buckets
+    def _transitions(self, changed, time, index, wind_speed, wind_load, bucket, previous, status):
+        station = index[changed]
+        first_bucket = bucket[changed] - self.buckets + 1
+        # Readings are ordered by (station, bucket), so the first one inside
+        # each window is found with one searchsorted on a combined key
+        low = bucket.min()
+        span = bucket.max() - low + 1
+        key = index * span + (bucket - low)
+        start = np.searchsorted(key, station * span + np.maximum(first_bucket - low, 0))
+        end = changed + 1
+        total = np.concatenate(([0.0], np.cumsum(wind_speed)))
+        bounds = np.empty(2 * len(changed), dtype=np.int64)
+        bounds[0::2] = start
+        bounds[1::2] = end
+        peak = np.maximum.reduceat(np.append(wind_speed, 0.0), bounds)[0::2]
+        speed_sum = total[end] - total[start]
+        count = end - start
+
+        shape = (len(self.structures), self.buckets)
+        earlier = self.bucket.reshape(shape)[station] >= first_bucket[:, None]
+        peak = np.maximum(peak, np.where(earlier, self.bucket_max.reshape(shape)[station], 0.0).max(axis=1))
+        speed_sum += np.where(earlier, self.bucket_sum.reshape(shape)[station], 0.0).sum(axis=1)
+        count += np.where(earlier, self.bucket_count.reshape(shape)[station], 0).sum(axis=1)
+
+        columns = (time[changed], self.structures.station[station], previous[changed], status[changed],
+                   wind_speed[changed], wind_load[changed], self.structures.acceptable_limits[station], peak,
+                   speed_sum / count)
+        order = np.argsort(columns[0], kind='stable')
+        columns = [column[order] for column in columns]
+        return [Transition(*values) for values in zip(*(column.tolist() for column in columns))]
+
+    def _add_to_window(self, index, bucket, wind_speed):
+        key = index * self.buckets + bucket % self.buckets
+        held = self.bucket[key]
+        np.maximum.at(self.bucket, key, bucket)
+        latest = self.bucket[key]
+        # A ring slot moving on to a newer bucket starts empty
+        reset = key[latest != held]
+        self.bucket_max[reset] = 0.0
+        self.bucket_sum[reset] = 0.0
+        self.bucket_count[reset] = 0
+        current = bucket == latest
+        if not current.all():
+            key, wind_speed = key[current], wind_speed[current]
+        np.maximum.at(self.bucket_max, key, wind_speed)
+        np.add.at(self.bucket_sum, key, wind_speed)
+        np.add.at(self.bucket_count, key, 1)
+
+    # Peak and mean wind speed per structure over the window ending at its
+    # latest reading (NaN before the first one)
+    def window(self):
+        shape = (len(self.structures), self.buckets)
+        latest = np.floor(self.last_time / self.resolution)
+        with np.errstate(invalid='ignore'):
+            current = self.bucket.reshape(shape) > (latest - self.buckets)[:, None]
+        count = np.where(current, self.bucket_count.reshape(shape), 0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            peak = np.where(count > 0, np.where(current, self.bucket_max.reshape(shape), 0.0).max(axis=1), np.nan)
+            mean = np.where(current, self.bucket_sum.reshape(shape), 0.0).sum(axis=1) / count
+        return peak, mean
+
+
+# Binary stream for a source spec: a path, '-' for stdin, tcp:HOST:PORT or
+# unix:PATH to connect to a local socket
+def open_source(spec):
+    if spec == '-':
+        return sys.stdin.buffer
+    if spec.startswith('tcp:'):
+        host, _, port = spec[4:].rpartition(':')
+        connection = socket.create_connection((host or '127.0.0.1', int(port)))
+    elif spec.startswith('unix:'):
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(spec[5:])
+    else:
+        return open(spec, 'rb')
+    # The file keeps the connection open until it is closed itself
+    file = connection.makefile('rb')
+    connection.close()
+    return file
+
+
+def source_format(spec):
+    return 'binary' if spec.endswith(('.bin', '.readings')) else 'text'
+
+
+def parse_text(data):
+    data = data.replace(b'\r', b'')
+    if data[:1].isalpha():
+        # Header line
+        data = data[data.find(b'\n') + 1:]
+    lines = data.count(b'\n') + (not data.endswith(b'\n'))
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', DeprecationWarning)
+        try:
+            values = np.fromstring(data.rstrip(b'\n').replace(b'\n', b','), sep=',')
+        except (ValueError, DeprecationWarning):
+            values = None
+    if values is None or len(values) != 3 * lines:
+        return _parse_lines(data)
+    values = values.reshape(-1, 3)
+    return values[:, 0], values[:, 1].astype(np.int64), values[:, 2]
+
+
+# Line by line fallback for chunks with blank or malformed lines, which are skipped
+def _parse_lines(data):
+    rows = []
+    for line in data.splitlines():
+        try:
+            time, station, wind_speed = line.split(b',')
+            rows.append((float(time), int(station), float(wind_speed)))
+        except ValueError:
+            continue
+    if not rows:
+        return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0)
+    time, station, wind_speed = zip(*rows)
+    return np.array(time), np.array(station, dtype=np.int64), np.array(wind_speed)
+
+
+# Yields (time, station, wind_speed) arrays as data arrives. read1 returns
+# whatever a pipe or socket has ready, so readings are evaluated as they come
+# in rather than when chunk_bytes have accumulated.
+def read_chunks(file, format='text', chunk_bytes=DEFAULT_CHUNK_BYTES):
+    read = getattr(file, 'read1', file.read)
+    remainder = b''
+    while True:
+        data = read(chunk_bytes)
+        if not data:
+            break
+        data = remainder + data if remainder else data
+        if format == 'binary':
+            end = len(data) - len(data) % READING.itemsize
+        else:
+            end = data.rfind(b'\n') + 1
+        remainder = data[end:]
+        if end:
+            yield _parse(data[:end], format)
+    if format == 'text' and remainder.strip():
+        yield _parse(remainder, format)
+
+
+def _parse(data, format):
+    if format == 'binary':
+        readings = np.frombuffer(data, dtype=READING)
+        return readings['time'], readings['station'], readings['wind_speed']
+    return parse_text(data)
+
+
+# Feeds every chunk to the evaluator and hands the state changes to emit
+def run_stream(evaluator, chunks, emit):
+    for time, station, wind_speed in chunks:
+        with instrument.stage('stream.evaluate'):
+            transitions = evaluator.feed(time, station, wind_speed)
+        instrument.count('stream.readings', len(time))
+        if transitions:
+            emit(transitions)
+    return evaluator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py stream',
+                                     description="Evaluate wind loads over anemometer readings and print every "
+                                                 "change of a structure's SAFE/CAUTION/EXCEED state as a JSON line.")
+    parser.add_argument('--structures', required=True, metavar='FILE',
+                        help=f"monitored structures (CSV or JSONL: {', '.join(STRUCTURE_FIELDS)})")
+    parser.add_argument('--source', default='-',
+                        help="readings: a file, '-' for stdin, tcp:HOST:PORT or unix:PATH (default: stdin)")
+    parser.add_argument('--format', choices=['text', 'binary'],
+                        help="'time,station,wind_speed' lines or packed records (default: from the file extension)")
+    parser.add_argument('--window', type=float, default=DEFAULT_WINDOW, help="rolling window in seconds")
+    parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION, help="window bucket in seconds")
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES)
+    args = parser.parse_args(argv)
+
+    def emit(transitions):
+        sys.stdout.write(''.join(json.dumps(transition.as_dict()) + '\n' for transition in transitions))
+        sys.stdout.flush()
+
+    start = time.perf_counter()
+    try:
+        evaluator = StreamEvaluator(MonitoredStructures.load(args.structures), args.window, args.resolution)
+        source = open_source(args.source)
+        with source:
+            run_stream(evaluator, read_chunks(source, args.format or source_format(args.source), args.chunk_bytes),
+                       emit)
+    except (OSError, ValueError) as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    elapsed = time.perf_counter() - start
+    print(f"Evaluated {evaluator.readings:,} readings for {len(evaluator.structures):,} structures in "
+          f"{elapsed:.2f} s; {evaluator.transitions:,} state changes, {evaluator.late:,} late and "
+          f"{evaluator.unknown:,} unknown-station readings dropped", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import argparse
+import math
+import sys
+import time
+
+import numpy as np
+
+from .core import (
+    APPLIED_PRESSURE, FOUNDATION_WIDTH, FRICTION_ANGLE, POISSON_RATIO, YOUNG_MODULUS, SOIL_WARNING_NAMES,
+)
+from .soil_batch import SoilAnalysisBatch
+
+# Parameter sweeps over the soil analysis. A design (a Cartesian grid or a
+# Latin hypercube) yields parameter values chunk by chunk; every chunk goes
+# through SoilAnalysisBatch and only per-parameter-bin warning counts are
+# kept, so memory stays bounded by the chunk size however many points there are.
+
+PARAMETERS = ('soil_bearing_capacity', 'depth_of_soil_layer', 'water_table_depth', 'applied_pressure',
+              'foundation_width', 'young_modulus', 'poisson_ratio', 'friction_angle')
+DEFAULTS = {'applied_pressure': APPLIED_PRESSURE, 'foundation_width': FOUNDATION_WIDTH,
+            'young_modulus': YOUNG_MODULUS, 'poisson_ratio': POISSON_RATIO, 'friction_angle': FRICTION_ANGLE}
+
+# The [WARNING] lines of the analysis report, by warning bit
+WARNINGS = SOIL_WARNING_NAMES
+WARNING_CODES = 16   # number of distinct warning bitmasks
+
+DEFAULT_CHUNK_SIZE = 1_000_000
+DEFAULT_BINS = 10
+
+
+def _check_parameter(name):
+    if name not in PARAMETERS:
+        raise ValueError(f"Unknown sweep parameter {name!r}; choose from {', '.join(PARAMETERS)}")
+
+
+# Every combination of the given values, e.g.
+# CartesianGrid({'young_modulus': np.geomspace(1e4, 1e7, 100), 'poisson_ratio': [0.2, 0.3, 0.4]})
+class CartesianGrid:
+    def __init__(self, axes):
+        for name in axes:
+            _check_parameter(name)
+        self.axes = {name: np.asarray(values, dtype=np.float64).ravel() for name, values in axes.items()}
+        self.shape = tuple(len(values) for values in self.axes.values())
+
+    def __len__(self):
+        return math.prod(self.shape)
+
+    def bin_labels(self, name):
+        return self.axes[name]
+
+    # Parameter values and bin indices for points [start, stop)
+    def chunk(self, start, stop):
+        indices = np.unravel_index(np.arange(start, stop), self.shape)
+        return ({name: values[index] for (name, values), index in zip(self.axes.items(), indices)},
+                dict(zip(self.axes, indices)))
+
+
+# Latin hypercube sample of `samples` points over (low, high) ranges: along
+# every parameter each of the `samples` equal strata is hit exactly once. The
+# stratum of point i is a keyed pseudo-random permutation of i, computed on
+# the fly, so no per-sample table is kept and chunks can be generated in any order.
+class LatinHypercube:
+    def __init__(self, ranges, samples, seed=None, bins=DEFAULT_BINS):
+        for name in ranges:
+            _check_parameter(name)
+        self.ranges = {name: (float(low), float(high)) for name, (low, high) in ranges.items()}
+        self.samples = samples
+        self.bins = min(bins, samples)
+        keys = np.random.SeedSequence(seed).generate_state(2 * len(self.ranges), dtype=np.uint64)
+        self.keys = dict(zip(self.ranges, keys.reshape(-1, 2)))
+
+    def __len__(self):
+        return self.samples
+
+    def bin_labels(self, name):
+        low, high = self.ranges[name]
+        return low + (np.arange(self.bins) + 0.5) * (high - low) / self.bins
+
+    def chunk(self, start, stop):
+        index = np.arange(start, stop, dtype=np.uint64)
+        values, bins = {}, {}
+        for name, (low, high) in self.ranges.items():
+            permutation_key, jitter_key = self.keys[name]
+            stratum = _permute(index, self.samples, permutation_key)
+            jitter = (_mix(index ^ jitter_key) >> np.uint64(11)) * 2.0**-53
+            values[name] = low + (stratum + jitter) / self.samples * (high - low)
+            bins[name] = (stratum * self.bins // self.samples).astype(np.intp)
+        return values, bins
+
+
+def _mix(x):
+    # splitmix64 finalizer; uint64 arithmetic wraps
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+
+# Keyed bijection of [0, n): a 4-round Feistel network over the smallest
+# even bit width covering n (multiply-shift round function), cycle-walked
+# back into range. Works in uint32 when n fits, which halves the memory traffic.
+def _permute(index, n, key, rounds=4):
+    half = max(1, ((n - 1).bit_length() + 1) // 2)
+    dtype = np.uint32 if 2 * half <= 32 else np.uint64
+    bits = np.dtype(dtype).itemsize * 8
+    shift, mask, top = dtype(half), dtype((1 << half) - 1), dtype(bits - half)
+    multiplier = dtype(0x9e3779b1 if bits == 32 else 0x9e3779b97f4a7c15)
+    round_keys = np.random.SeedSequence(int(key)).generate_state(rounds, dtype=dtype)
+    limit = dtype(n) if n < 1 << bits else None
+    x = index.astype(dtype)
+    result = pending = None
+    while True:
+        left, right = x >> shift, x & mask
+        for round_key in round_keys:
+            left, right = right, left ^ (((right ^ round_key) * multiplier) >> top)
+        x = (left << shift) | right
+        if pending is None:
+            result = x
+            pending = np.flatnonzero(x >= limit) if limit is not None else ()
+        else:
+            result[pending] = x
+            pending = pending[x >= limit]
+        if not len(pending):
+            return result.astype(np.int64)
+        x = result[pending]
+
+
+# Warning counts of a sweep, split by parameter bin. joint[name][b, w] counts
+# the points whose `name` fell in bin b and whose warning bitmask was w.
+class SweepResult:
+    def __init__(self, design, joint, points, elapsed):
+        self.design = design
+        self.joint = joint
+        self.points = points
+        self.elapsed = elapsed
+
+    @property
+    def parameters(self):
+        return tuple(self.joint)
+
+    def _by_flag(self, counts, flag):
+        return counts[..., [code for code in range(WARNING_CODES) if code & flag]].sum(axis=-1)
+
+    def warning_count(self, flag):
+        first = next(iter(self.joint.values()))
+        return int(self._by_flag(first.sum(axis=0), flag))
+
+    def warning_rate(self, flag):
+        return self.warning_count(flag) / self.points if self.points else 0.0
+
+    # Share of points with the warning in each bin of the parameter
+    def conditional_rates(self, flag, name):
+        counts = self.joint[name]
+        totals = counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._by_flag(counts, flag) / totals
+
+    # Parameters ranked by how much the warning rate moves across their bins
+    # (max minus min conditional rate); 0 means the parameter has no effect
+    def drivers(self, flag):
+        spreads = []
+        for name in self.joint:
+            rates = self.conditional_rates(flag, name)
+            rates = rates[~np.isnan(rates)]
+            spreads.append((name, float(rates.max() - rates.min()) if len(rates) else 0.0))
+        return sorted(spreads, key=lambda item: -item[1])
+
+    def report(self):
+        lines = [f"{self.points:,} points over {', '.join(self.parameters)} in {self.elapsed:.2f} s"]
+        for flag, description in WARNINGS:
+            count = self.warning_count(flag)
+            lines.append(f"\n[WARNING] {description}: {count:,} points ({self.warning_rate(flag):.2%})")
+            drivers = [(name, spread) for name, spread in self.drivers(flag) if spread > 0]
+            if not count or not drivers:
+                lines.append("  not affected by the swept parameters")
+                continue
+            for name, spread in drivers:
+                rates = self.conditional_rates(flag, name)
+                labels = self.design.bin_labels(name)
+                low, high = int(np.nanargmin(rates)), int(np.nanargmax(rates))
+                lines.append(f"  {name}: rate moves by {spread:.2%} "
+                             f"({rates[low]:.2%} at {labels[low]:.4g}, {rates[high]:.2%} at {labels[high]:.4g})")
+        return "\n".join(lines)
+
+
+# Runs the design through the soil analysis. Parameters the design does not
+# sweep come from `fixed`, falling back to the standard foundation constants;
+# the soil inputs (capacity, layer depth, water table depth) must be swept or fixed.
+def run_sweep(design, soil_type='Sand', fixed=None, chunk_size=DEFAULT_CHUNK_SIZE, progress=None):
+    swept = list(design.axes if isinstance(design, CartesianGrid) else design.ranges)
+    unknown = [name for name in list(swept) + list(fixed or {}) if name not in PARAMETERS]
+    if unknown:
+        raise ValueError(f"Unknown parameter {', '.join(unknown)} (choose from {', '.join(PARAMETERS)})")
+    constants = dict(DEFAULTS, **(fixed or {}))
+    missing = [name for name in PARAMETERS if name not in swept and name not in constants]
+    if missing:
+        raise ValueError(f"Give a fixed value or a sweep range for {', '.join(missing)}")
+    bins = {name: len(design.bin_labels(name)) for name in swept}
+    joint = {name: np.zeros(bins[name] * WARNING_CODES, dtype=np.int64) for name in swept}
+
+    start_time = time.perf_counter()
+    total = len(design)
+    for start in range(0, total, chunk_size):
+        stop = min(start + chunk_size, total)
+        values, bin_indices = design.chunk(start, stop)
+        arguments = {name: constants[name] for name in PARAMETERS if name not in values}
+        arguments.update(values)
+        warnings = SoilAnalysisBatch(soil_type, **arguments).warning_flags()
+        for name in swept:
+            # One bincount per parameter over the combined (bin, bitmask) code
+            joint[name] += np.bincount(bin_indices[name] * WARNING_CODES + warnings,
+                                       minlength=bins[name] * WARNING_CODES)
+        if progress is not None:
+            progress(stop, total)
+    joint = {name: counts.reshape(bins[name], WARNING_CODES) for name, counts in joint.items()}
+    return SweepResult(design, joint, total, time.perf_counter() - start_time)
+
+
+def _parse_spec(spec):
+    name, _, bounds = spec.partition('=')
+    parts = bounds.split(':')
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(f"expected NAME=LOW:HIGH[:STEPS], got {spec!r}")
+    return name, float(parts[0]), float(parts[1]), int(parts[2]) if len(parts) == 3 else None
+
+
+def _parse_fixed(spec):
+    name, _, value = spec.partition('=')
+    return name, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='Calculator.py sweep',
+                                     description="Sweep soil and foundation parameters and report which ones "
+                                                 "drive the analysis warnings.")
+    parser.add_argument('--param', action='append', type=_parse_spec, required=True, metavar='NAME=LOW:HIGH[:STEPS]',
+                        help=f"parameter to sweep, one of {', '.join(PARAMETERS)}")
+    parser.add_argument('--fixed', action='append', type=_parse_fixed, default=[], metavar='NAME=VALUE')
+    parser.add_argument('--soil-type', default='Sand')
+    parser.add_argument('--lhs', type=int, metavar='SAMPLES', help="Latin hypercube sample instead of a grid")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--bins', type=int, default=DEFAULT_BINS, help="strata per parameter in the report (LHS)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.lhs:
+            design = LatinHypercube({name: (low, high) for name, low, high, _ in args.param}, args.lhs, args.seed,
+                                    args.bins)
+        else:
+            design = CartesianGrid({name: np.linspace(low, high, steps or DEFAULT_BINS)
+                                    for name, low, high, steps in args.param})
+        result = run_sweep(design, args.soil_type.capitalize(), dict(args.fixed), args.chunk_size)
+    except ValueError as e:
+        parser.exit(2, f"{parser.prog}: error: {e}\n")
+    print(result.report())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
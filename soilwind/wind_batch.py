@@ -0,0 +1,96 @@
+import numpy as np
+
+from .core import CAUTION, CAUTION_RATIO, EXCEED, SAFE, STATUS_NAMES, calculate_wind_load
+from .factors import FACTORS
+
+GUST_FACTORS = np.array(FACTORS.exposures.values)
+DRAG_COEFFICIENTS = np.array(FACTORS.shapes.values)
+# Indexed [structure code, specific type code]; NaN marks pairs that do not exist
+ACCEPTABLE_LIMITS = np.array([[np.nan if limit is None else limit for limit in row] for row in FACTORS.limits])
+
+
+def lookup_factor(values, table, factors, what, normalize):
+    codes = table.encode_array(values, normalize)
+    if (codes < 0).any():
+        invalid = sorted({str(value) for value in np.broadcast_to(np.asarray(values), codes.shape)[codes < 0].tolist()})
+        raise ValueError(f"Invalid {what}: {', '.join(invalid)}")
+    return factors[codes]
+
+
+def lookup_acceptable_limits(structure_type, specific_type):
+    structure_type, specific_type = np.broadcast_arrays(np.asarray(structure_type), np.asarray(specific_type))
+    structure_codes = FACTORS.structures.encode_array(structure_type, str.lower)
+    specific_codes = FACTORS.specific_types.encode_array(specific_type, str.lower)
+    if (structure_codes < 0).any():
+        invalid = sorted(set(structure_type[structure_codes < 0].tolist()))
+        raise ValueError(f"Invalid structure type: {', '.join(invalid)}")
+
+    acceptable_limits = ACCEPTABLE_LIMITS[structure_codes, specific_codes]
+    bad = (specific_codes < 0) | np.isnan(acceptable_limits)
+    if bad.any():
+        pairs = sorted({f"{s}/{t}" for s, t in zip(structure_type[bad].tolist(), specific_type[bad].tolist())})
+        raise ValueError(f"Invalid specific structure type: {', '.join(pairs)}")
+    return acceptable_limits
+
+
+class WindSweepResult:
+    def __init__(self, wind_load, acceptable_limits, utilization, status):
+        self.wind_load = wind_load
+        self.acceptable_limits = acceptable_limits
+        self.utilization = utilization
+        self.status = status
+
+    @property
+    def shape(self):
+        return self.wind_load.shape
+
+    def status_names(self):
+        return np.asarray(STATUS_NAMES)[self.status]
+
+
+# Batch form of the calculation in core.evaluate_wind_load. All
+# arguments broadcast against each other, e.g. building attributes shaped
+# (n_buildings, 1) with wind_speed shaped (n_speeds,) give an
+# (n_buildings, n_speeds) sweep. Categorical inputs are matched the same way
+# as the CLI: exposure categories are upper-cased, everything else lower-cased,
+# and FACTORS codes may be passed instead of names.
+def wind_load_sweep(wind_speed, exposure_category, structural_shape, area, structure_type, specific_type):
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+    area = np.asarray(area, dtype=np.float64)
+    if (~(wind_speed > 0)).any():
+        raise ValueError("Wind speed must be a positive number.")
+    if (~(area > 0)).any():
+        raise ValueError("Area must be a positive number.")
+
+    G = lookup_factor(exposure_category, FACTORS.exposures, GUST_FACTORS, "exposure category", str.upper)
+    Cd = lookup_factor(structural_shape, FACTORS.shapes, DRAG_COEFFICIENTS, "structural shape", str.lower)
+    acceptable_limits = lookup_acceptable_limits(structure_type, specific_type)
+
+    q = 0.613 * wind_speed**2
+    wind_load = calculate_wind_load(q, G, Cd, area)
+    shape = np.broadcast_shapes(wind_load.shape, acceptable_limits.shape)
+    wind_load = np.broadcast_to(wind_load, shape)
+    acceptable_limits = np.broadcast_to(acceptable_limits, shape)
+    utilization = wind_load / acceptable_limits
+
+    status = np.full(wind_load.shape, SAFE, dtype=np.int8)
+    status[wind_load > CAUTION_RATIO * acceptable_limits] = CAUTION
+    status[wind_load > acceptable_limits] = EXCEED
+    return WindSweepResult(wind_load, acceptable_limits, utilization, status)
+
+
+# Queues every row of a sweep to the wind history in one hand-off to the
+# background writer, like soil_batch.log_soil_batch_to_csv. Without an
+# explicit history logger the extra history.history_backends receive the
+# rows too.
+def log_wind_batch_to_csv(result, structure_type, specific_type, history=None):
+    if history is None:
+        from .history import history_backends, wind_history
+
+        history = wind_history
+        for backend in history_backends:
+            backend.log_wind_batch(result, structure_type, specific_type)
+    shape = result.shape
+    columns = [result.wind_load, np.broadcast_to(np.asarray(structure_type), shape),
+               np.broadcast_to(np.asarray(specific_type), shape), result.acceptable_limits]
+    history.log_many(zip(*(column.ravel().tolist() for column in columns)))
@@ -0,0 +1,42 @@
+import math
+import random
+
+from soilwind.analytics import RELATIVE_ACCURACY, QuantileSketch, StructureTypeAggregate
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(0, 1) for _ in range(5000))
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+    for q in (0.01, 0.25, 0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact * 1.0001
+
+
+def test_non_finite_values():
+    sketch = QuantileSketch()
+    for value in [0.5, 1.0, math.inf, math.nan, 0.0]:
+        sketch.add(value)
+    assert sketch.count == 4
+    assert (sketch.zeros, sketch.overflow) == (1, 1)
+    assert sketch.quantile(0) == 0.0
+    assert sketch.quantile(1) == math.inf
+
+    restored = QuantileSketch.from_json(sketch.to_json())
+    assert (restored.count, restored.overflow, restored.buckets) == (4, 1, sketch.buckets)
+
+
+def test_sketch_without_overflow_field_loads():
+    data = QuantileSketch({0: 2}).to_json()
+    del data['overflow']
+    assert QuantileSketch.from_json(data).count == 2
+
+
+def test_infinite_wind_load_does_not_abort_aggregate():
+    aggregate = StructureTypeAggregate()
+    aggregate.add(math.inf, 100.0)
+    aggregate.add(50.0, 100.0)
+    assert aggregate.count == 2
+    assert aggregate.utilization_sketch.quantile(1) == math.inf
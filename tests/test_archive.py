@@ -0,0 +1,94 @@
+import csv
+
+import numpy as np
+import pytest
+
+from soilwind.archive import (MISSING, ArchiveWriter, archive_to_csv, csv_to_archive, read_archive, soil_records,
+                              wind_records)
+from soilwind.core import SoilAnalysis, evaluate_wind_load
+from soilwind.history import SOIL_HISTORY_HEADER, WIND_HISTORY_HEADER
+from soilwind.soil_batch import SoilAnalysisBatch
+from soilwind.wind_batch import wind_load_sweep
+
+
+def soil_batch(n=500):
+    rng = np.random.default_rng(0)
+    return SoilAnalysisBatch(rng.choice(['Clay', 'Sand', 'Silt', 'Loam'], n), rng.uniform(20, 500, n).round(1),
+                             rng.uniform(0.5, 20, n).round(2), rng.uniform(0.1, 10, n).round(2))
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_soil_records_round_trip(tmp_path, compression):
+    batch = soil_batch()
+    result = batch.analyze()
+    records = soil_records(batch, result)
+    path = tmp_path / 'soil.swr'
+    with ArchiveWriter(str(path), 'soil', compression, block_rows=64) as writer:
+        writer.write(records[:100])
+        writer.write(records[100:])
+
+    archive = read_archive(str(path))
+    assert (archive.kind, archive.compression, len(archive)) == ('soil', compression, len(records))
+    assert (archive.records == records).all()
+    assert (archive.high_water_table() == result.high_water_table).all()
+    assert archive.names('soil_type', stop=3).tolist() == \
+        np.array(['Clay', 'Sand', 'Silt', 'Loam'])[batch.soil_type[:3]].tolist()
+
+
+def test_wind_records_keep_new_names_and_missing_inputs(tmp_path):
+    result = wind_load_sweep([10.0, 30.0, 60.0], 'B', 'rectangular', 10.0, 'Residential', 'apartment')
+    path = tmp_path / 'wind.swr'
+    with ArchiveWriter(str(path), 'wind') as writer:
+        writer.write(wind_records(writer, result, [10.0, 30.0, 60.0], 'b', None, 10.0, 'Residential', 'apartment'))
+        assert writer.encode('specific_type', ['bunker'])[0] == len(writer.categories['specific_type']) - 1
+
+    archive = read_archive(str(path))
+    assert archive.names('exposure_category').tolist() == ['B'] * 3
+    assert (archive['structural_shape'] == MISSING).all()
+    assert archive.names('structural_shape', missing='?').tolist() == ['?'] * 3
+    assert archive.names('structure_type').tolist() == ['residential'] * 3
+    assert 'bunker' in archive.categories['specific_type']
+    assert (archive['status'] == result.status).all()
+    assert (archive['wind_load'] == result.wind_load).all()
+
+
+def test_csv_history_round_trip(tmp_path):
+    soil_csv, wind_csv = tmp_path / 'soil.csv', tmp_path / 'wind.csv'
+    soil_rows = [SoilAnalysis(soil_type, capacity, depth, water_table).result().history_row()
+                 for soil_type, capacity, depth, water_table in
+                 [('Clay', 150.0, 2.5, 1.2), ('Gravel', 80.0, 1.0, 4.0), ('Loam', 320.5, 6.0, 2.0)]]
+    wind_rows = []
+    for speed in (10.0, 35.0, 80.0):
+        wind_load, acceptable_limits, _ = evaluate_wind_load(speed, 'B', 'rectangular', 10.0, 'residential',
+                                                             'duplex')
+        wind_rows.append([wind_load, 'residential', 'duplex', float(acceptable_limits)])
+    for path, header, rows in ((soil_csv, SOIL_HISTORY_HEADER, soil_rows), (wind_csv, WIND_HISTORY_HEADER, wind_rows)):
+        with open(path, 'w', newline='') as file:
+            csv.writer(file).writerows([header] + rows)
+
+    for kind, path in (('soil', soil_csv), ('wind', wind_csv)):
+        archive_path, back_path = tmp_path / f'{kind}.swr', tmp_path / f'{kind}.back.csv'
+        assert csv_to_archive(kind, str(path), str(archive_path), 'zlib', chunk_size=2) == 3
+        assert archive_to_csv(str(archive_path), str(back_path), chunk_size=2) == 3
+        with open(path, newline='') as original, open(back_path, newline='') as back:
+            for row, back_row in zip(csv.reader(original), csv.reader(back), strict=True):
+                for value, back_value in zip(row, back_row, strict=True):
+                    try:
+                        assert float(back_value) == pytest.approx(float(value), rel=1e-7)
+                    except ValueError:
+                        assert back_value == value
+
+
+def test_rejects_incomplete_and_foreign_files(tmp_path):
+    path = tmp_path / 'broken.swr'
+    batch = soil_batch(5)
+    with pytest.raises(RuntimeError):
+        with ArchiveWriter(str(path), 'soil') as writer:
+            writer.write(soil_records(batch, batch.analyze()))
+            raise RuntimeError
+    with pytest.raises(ValueError, match="incomplete archive"):
+        read_archive(str(path))
+
+    path.write_bytes(b'Soil Type,Soil Bearing Capacity\n')
+    with pytest.raises(ValueError, match="not a result archive"):
+        read_archive(str(path))
@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+
+from soilwind import history
+from soilwind.bulk_input import ErrorSidecar, run_batch
+from soilwind.history_logger import HistoryLogger
+from soilwind.history_store import SQLiteHistoryStore
+
+SOIL_HEADER = 'soil_type,soil_bearing_capacity,depth_of_soil_layer,water_table_depth\n'
+
+
+def run_soil(tmp_path, text):
+    path = tmp_path / 'soil.csv'
+    path.write_text(text)
+    output = io.StringIO()
+    errors = ErrorSidecar(str(tmp_path / 'errors.jsonl'))
+    processed = run_batch('soil', str(path), output, errors)
+    errors.close()
+    rejected = [json.loads(line) for line in open(errors.path)] if errors.count else []
+    return processed, output.getvalue().splitlines(), rejected
+
+
+def test_rejected_rows_report_their_physical_line(tmp_path):
+    text = SOIL_HEADER + '"Cl\nay",200,3,1.5\nSand,x,2,5\nSilt,150,2,"\n5"\nSilt,-1,2,5\n'
+    processed, lines, rejected = run_soil(tmp_path, text)
+
+    assert processed == 1
+    assert [(row['line'], row['error'].split(':')[0]) for row in rejected] == [
+        (2, 'soil_type'), (4, 'soil_bearing_capacity'), (7, 'soil_bearing_capacity')]
+
+
+def test_results_follow_the_input_columns(tmp_path):
+    processed, lines, rejected = run_soil(tmp_path, SOIL_HEADER + 'Clay,200,3,1.5\nSand,90,2,5\n')
+
+    assert processed == 2 and not rejected
+    assert lines[0].split(',')[-5:] == ['allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure',
+                                        'capacity_class', 'warnings']
+    assert lines[1].split(',')[-1] == '8'
+    assert lines[2].split(',')[-1] == '1'
+
+
+def test_logged_wind_rows_reach_the_history_backends(tmp_path, monkeypatch):
+    path = tmp_path / 'wind.csv'
+    path.write_text('wind_speed,exposure_category,structural_shape,area,structure_type,specific_type\n'
+                    '10,B,rectangular,10,Residential,apartment\n80,C,dome,50,commercial,office\n')
+    wind_history = HistoryLogger(str(tmp_path / 'wind_history.csv'), history.WIND_HISTORY_HEADER)
+    store = SQLiteHistoryStore(str(tmp_path / 'history.sqlite'))
+    monkeypatch.setattr(history, 'wind_history', wind_history)
+    monkeypatch.setattr(history, 'history_backends', [store])
+
+    errors = ErrorSidecar(str(tmp_path / 'errors.jsonl'))
+    assert run_batch('wind', str(path), io.StringIO(), errors, log_history=True) == 2
+    errors.close()
+    wind_history.close()
+    store.flush()
+
+    with open(wind_history.path, newline='') as file:
+        logged = list(csv.reader(file))[1:]
+    stored = store.query_wind()
+    assert [row[1:3] for row in logged] == [['residential', 'apartment'], ['commercial', 'office']]
+    assert sorted((row['structure_type'], row['specific_type']) for row in stored) == [
+        ('commercial', 'office'), ('residential', 'apartment')]
+    assert sorted(row['wind_load'] for row in stored) == sorted(float(row[0]) for row in logged)
+    store.close()
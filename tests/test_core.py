@@ -0,0 +1,37 @@
+import pytest
+
+from soilwind.core import (CAUTION, EXCEED, SAFE, WATER_TABLE_ADEQUATE, WATER_TABLE_TOO_HIGH, SoilAnalysis,
+                           SoilProfile, calculate_wind_load, evaluate_wind_load)
+
+
+@pytest.mark.parametrize('soil_type', ['Clay', 'Sand', 'Silt', 'Loam'])
+def test_single_layer_profile_matches_analysis(soil_type):
+    analysis = SoilAnalysis(soil_type, 180.0, 2.5, 1.2)
+    profile = analysis.profile()
+    assert profile.allowable_bearing_capacity() == analysis.calculate_soil_bearing_capacity()
+    assert profile.water_table_effect() == analysis.water_table_effect() == WATER_TABLE_TOO_HIGH
+
+
+def test_single_layer_requires_water_table_depth():
+    with pytest.raises(TypeError):
+        SoilProfile.single_layer('Clay', 200.0, 3.0)
+    assert SoilProfile.single_layer('Clay', 200.0, 3.0, 4.0).water_table_effect() == WATER_TABLE_ADEQUATE
+
+
+def test_layered_profile_capacity_is_cumulative():
+    profile = SoilProfile(['Sand', 'Clay'], [1.0, 2.0], [100.0, 200.0], 5.0)
+    assert profile.total_depth == 3.0
+    assert profile.layer_at(0.5) == 0 and profile.layer_at(3.0) == 1 and profile.layer_at(3.5) == -1
+    assert profile.total_bearing_capacity(2.0) == pytest.approx(100.0 * 1.0 + 200.0 * 1.2)
+    with pytest.raises(ValueError):
+        profile.total_bearing_capacity(4.0)
+
+
+# q * G * Cd * area = 0.613 * v**2 * 1.0 * 1.3 * 10 against the 1400 N
+# limit of a residential apartment
+@pytest.mark.parametrize('wind_speed, expected', [(10.0, (796.9, 1400, SAFE)), (12.0, (1147.536, 1400, CAUTION)),
+                                                  (30.0, (7172.1, 1400, EXCEED))])
+def test_evaluate_wind_load_status(wind_speed, expected):
+    assert calculate_wind_load(0.613 * 30**2, 1.0, 1.3, 10) == pytest.approx(7172.1)
+    wind_load, limit, status = evaluate_wind_load(wind_speed, 'B', 'rectangular', 10.0, 'residential', 'apartment')
+    assert (wind_load, limit, status) == (pytest.approx(expected[0]), expected[1], expected[2])
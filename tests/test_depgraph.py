@@ -0,0 +1,43 @@
+import pytest
+
+from soilwind.depgraph import Graph
+from soilwind.gui import gust_factor_map, wind_inputs_graph
+
+
+def test_only_dependents_are_recomputed():
+    graph = wind_inputs_graph()
+    gust = next(iter(gust_factor_map))
+    graph.update(wind_speed_input='30', area_input='10', gust_factor_selection=gust,
+                 shape_factor_selection='rectangular', structure_type='residential', specific_type='apartment')
+    first = graph['report']
+    assert graph.recomputed == dict.fromkeys(['q', 'G', 'Cd', 'area', 'wind_load', 'acceptable_limits', 'report'], 1)
+
+    graph.set('wind_speed_input', '31')
+    assert graph.dirty() == {'q', 'wind_load', 'report'}
+    assert graph['report'] != first
+    assert graph.recomputed['G'] == graph.recomputed['Cd'] == graph.recomputed['acceptable_limits'] == 1
+    assert graph.recomputed['q'] == 2
+
+    assert not graph.set('wind_speed_input', '31')
+    assert not graph.dirty()
+
+
+def test_failure_is_kept_until_an_input_changes():
+    calls = []
+    graph = Graph().input('x', 0)
+    graph.node('inverse', lambda x: calls.append(x) or 1 / x, 'x')
+    for _ in range(2):
+        with pytest.raises(ZeroDivisionError):
+            graph['inverse']
+    assert calls == [0]
+    graph.set('x', 4)
+    assert graph['inverse'] == 0.25
+
+
+def test_missing_input_and_unknown_dependency():
+    graph = Graph().input('x')
+    graph.node('y', lambda x: x + 1, 'x')
+    with pytest.raises(ValueError, match="x is required"):
+        graph['y']
+    with pytest.raises(ValueError, match="Unknown dependency"):
+        graph.node('z', abs, 'w')
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from soilwind.core import SoilAnalysis, evaluate_wind_load
+from soilwind.factors import FACTORS
+from soilwind.grid import NODATA, GridScreening
+
+SHAPE = (7, 11)
+STRUCTURE = ('rectangular', 20.0, 'residential', 'apartment')
+
+
+@pytest.fixture
+def rasters(tmp_path):
+    rng = np.random.default_rng(0)
+    soil_type = rng.integers(0, len(FACTORS.soils), SHAPE).astype(np.uint8)
+    soil_type[0, 0] = NODATA
+    capacity = rng.uniform(20, 500, SHAPE).astype(np.float32)
+    capacity[3, 4] = np.nan
+    water_table = rng.uniform(0.1, 10, SHAPE)
+    wind_speed = rng.uniform(5, 60, SHAPE).astype(np.float32)
+    wind_speed[1, 2], wind_speed[5, 10], wind_speed[6, 0] = np.nan, 0, -4
+    exposure = rng.integers(0, len(FACTORS.exposures), SHAPE).astype(np.uint8)
+    exposure[2, 9] = NODATA
+
+    np.save(tmp_path / 'soil_type.npy', soil_type)
+    capacity.tofile(tmp_path / 'capacity.f32')
+    np.save(tmp_path / 'water_table.npy', water_table)
+    wind_speed.tofile(tmp_path / 'wind_speed.f32')
+    np.save(tmp_path / 'exposure.npy', exposure)
+    inputs = {'soil_type': str(tmp_path / 'soil_type.npy'), 'soil_bearing_capacity': str(tmp_path / 'capacity.f32'),
+              'depth_of_soil_layer': 2.5, 'water_table_depth': str(tmp_path / 'water_table.npy'),
+              'wind_speed': str(tmp_path / 'wind_speed.f32'), 'exposure_category': str(tmp_path / 'exposure.npy')}
+    return inputs, soil_type, capacity, water_table, wind_speed, exposure
+
+
+def test_cells_match_the_scalar_core(tmp_path, rasters):
+    inputs, soil_type, capacity, water_table, wind_speed, exposure = rasters
+    screening = GridScreening(inputs, *STRUCTURE, tile=3)
+    assert len(list(screening.tiles())) == 3 * 4
+    summary = screening.run(str(tmp_path / 'out'))
+    warnings = np.load(tmp_path / 'out' / 'soil_warnings.npy')
+    status = np.load(tmp_path / 'out' / 'wind_status.npy')
+    utilization = np.load(tmp_path / 'out' / 'utilization.npy')
+
+    for row in range(SHAPE[0]):
+        for column in range(SHAPE[1]):
+            cell = row, column
+            if soil_type[cell] == NODATA or np.isnan(capacity[cell]):
+                assert warnings[cell] == NODATA
+            else:
+                analysis = SoilAnalysis(FACTORS.soils.names[soil_type[cell]], float(capacity[cell]), 2.5,
+                                        float(water_table[cell]))
+                assert warnings[cell] == analysis.warning_flags()
+            if exposure[cell] == NODATA or not wind_speed[cell] > 0:
+                assert status[cell] == NODATA
+                assert np.isnan(utilization[cell])
+            else:
+                wind_load, acceptable_limits, expected = evaluate_wind_load(
+                    float(wind_speed[cell]), FACTORS.exposures.names[exposure[cell]], *STRUCTURE)
+                assert status[cell] == expected
+                assert utilization[cell] == pytest.approx(wind_load / acceptable_limits, rel=1e-6)
+
+    assert summary.soil_histogram[NODATA] == 2
+    assert summary.wind_histogram[NODATA] == 4
+    assert summary.soil_histogram.sum() == summary.wind_histogram.sum() == SHAPE[0] * SHAPE[1]
+    assert summary.max_utilization == pytest.approx(np.nanmax(utilization))
+
+
+def test_constant_categories_and_shape_errors(tmp_path, rasters):
+    inputs = {**rasters[0], 'soil_type': 'clay', 'exposure_category': 'c'}
+    summary = GridScreening(inputs, *STRUCTURE, tile=4).run(str(tmp_path / 'out'))
+    assert summary.soil_histogram[NODATA] == 1
+    with pytest.raises(ValueError, match="Invalid soil type"):
+        GridScreening({**inputs, 'soil_type': 'granite'}, *STRUCTURE)
+    with pytest.raises(ValueError, match="one 2-D shape"):
+        GridScreening({'soil_type': 'clay', 'soil_bearing_capacity': np.ones(SHAPE), 'depth_of_soil_layer': 2.5,
+                       'water_table_depth': np.ones((3, 3))})
+    # A raw raster takes the shape of the others, and must have its size
+    with pytest.raises(ValueError, match="308 bytes, not the 36 of a 3 x 3 float32 grid"):
+        GridScreening({**inputs, 'water_table_depth': np.ones((3, 3))}, *STRUCTURE)
+    with pytest.raises(ValueError, match="needs the structural shape"):
+        GridScreening({'wind_speed': 10.0, 'exposure_category': 'B'})
@@ -0,0 +1,52 @@
+import csv
+import threading
+
+import pytest
+
+from soilwind.history_logger import HistoryLogger
+
+HEADER = ['a', 'b']
+
+
+def read_rows(path):
+    with open(path, newline='') as file:
+        return list(csv.reader(file))
+
+
+def test_rows_from_many_threads_are_all_written_once(tmp_path):
+    path = tmp_path / 'history.csv'
+    logger = HistoryLogger(str(path), HEADER, batch_size=50, flush_interval=60)
+
+    def log(thread):
+        for i in range(200):
+            logger.log([thread, i])
+
+    threads = [threading.Thread(target=log, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logger.flush()
+    rows = read_rows(path)
+    assert rows[0] == HEADER
+    assert sorted(rows[1:]) == sorted([str(thread), str(i)] for thread in range(4) for i in range(200))
+    logger.close()
+
+
+def test_appends_without_repeating_the_header(tmp_path):
+    path = tmp_path / 'history.csv'
+    for value in ('1', '2'):
+        logger = HistoryLogger(str(path), HEADER)
+        logger.log_many(iter([[value, value]]))
+        logger.close()
+    assert read_rows(path) == [HEADER, ['1', '1'], ['2', '2']]
+
+
+def test_open_error_is_raised_to_the_caller(tmp_path):
+    logger = HistoryLogger(str(tmp_path / 'missing' / 'history.csv'), HEADER)
+    logger.log(['1', '2'])
+    with pytest.raises(OSError):
+        logger.flush()
+    with pytest.raises(OSError):
+        logger.log(['3', '4'])
+    logger.close()
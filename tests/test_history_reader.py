@@ -0,0 +1,113 @@
+import csv
+import os
+
+import pytest
+
+from soilwind import history_reader
+from soilwind.history_reader import HistoryReader
+
+HEADER = 'wind_load,structure_type,specific_type,acceptable_limits\n'
+
+
+def rows_text(start, count):
+    return ''.join(f'{i * 10.5},residential,"apartment, {i}",1400\n' for i in range(start, start + count))
+
+
+def csv_rows(path):
+    with open(path, newline='') as file:
+        return list(csv.reader(file))[1:]
+
+
+@pytest.fixture
+def history(tmp_path):
+    path = tmp_path / 'wind.csv'
+    path.write_text(HEADER + rows_text(0, 5))
+    return path
+
+
+def append(path, text):
+    with open(path, 'a') as file:
+        file.write(text)
+
+
+def test_append_then_refresh(history):
+    with HistoryReader(str(history)) as reader:
+        assert reader.header == HEADER.strip().split(',')
+        assert len(reader) == 5
+        append(history, rows_text(5, 3))
+        assert reader.refresh() == 3
+        assert reader.refresh() == 0
+        assert reader[:] == csv_rows(history)
+        assert reader[-1] == csv_rows(history)[-1]
+        assert reader.line(0) == b'0.0,residential,"apartment, 0",1400'
+
+
+def test_reopen_uses_the_persisted_index(history, monkeypatch):
+    with HistoryReader(str(history)) as reader:
+        offsets = reader.offsets.tolist()
+    append(history, rows_text(5, 2))
+
+    scanned = []
+    index_rows = HistoryReader._index_rows
+    monkeypatch.setattr(HistoryReader, '_index_rows',
+                        lambda self, start, size: scanned.append((start, size)) or index_rows(self, start, size))
+    with HistoryReader(str(history)) as reader:
+        assert reader.offsets.tolist()[:5] == offsets
+        assert len(reader) == 7
+        assert reader[:] == csv_rows(history)
+    # Only the appended bytes were searched for rows
+    assert scanned == [(os.path.getsize(history) - len(rows_text(5, 2)), os.path.getsize(history))]
+
+
+def test_partial_last_row_waits_for_its_newline(history):
+    append(history, '99.5,residential,duplex')
+    with HistoryReader(str(history)) as reader:
+        assert len(reader) == 5
+        append(history, ',1200\n')
+        assert reader.refresh() == 1
+        assert reader[-1] == ['99.5', 'residential', 'duplex', '1200']
+    with HistoryReader(str(history)) as reader:
+        assert len(reader) == 6
+
+
+@pytest.mark.parametrize('rewrite', ['shrink', 'same size', 'replace'])
+def test_rewritten_file_is_reindexed(history, rewrite):
+    reader = HistoryReader(str(history))
+    if rewrite == 'shrink':
+        history.write_text(HEADER + rows_text(100, 2))
+    elif rewrite == 'same size':
+        text = history.read_text()
+        history.write_text(text.replace('residential', 'institution'))
+    else:
+        replacement = history.with_name('new.csv')
+        replacement.write_text(HEADER + rows_text(50, 9))
+        os.replace(replacement, history)
+    reader.refresh()
+    assert reader[:] == csv_rows(history)
+    reader.close()
+    with HistoryReader(str(history)) as reopened:
+        assert reopened[:] == csv_rows(history)
+
+
+def test_unwritable_index_falls_back_to_memory(history, tmp_path):
+    with HistoryReader(str(history), index_path=str(tmp_path / 'missing' / 'wind.idx')) as reader:
+        assert not reader.persist
+        append(history, rows_text(5, 1))
+        assert reader.refresh() == 1
+        assert reader[:] == csv_rows(history)
+
+
+def first_column(rows):
+    return [row[0] for row in rows]
+
+
+def test_tail_and_scan_match_csv_reader(history, monkeypatch):
+    append(history, rows_text(5, 200))
+    monkeypatch.setattr(history_reader, 'SCAN_BLOCK', 256)
+    expected = csv_rows(history)
+    with HistoryReader(str(history)) as reader:
+        assert reader.tail(7) == expected[-7:]
+        assert reader.tail(1000) == expected
+        chunks = reader.scan(first_column, workers=1, parts=6)
+        assert len(chunks) == 6
+        assert sum(chunks, []) == [row[0] for row in expected]
@@ -0,0 +1,82 @@
+import csv
+
+import pytest
+
+from soilwind.history import SOIL_HISTORY_HEADER, WIND_HISTORY_HEADER
+from soilwind.history_store import SQLiteHistoryStore, import_csv_history
+
+
+def write_csv(path, header, rows, mode='w'):
+    with open(path, mode, newline='') as file:
+        writer = csv.writer(file)
+        if mode == 'w':
+            writer.writerow(header)
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / 'history.sqlite'))
+    yield store
+    store.close()
+
+
+SOIL_ROW = ['Clay', 200, 3, 1.5, 240, 0.00002, 0.0105, 'Water table is too high.']
+WIND_ROWS = [[500, 'residential', 'apartment', 1400], [1500, 'residential', 'apartment', 1400]]
+
+
+def test_import_twice_does_not_duplicate(tmp_path, store):
+    soil, wind = tmp_path / 'soil.csv', tmp_path / 'wind.csv'
+    write_csv(soil, SOIL_HISTORY_HEADER, [SOIL_ROW, SOIL_ROW])
+    write_csv(wind, WIND_HISTORY_HEADER, WIND_ROWS)
+
+    assert import_csv_history(store, str(soil), str(wind)) == {'soil': 2, 'wind': 2, 'errors': []}
+    assert import_csv_history(store, str(soil), str(wind)) == {'soil': 0, 'wind': 0, 'errors': []}
+    assert store.count_soil() == 2
+    assert store.count_wind() == 2
+
+
+def test_import_picks_up_appended_rows(tmp_path, store):
+    soil = tmp_path / 'soil.csv'
+    write_csv(soil, SOIL_HISTORY_HEADER, [SOIL_ROW])
+    import_csv_history(store, str(soil), str(tmp_path / 'missing.csv'))
+    write_csv(soil, SOIL_HISTORY_HEADER, [SOIL_ROW, SOIL_ROW], mode='a')
+
+    assert import_csv_history(store, str(soil), str(tmp_path / 'missing.csv'))['soil'] == 2
+    assert store.count_soil() == 3
+
+
+def test_malformed_rows_are_skipped_with_their_line(tmp_path, store):
+    wind = tmp_path / 'wind.csv'
+    write_csv(wind, WIND_HISTORY_HEADER, [WIND_ROWS[0], ['not a number', 'residential', 'apartment', 1400],
+                                          WIND_ROWS[1], ['800']])
+
+    imported = import_csv_history(store, str(tmp_path / 'missing.csv'), str(wind))
+    assert imported['wind'] == 2
+    assert [line for _, line, _ in imported['errors']] == [3, 5]
+    assert store.count_wind() == 2
+
+
+def test_non_finite_rows_are_skipped_with_their_line(tmp_path, store):
+    soil, wind = tmp_path / 'soil.csv', tmp_path / 'wind.csv'
+    write_csv(soil, SOIL_HISTORY_HEADER, [SOIL_ROW, ['Clay', 'nan', *SOIL_ROW[2:]]])
+    write_csv(wind, WIND_HISTORY_HEADER, [['inf', 'residential', 'apartment', 1400], WIND_ROWS[0],
+                                          [800, 'residential', 'apartment', '-inf']])
+
+    imported = import_csv_history(store, str(soil), str(wind))
+    assert (imported['soil'], imported['wind']) == (1, 1)
+    assert [(path[-8:], line) for path, line, _ in imported['errors']] == [('soil.csv', 3), ('wind.csv', 2),
+                                                                           ('wind.csv', 4)]
+    assert 'finite' in imported['errors'][0][2]
+    assert (store.count_soil(), store.count_wind()) == (1, 1)
+
+
+def test_status_filter_accepts_names(store):
+    store.log_wind(500, 'residential', 'apartment', 1400)
+    store.log_wind(1200, 'residential', 'apartment', 1400)
+    store.log_wind(1500, 'residential', 'apartment', 1400)
+
+    assert [row['status'] for row in store.query_wind(status='exceed')] == ['EXCEED']
+    assert store.count_wind(status='CAUTION') == store.count_wind(status=1) == 1
+    with pytest.raises(ValueError):
+        store.count_wind(status='windy')
@@ -0,0 +1,36 @@
+import pytest
+
+import Calculator
+from soilwind import instrument
+from soilwind.core import SoilAnalysis, SoilResult
+
+
+@pytest.fixture
+def profiling():
+    instrument.reset()
+    instrument.enable()
+    yield instrument.stages
+    instrument.disable()
+    instrument.reset()
+
+
+def test_cli_soil_run_times_the_report(profiling, monkeypatch, capsys):
+    monkeypatch.setattr(Calculator, 'log_soil_analysis_to_csv', lambda analysis, result: result.history_row())
+    Calculator.SoilAnalysis('Clay', 200.0, 3.0, 1.5).display_analysis()
+
+    assert 'WARNING' in capsys.readouterr().out
+    for stage in ('soil.result', 'soil.report', 'soil.history_row', 'soil.calculate_soil_bearing_capacity'):
+        assert profiling[stage].calls == 1, stage
+
+
+def test_report_is_counted_once_through_soil_analysis(profiling):
+    SoilAnalysis('Sand', 150.0, 2.0, 3.0).report()
+    assert profiling['soil.report'].calls == 1
+
+
+def test_disable_restores_the_originals():
+    original = SoilResult.__dict__['report']
+    instrument.enable()
+    assert SoilResult.__dict__['report'] is not original
+    instrument.disable()
+    assert SoilResult.__dict__['report'] is original
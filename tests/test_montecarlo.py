@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from soilwind.montecarlo import Weibull, main, read_portfolio, wind_risk
+
+STRUCTURE = ('B', 'rectangular', 10.0, 'residential', 'apartment')
+
+
+def test_same_seed_gives_the_same_estimate_for_any_worker_count():
+    first = wind_risk(Weibull(2.0, 18.0), *STRUCTURE, samples=20_000, seed=7, block_size=5_000, workers=1)
+    second = wind_risk(Weibull(2.0, 18.0), *STRUCTURE, samples=20_000, seed=7, block_size=5_000, workers=2)
+    np.testing.assert_array_equal(first.exceedance_probability(), second.exceedance_probability())
+    assert 0 < first.exceedance_probability()[0] < 1
+
+
+def test_samples_must_be_positive():
+    with pytest.raises(ValueError, match='at least 1'):
+        wind_risk(Weibull(2.0, 18.0), *STRUCTURE, samples=0, workers=1)
+    with pytest.raises(SystemExit) as exit:
+        main(['--wind', 'weibull:2,18', '--structure', 'B', 'rectangular', '10', 'residential', 'apartment',
+              '--samples', '0'])
+    assert exit.value.code == 2
+
+
+@pytest.mark.parametrize('area', [0.0, float('nan')])
+def test_area_must_be_positive(area):
+    with pytest.raises(ValueError, match='Area must be a positive number'):
+        wind_risk(Weibull(2.0, 18.0), 'B', 'rectangular', area, 'residential', 'apartment', samples=10, workers=1)
+
+
+def test_portfolio_rows_need_every_structure_field(tmp_path):
+    path = tmp_path / 'portfolio.csv'
+    path.write_text('exposure_category,structural_shape,area,structure_type,specific_type\n'
+                    'B,rectangular,10,residential,apartment\nC,rectangular,,residential,duplex\n')
+    with pytest.raises(ValueError, match='line 3: missing area'):
+        read_portfolio(str(path))
+    with pytest.raises(SystemExit) as exit:
+        main(['--wind', 'weibull:2,18', '--portfolio', str(path)])
+    assert exit.value.code == 2
@@ -0,0 +1,51 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from soilwind import parallel
+from soilwind.soil_batch import analyze_soil_batch
+from soilwind.wind_batch import wind_load_sweep
+
+SOILS = ['Clay', 'Sand', 'Silt', 'Gravel']
+
+
+def soil_inputs(n=1000):
+    rng = np.random.default_rng(0)
+    return (list(rng.choice(SOILS, n)), rng.uniform(50, 500, n), rng.uniform(0.5, 10, n), rng.uniform(0.5, 5, n))
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_soil_matches_single_process(workers):
+    inputs = soil_inputs()
+    expected = analyze_soil_batch(*inputs)
+    result = parallel.parallel_soil_analysis(*inputs, workers=workers, chunk_size=300)
+    for name in ('allowable_bearing_capacity', 'settlement', 'lateral_earth_pressure', 'capacity_class', 'warnings'):
+        np.testing.assert_array_equal(getattr(result, name), np.broadcast_to(getattr(expected, name), (1000,)))
+
+
+def test_empty_soil_input():
+    result = parallel.parallel_soil_analysis([], [], [], [], workers=1)
+    assert len(result) == 0
+    assert result.warnings.dtype == np.uint8
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_wind_sweep_matches_single_process(workers):
+    speeds = np.linspace(5, 80, 50)[:, None]
+    areas = np.linspace(1, 40, 30)
+    args = (speeds, 'C', 'rectangular', areas, 'residential', ['single-family', 'duplex', 'apartment'][1])
+    expected = wind_load_sweep(*args)
+    result = parallel.parallel_wind_load_sweep(*args, workers=workers, chunk_size=200)
+    np.testing.assert_array_equal(result.wind_load, expected.wind_load)
+    np.testing.assert_array_equal(result.status, expected.status)
+
+
+def test_broadcast_inputs_are_not_materialized_for_workers():
+    speeds = np.linspace(5, 80, 1000)[:, None]
+    areas = np.linspace(1, 40, 1000)
+    columns = [speeds, np.asarray(0), np.asarray(0), areas, np.asarray(0), np.asarray(0)]
+    chunks = list(parallel._split(columns, (1000, 1000), 100_000))
+    assert len(chunks) == 10
+    # Each chunk carries 100 speeds and the whole area axis, not 100,000 cells per input
+    assert max(len(pickle.dumps(chunk)) for chunk in chunks) < 20_000
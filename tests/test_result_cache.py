@@ -0,0 +1,42 @@
+import threading
+
+from soilwind.core import evaluate_wind_load
+from soilwind.result_cache import LRUCache, cached_wind_evaluation, quantize
+
+
+def test_hits_misses_and_eviction():
+    cache = LRUCache(maxsize=2)
+    for key in ['a', 'b', 'a', 'c', 'b']:
+        cache.get_or_compute(key, lambda: key.upper())
+    assert cache.stats() == {'size': 2, 'maxsize': 2, 'hits': 1, 'misses': 4, 'evictions': 2}
+
+
+def test_value_computed_across_invalidate_is_not_stored():
+    cache = LRUCache()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'stale'
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(cache.get_or_compute('k', slow)))
+    worker.start()
+    started.wait(5)
+    cache.invalidate()
+    release.set()
+    worker.join(5)
+
+    assert results == ['stale']
+    assert len(cache) == 0
+    assert cache.get_or_compute('k', lambda: 'fresh') == 'fresh'
+
+
+def test_cached_wind_evaluation_matches_core():
+    cache = LRUCache()
+    args = (30.0, 'B', 'rectangular', 10.0, 'residential', 'apartment')
+    assert cached_wind_evaluation(*args, cache=cache) == evaluate_wind_load(*args)
+    assert cached_wind_evaluation(30.0000000001, *args[1:], cache=cache) == evaluate_wind_load(*args)
+    assert cache.hits == 1
+    assert quantize(30.0000000001) == 30.0
@@ -0,0 +1,113 @@
+import json
+import operator
+
+import numpy as np
+import pytest
+
+from soilwind.core import CAUTION, EXCEED
+from soilwind.rules import (COUNT_CUTS, OPERATORS, RuleFile, RuleSet, default_rules, parse_rule, soil_columns,
+                            wind_columns)
+from soilwind.soil_batch import SoilAnalysisBatch
+from soilwind.wind_batch import wind_load_sweep
+
+COMPARE = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+
+def expected_flags(rules, values):
+    flags = np.zeros(len(values), dtype=np.uint64)
+    for bit, rule in enumerate(rules):
+        hit = COMPARE[rule.op](values, rule.threshold)
+        if rule.lower is not None:
+            low, op = rule.lower
+            hit &= COMPARE[op](low, values)
+        flags |= hit.astype(np.uint64) << np.uint64(bit)
+    return flags
+
+
+def test_default_soil_rules_match_warnings():
+    rng = np.random.default_rng(0)
+    n = 2000
+    batch = SoilAnalysisBatch(rng.choice(['Clay', 'Sand', 'Silt', 'Loam'], n), rng.uniform(20, 500, n),
+                              rng.uniform(0.5, 20, n), rng.uniform(0.1, 10, n))
+    result = batch.analyze()
+    assert (default_rules()['soil'].evaluate(soil_columns(batch, result)) == result.warnings).all()
+
+
+def test_default_wind_rules_match_status():
+    result = wind_load_sweep(np.linspace(1, 80, 2000), 'B', 'rectangular', 10.0, 'residential', 'apartment')
+    rule_set = default_rules()['wind']
+    flags = rule_set.evaluate(wind_columns(result))
+    assert ((flags == rule_set.bit('caution')) == (result.status == CAUTION)).all()
+    assert ((flags == rule_set.bit('exceed')) == (result.status == EXCEED)).all()
+    assert {CAUTION, EXCEED} <= set(result.status.tolist())
+
+
+# Few cuts are counted, many spread-out cuts bucketed, and a tight cluster
+# with an outlier is too close together to bucket, so it is searched
+@pytest.mark.parametrize('count, cluster, path', [(4, 100, 'count'), (40, 100, 'bucket'), (40, 1e-6, 'search')])
+def test_compiled_rules_match_brute_force(count, cluster, path):
+    rng = np.random.default_rng(count)
+    thresholds = (1 + rng.uniform(0, cluster, count - 1)).tolist() + [1000.0]
+    entries = []
+    for i, threshold in enumerate(thresholds):
+        if i % 4 == 3:
+            low, high = sorted((thresholds[i - 1], threshold))
+            when = f'{low!r} < settlement <= {high!r}' if low != high else f'settlement <= {high!r}'
+        else:
+            when = f'settlement {OPERATORS[i % 4]} {threshold!r}'
+        entries.append({'name': f'rule {i}', 'when': when})
+    rule_set = RuleSet.from_config('soil', entries)
+    _, cuts, buckets, _ = rule_set._columns[0]
+    assert path == ('count' if len(cuts) <= COUNT_CUTS else 'bucket' if buckets is not None else 'search')
+
+    values = np.concatenate([thresholds, np.nextafter(thresholds, np.inf), np.nextafter(thresholds, -np.inf),
+                             1 + rng.uniform(-cluster, 2 * cluster, 500), rng.uniform(-10, 1010, 500),
+                             [-np.inf, np.inf, np.nan]])
+    assert (rule_set.evaluate({'settlement': values}) == expected_flags(rule_set.rules, values)).all()
+
+
+def test_nan_and_scalar_columns():
+    rule_set = RuleSet.from_config('wind', [{'name': 'low', 'when': 'utilization < 0.5'},
+                                           {'name': 'high', 'when': 'wind_load >= 100'}])
+    flags = rule_set.evaluate({'utilization': np.array([0.1, np.nan, 0.9]), 'wind_load': 150.0})
+    assert flags.tolist() == [3, 2, 2]
+    assert rule_set.evaluate({'utilization': 0.1, 'wind_load': 1.0}) == 1
+    assert rule_set.names(3) == ['low', 'high']
+
+
+@pytest.mark.parametrize('when, message', [
+    ('bogus < 1', 'unknown column'),
+    ('utilization < inf', 'finite number'),
+    ('1 < utilization < 1', 'is empty'),
+    ('2 <= utilization <= 1', 'is empty'),
+    ('utilization ~ 1', "must look like"),
+])
+def test_rejects_bad_conditions(when, message):
+    with pytest.raises(ValueError, match=message):
+        parse_rule({'name': 'r', 'when': when}, 'wind')
+
+
+def test_range_rule_round_trips_through_when():
+    rule = parse_rule({'name': 'r', 'when': '0.5<=utilization<1'}, 'wind')
+    assert rule.when == '0.5 <= utilization < 1'
+    assert parse_rule(rule.as_dict(), 'wind').cuts() == rule.cuts()
+
+
+def test_rule_file_reloads_and_keeps_rules_after_a_bad_edit(tmp_path, capsys):
+    path = tmp_path / 'rules.json'
+    path.write_text(json.dumps({'wind': [{'name': 'a', 'when': 'utilization > 1'}]}))
+    rules = RuleFile(str(path), check_interval=None)
+    assert [rule.name for rule in rules.rules('wind').rules] == ['a']
+    assert len(rules.rules('soil')) == 4
+
+    path.write_text(json.dumps({'wind': [{'name': 'b', 'when': 'utilization > 2'},
+                                         {'name': 'c', 'when': 'area < 1'}]}))
+    assert rules.refresh()
+    assert [rule.name for rule in rules.rules('wind').rules] == ['b', 'c']
+
+    path.write_text('{"wind": [')
+    assert not rules.refresh()
+    assert 'invalid JSON' in rules.error
+    assert [rule.name for rule in rules.rules('wind').rules] == ['b', 'c']
+    assert 'keeping the previous rules' in capsys.readouterr().err
+    assert not rules.refresh()
@@ -0,0 +1,68 @@
+import asyncio
+import json
+
+import pytest
+
+from soilwind.service import AnalysisService
+
+SOIL = {'soil_type': 'Clay', 'soil_bearing_capacity': 200, 'depth_of_soil_layer': 3, 'water_table_depth': 1.5}
+
+
+def dispatch(method, path, body):
+    async def run():
+        return await AnalysisService(window=0.001).dispatch(method, path, json.dumps(body).encode())
+    return asyncio.run(run())
+
+
+def raw_request(data):
+    async def run():
+        service = AnalysisService(window=0.001)
+        await service.start('127.0.0.1', 0)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+            writer.write(data)
+            await writer.drain()
+            response = await asyncio.wait_for(reader.read(), 5)
+            writer.close()
+            return response
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+def test_soil_request_returns_batch_result_fields():
+    status, payload = dispatch('POST', '/soil', SOIL)
+    assert status == 200
+    assert payload['warnings'] == 8
+    assert payload['capacity_class'] == 'Medium soil bearing capacity'
+
+
+def test_list_of_requests_is_evaluated_row_by_row():
+    status, payload = dispatch('POST', '/soil', [SOIL, dict(SOIL, water_table_depth=5)])
+    assert status == 200
+    assert [row['warnings'] for row in payload] == [8, 0]
+
+
+@pytest.mark.parametrize('body', [[1, 2], [SOIL, 'x'], 3, None])
+def test_non_object_input_is_a_client_error(body):
+    status, payload = dispatch('POST', '/soil', body)
+    assert status == 400
+    assert 'expected a JSON object' in payload['error']
+
+
+def test_invalid_row_is_a_client_error():
+    status, payload = dispatch('POST', '/soil', dict(SOIL, soil_bearing_capacity='lots'))
+    assert status == 400
+    assert payload['error'].startswith('soil_bearing_capacity')
+
+
+def test_unknown_endpoint_and_method():
+    assert dispatch('POST', '/rock', SOIL)[0] == 404
+    assert dispatch('GET', '/soil', SOIL)[0] == 405
+
+
+@pytest.mark.parametrize('length', [b'abc', b'-5'])
+def test_malformed_content_length_gets_a_response(length):
+    response = raw_request(b'POST /soil HTTP/1.1\r\nContent-Length: ' + length + b'\r\n\r\n')
+    assert response.startswith(b'HTTP/1.1 400 ')
+    assert b'Content-Length' in response
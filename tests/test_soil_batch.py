@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from soilwind.core import HIGH_CAPACITY_LIMIT, LOW_CAPACITY_LIMIT, MIN_WATER_TABLE_DEPTH, SoilAnalysis
+from soilwind.soil_batch import CAPACITY_CLASSES, SoilAnalysisBatch, analyze_soil_batch
+
+
+def test_batch_matches_scalar_analysis():
+    rng = np.random.default_rng(0)
+    n = 300
+    soil_type = rng.choice(['Clay', 'Sand', 'Silt', 'Loam', 'Gravel'], n)
+    capacity = np.concatenate([[LOW_CAPACITY_LIMIT, HIGH_CAPACITY_LIMIT], rng.uniform(20, 500, n - 2)])
+    depth = rng.uniform(0.5, 20, n)
+    water_table = np.concatenate([[MIN_WATER_TABLE_DEPTH], rng.uniform(0.1, 10, n - 1)])
+    friction_angle = rng.uniform(20, 40, n)
+    batch = SoilAnalysisBatch(soil_type, capacity, depth, water_table, friction_angle=friction_angle)
+    result = batch.analyze()
+
+    for i in range(n):
+        analysis = SoilAnalysis(str(soil_type[i]), float(capacity[i]), float(depth[i]), float(water_table[i]),
+                                friction_angle=float(friction_angle[i]))
+        allowable_bearing_capacity, settlement, lateral_pressure, _ = analysis.results()
+        assert result.allowable_bearing_capacity[i] == pytest.approx(allowable_bearing_capacity)
+        assert result.settlement[i] == pytest.approx(settlement)
+        assert result.lateral_earth_pressure[i] == pytest.approx(lateral_pressure)
+        assert CAPACITY_CLASSES[result.capacity_class[i]] == analysis.check_soil_bearing_capacity()
+        assert result.warnings[i] == analysis.warning_flags()
+
+
+def test_scalar_parameters_broadcast():
+    result = analyze_soil_batch('Sand', [100.0, 200.0], 2.0, 5.0)
+    assert len(result) == 2
+    assert result.settlement.shape == (2,)
+    assert result.allowable_bearing_capacity[1] == pytest.approx(2 * result.allowable_bearing_capacity[0])
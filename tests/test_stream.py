@@ -0,0 +1,110 @@
+import io
+
+import numpy as np
+import pytest
+
+from soilwind.stream import READING, MonitoredStructures, StreamEvaluator, read_chunks
+
+
+def structures():
+    return MonitoredStructures([7, 3, 11], ['B', 'C', 'D'], ['rectangular', 'cylindrical', 'dome'],
+                               [10.0, 50.0, 200.0], ['residential', 'commercial', 'industrial'],
+                               ['apartment', 'office', 'factory'])
+
+
+# Readings in per-station time order, interleaved across stations, plus
+# readings for an unknown station
+def make_readings(monitored, n, rng):
+    station = rng.choice(np.append(monitored.station, 99), n, p=[0.32, 0.32, 0.32, 0.04])
+    time = np.empty(n)
+    for value in np.unique(station):
+        rows = station == value
+        time[rows] = np.cumsum(rng.exponential(0.7, rows.sum()))
+    order = np.argsort(time + rng.uniform(0, 3, n), kind='stable')
+    time, station = time[order], station[order]
+    for value in np.unique(station):
+        rows = np.flatnonzero(station == value)
+        time[rows] = np.sort(time[rows])
+    # Wind speeds around each structure's acceptable limit
+    index = monitored.index(station)
+    limit_speed = np.sqrt(monitored.acceptable_limits / (0.613 * monitored.load_per_q))
+    wind_speed = limit_speed[np.maximum(index, 0)] * rng.uniform(0.6, 1.2, n)
+    return time, station, wind_speed
+
+
+def brute_force(monitored, time, station, wind_speed, window, resolution):
+    buckets = int(np.ceil(window / resolution))
+    seen = {value: [] for value in monitored.station.tolist()}
+    status = dict.fromkeys(seen, 0)
+    transitions = []
+    for t, s, v in zip(time.tolist(), station.tolist(), wind_speed.tolist()):
+        if s not in seen:
+            continue
+        i = monitored.index(np.array([s]))[0]
+        load = 0.613 * v**2 * monitored.load_per_q[i]
+        new = int(load > monitored.caution_limits[i]) + int(load > monitored.acceptable_limits[i])
+        bucket = int(np.floor(t / resolution))
+        seen[s].append((bucket, v))
+        inside = [speed for b, speed in seen[s] if b > bucket - buckets]
+        if new != status[s]:
+            transitions.append((t, s, status[s], new, max(inside), sum(inside) / len(inside)))
+            status[s] = new
+    return transitions
+
+
+@pytest.mark.parametrize('window, resolution, chunk', [(10.0, 1.0, 37), (5.0, 0.5, 1), (60.0, 1.0, 1000)])
+def test_transitions_and_window_match_brute_force(window, resolution, chunk):
+    rng = np.random.default_rng(chunk)
+    monitored = structures()
+    time, station, wind_speed = make_readings(monitored, 600, rng)
+    evaluator = StreamEvaluator(monitored, window, resolution)
+    transitions = []
+    for start in range(0, len(time), chunk):
+        part = slice(start, start + chunk)
+        transitions += evaluator.feed(time[part], station[part], wind_speed[part])
+
+    expected = brute_force(monitored, time, station, wind_speed, window, resolution)
+    actual = [(t.time, t.station, t.previous, t.status, t.peak_wind_speed, t.mean_wind_speed) for t in transitions]
+    assert len(actual) == len(expected) > 5
+    for got, want in zip(sorted(actual), sorted(expected)):
+        assert got[:5] == want[:5]
+        assert got[5] == pytest.approx(want[5])
+    assert evaluator.unknown == np.count_nonzero(station == 99)
+
+    peak, mean = evaluator.window()
+    for i, s in enumerate(monitored.station.tolist()):
+        rows = station == s
+        bucket = np.floor(time[rows] / resolution)
+        inside = wind_speed[rows][bucket > bucket[-1] - int(np.ceil(window / resolution))]
+        assert peak[i] == inside.max()
+        assert mean[i] == pytest.approx(inside.mean())
+
+
+@pytest.mark.parametrize('area', [0.0, float('nan')])
+def test_area_must_be_positive(area):
+    with pytest.raises(ValueError, match='Area must be a positive number'):
+        MonitoredStructures([1], ['B'], ['rectangular'], [area], ['residential'], ['apartment'])
+
+
+def test_late_readings_are_dropped():
+    evaluator = StreamEvaluator(structures(), 10.0)
+    evaluator.feed([5.0, 6.0], [7, 7], [1.0, 2.0])
+    evaluator.feed([4.0, 7.0], [7, 7], [100.0, 3.0])
+    assert evaluator.late == 1
+    assert evaluator.readings == 3
+    peak, mean = evaluator.window()
+    assert peak[1] == 3.0 and mean[1] == pytest.approx(2.0)
+    assert np.isnan(peak[0])
+
+
+def test_read_chunks_text_and_binary():
+    text = b'time,station,wind_speed\n1,7,2.5\n2,3,3.5\n\n3,7,bad\n4,11,1\n'
+    chunks = list(read_chunks(io.BytesIO(text), chunk_bytes=16))
+    time = np.concatenate([chunk[0] for chunk in chunks])
+    station = np.concatenate([chunk[1] for chunk in chunks])
+    assert time.tolist() == [1.0, 2.0, 4.0]
+    assert station.tolist() == [7, 3, 11]
+
+    readings = np.array([(1.0, 7, 2.5), (2.0, 3, 3.5)], dtype=READING)
+    (time, station, wind_speed), = read_chunks(io.BytesIO(readings.tobytes()), 'binary')
+    assert station.tolist() == [7, 3] and wind_speed.tolist() == [2.5, 3.5]
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from soilwind.core import WARN_HIGH_WATER_TABLE, WARN_LOW_CAPACITY
+from soilwind.soil_batch import SoilAnalysisBatch
+from soilwind.sweep import CartesianGrid, LatinHypercube, main, run_sweep
+
+FIXED = {'depth_of_soil_layer': 2.0, 'water_table_depth': 3.0}
+
+
+def test_grid_counts_match_the_batch_engine():
+    capacities = np.linspace(50, 300, 11)
+    result = run_sweep(CartesianGrid({'soil_bearing_capacity': capacities}), 'Sand', FIXED, chunk_size=4)
+    warnings = SoilAnalysisBatch('Sand', capacities, 2.0, 3.0).warning_flags()
+    assert result.warning_count(WARN_LOW_CAPACITY) == np.count_nonzero(warnings & WARN_LOW_CAPACITY)
+    assert result.warning_count(WARN_HIGH_WATER_TABLE) == 0
+
+
+def test_latin_hypercube_is_reproducible():
+    design = {'water_table_depth': (0.5, 4.0)}
+    fixed = {'soil_bearing_capacity': 200.0, 'depth_of_soil_layer': 2.0}
+    first = run_sweep(LatinHypercube(design, 1000, seed=3), fixed=fixed)
+    second = run_sweep(LatinHypercube(design, 1000, seed=3), fixed=fixed)
+    assert first.warning_count(WARN_HIGH_WATER_TABLE) == second.warning_count(WARN_HIGH_WATER_TABLE) > 0
+
+
+def test_unknown_parameters_are_rejected():
+    with pytest.raises(ValueError, match='young_modulis'):
+        run_sweep(CartesianGrid({'soil_bearing_capacity': [100, 200]}), fixed=dict(FIXED, young_modulis=1e6))
+    with pytest.raises(SystemExit) as exit:
+        main(['--param', 'soil_bearing_capacity=50:300:5', '--fixed', 'depth_of_soil_layer=2',
+              '--fixed', 'water_table_depth=3', '--fixed', 'young_modulis=1e6'])
+    assert exit.value.code == 2
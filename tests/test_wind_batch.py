@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from soilwind.core import evaluate_wind_load
+from soilwind.factors import FACTORS
+from soilwind.wind_batch import ACCEPTABLE_LIMITS, wind_load_sweep
+
+
+def test_sweep_matches_scalar_evaluation():
+    rng = np.random.default_rng(0)
+    pairs = np.argwhere(~np.isnan(ACCEPTABLE_LIMITS))
+    n = 300
+    pick = pairs[rng.integers(len(pairs), size=n)]
+    structure_type = np.array(FACTORS.structures.names)[pick[:, 0]]
+    specific_type = np.array(FACTORS.specific_types.names)[pick[:, 1]]
+    exposure = rng.choice(FACTORS.exposures.names, n)
+    shape = rng.choice(FACTORS.shapes.names, n)
+    wind_speed = rng.uniform(1, 80, n)
+    area = rng.uniform(1, 500, n)
+    result = wind_load_sweep(wind_speed, exposure, shape, area, structure_type, specific_type)
+
+    for i in range(n):
+        wind_load, acceptable_limits, status = evaluate_wind_load(
+            float(wind_speed[i]), str(exposure[i]), str(shape[i]), float(area[i]), str(structure_type[i]),
+            str(specific_type[i]))
+        assert result.wind_load[i] == pytest.approx(wind_load)
+        assert result.acceptable_limits[i] == acceptable_limits
+        assert result.status[i] == status
+
+
+def test_grid_broadcasting_and_case():
+    result = wind_load_sweep(np.array([10.0, 20.0, 40.0]), 'b', 'Rectangular', np.array([[10.0], [20.0]]),
+                             'Residential', 'apartment')
+    assert result.shape == (2, 3)
+    assert result.wind_load[1, 0] == pytest.approx(2 * result.wind_load[0, 0])
+    assert result.wind_load[0, 1] == pytest.approx(4 * result.wind_load[0, 0])
+
+
+@pytest.mark.parametrize('kwargs, message', [
+    ({'wind_speed': [10.0, 0.0]}, 'Wind speed'),
+    ({'wind_speed': [10.0, float('nan')]}, 'Wind speed'),
+    ({'area': float('nan')}, 'Area'),
+    ({'exposure_category': ['B', 'Z']}, 'exposure category: Z'),
+    ({'structure_type': 'castle'}, 'structure type: castle'),
+    ({'specific_type': 'barn'}, 'residential/barn'),
+])
+def test_invalid_inputs(kwargs, message):
+    args = {'wind_speed': 10.0, 'exposure_category': 'B', 'structural_shape': 'rectangular', 'area': 10.0,
+            'structure_type': 'residential', 'specific_type': 'apartment', **kwargs}
+    with pytest.raises(ValueError, match=message):
+        wind_load_sweep(**args)